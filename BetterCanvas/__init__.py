@@ -1,3 +1,24 @@
+from .aio import AsyncBridge, TkDriver
+from .animation import Animator, Tween
+from .backends import MemoryCanvas, TkBackend
+from .batch import Batch
 from .bettercanvas import BetterCanvas
+from .collection import ItemCollection, ItemView
+from .direct import DirectCanvas
+from .events import EventDispatcher
+from .groups import Group, ItemGroup, SceneGraph
+from .images import ImageCache
 from .items import (Arc, Bitmap, Image, Item, Line, Oval, Polygon, Rectangle,
                     Text, Window)
+from .listeners import CanvasListener
+from .profiling import Profiler
+from .registry import ItemRegistry
+from .scene import SceneCollection, SceneSnapshot
+from .scheduler import FrameScheduler
+from .spatial import SpatialIndex
+from .stacking import StackingOrder
+from .streaming import LineStream, RingBuffer
+from .svg import SvgExporter
+from .tags import TagIndex
+from .threads import ThreadSafeCanvas, ThreadSafeItem
+from .virtual import VirtualCanvas
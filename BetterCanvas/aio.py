@@ -0,0 +1,208 @@
+"""This module contains classes that run a BetterCanvas together with an asyncio event loop."""
+
+import asyncio
+import time
+import tkinter as tk
+
+import _tkinter
+
+
+class Applied():
+    """Awaitable returned by BetterCanvas.flush.
+
+    Updates are applied before flush returns, so awaiting it completes right away."""
+
+    __slots__ = ()
+
+    def __await__(self):
+        return iter(())
+
+    def __repr__(self):
+        return f"<{type(self).__name__}>"
+
+APPLIED = Applied()
+
+
+class TkDriver():
+    """Processes Tk events from an asyncio event loop, instead of tk.mainloop.
+
+    Pending Tk events and due after callbacks are processed, then the driver sleeps
+    until the next frame of the frame scheduler is due, or for an interval that doubles
+    from min_interval up to max_interval while Tk stays idle, or until wake is called.
+    tkinter gives no access to the display connection asyncio could wait on,
+    so sleeping longer while idle is what keeps the driver from busy polling.
+    """
+
+    # Tk events processed at most before asyncio gets a turn.
+    max_events = 1000
+
+    def __init__(self, widget, better_canvas=None, min_interval=0.001, max_interval=0.02):
+        """Creates a driver that is not running yet.
+
+        Args:
+            widget: Tk widget whose interpreter is driven, the driver stops when it is destroyed.
+            better_canvas: BetterCanvas whose frame scheduler sets the wake up times, or None.
+            min_interval: Sleep in seconds after Tk processed events.
+            max_interval: Longest sleep in seconds while Tk is idle.
+        """
+        self.widget = widget
+        self.better_canvas = better_canvas
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.running = False
+        self._interval = min_interval
+        self._event = None
+
+    def wake(self):
+        """Makes the driver process Tk events right away."""
+        self._interval = self.min_interval
+        if self._event is not None:
+            self._event.set()
+
+    def stop(self):
+        """Makes run return after its current step."""
+        self.running = False
+        self.wake()
+
+    def _alive(self):
+        """Whether the widget still exists."""
+        try:
+            return bool(self.widget.tk.call('info', 'commands', self.widget._w))
+        except tk.TclError:
+            return False
+
+    def step(self):
+        """Processes pending Tk events and due after callbacks without waiting.
+
+        Returns:
+            The number of processed events."""
+        interpreter = self.widget.tk
+        processed = 0
+        while processed < self.max_events and interpreter.dooneevent(_tkinter.DONT_WAIT):
+            processed += 1
+        return processed
+
+    def delay(self):
+        """Returns the time in seconds to sleep before the next step."""
+        delay = self._interval
+        scheduler = self.better_canvas.scheduler if self.better_canvas is not None else None
+        if scheduler is not None and scheduler.running:
+            delay = min(delay, max(scheduler._deadline - time.perf_counter(), 0))
+        return delay
+
+    async def run(self):
+        """Processes Tk events until the widget is destroyed or stop is called."""
+        self.running = True
+        self._event = asyncio.Event()
+        try:
+            while self.running and self._alive():
+                if self.step():
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * 2, self.max_interval)
+                self._event.clear()
+                try:
+                    await asyncio.wait_for(self._event.wait(), self.delay())
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.running = False
+            self._event = None
+
+
+class _Creation():
+    """Items requested by one create_many_async call."""
+
+    __slots__ = ('rows', 'options', 'future')
+
+    def __init__(self, rows, options, future):
+        self.rows = rows
+        self.options = options
+        self.future = future
+
+
+class AsyncBridge():
+    """Futures of a BetterCanvas that are resolved by its frame scheduler.
+
+    Items requested by coroutines between two frames are created at the start of the next frame,
+    with one create_many call per item type and set of option names,
+    and frame waiters are resolved after updates of the frame were applied.
+    """
+
+    def __init__(self, better_canvas):
+        self.better_canvas = better_canvas
+        self.waiters = []
+        self.creations = {}
+        self.driver = None
+
+    def _schedule(self):
+        """Hooks into frames of the frame scheduler, see BetterCanvas._frames."""
+        scheduler = self.better_canvas._frames()
+        if self.frame not in scheduler.callbacks:
+            scheduler.callbacks.append(self.frame)
+        if self.flushed not in scheduler.flushed:
+            scheduler.flushed.append(self.flushed)
+        if self.driver is not None:
+            self.driver.wake()
+
+    def next_frame(self):
+        """Returns a future of the number of canvas subcommands run by the next frame."""
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        self._schedule()
+        return future
+
+    def create_many(self, item_type, rows, options):
+        """Returns a future of an ItemCollection of items created at the start of the next frame.
+
+        Args:
+            item_type: Type of the items.
+            rows: Coordinates of the items, a list with a row per item.
+            options: Options as accepted by BetterCanvas.create_many.
+        """
+        future = asyncio.get_running_loop().create_future()
+        options = {name: value.tolist() if hasattr(value, 'tolist') else value for name, value in options.items()}
+        key = (item_type, tuple(sorted(options)))
+        self.creations.setdefault(key, []).append(_Creation(rows, options, future))
+        self._schedule()
+        return future
+
+    def frame(self, frame_time):
+        """Creates requested items, it is called at the start of a frame."""
+        creations, self.creations = self.creations, {}
+        for (item_type, names), requests in creations.items():
+            requests = [request for request in requests if not request.future.done()]
+            if not requests:
+                continue
+            rows = [row for request in requests for row in request.rows]
+            options = {}
+            for name in names:
+                values = [request.options[name] for request in requests]
+                if any(isinstance(value, list) for value in values) or any(value != values[0] for value in values):
+                    options[name] = [item_value for request, value in zip(requests, values)
+                                     for item_value in (value if isinstance(value, list) else [value] * len(request.rows))]
+                else:
+                    options[name] = values[0]
+            try:
+                collection = self.better_canvas.create_many(item_type, rows, **options)
+            except (tk.TclError, TypeError, ValueError) as error:
+                for request in requests:
+                    request.future.set_exception(error)
+                continue
+            start = 0
+            for request in requests:
+                request.future.set_result(collection[start:start + len(request.rows)])
+                start += len(request.rows)
+
+    def flushed(self, operations):
+        """Resolves frame waiters, it is called after updates of a frame were applied."""
+        waiters, self.waiters = self.waiters, []
+        for future in waiters:
+            if not future.done():
+                future.set_result(operations)
+        scheduler = self.better_canvas.scheduler
+        if not self.waiters and not self.creations and scheduler is not None:
+            if self.frame in scheduler.callbacks:
+                scheduler.callbacks.remove(self.frame)
+            if self.flushed in scheduler.flushed:
+                scheduler.flushed.remove(self.flushed)
@@ -0,0 +1,321 @@
+"""This module contains classes that animate coordinates and options of items frame by frame."""
+
+from array import array
+
+
+def linear(progress):
+    return progress
+
+def ease_in(progress):
+    return progress * progress
+
+def ease_out(progress):
+    return progress * (2 - progress)
+
+def ease_in_out(progress):
+    if progress < 0.5:
+        return 2 * progress * progress
+    return -1 + (4 - 2 * progress) * progress
+
+# Easing functions by name, they map progress from 0 to 1 onto the animated distance.
+EASINGS = {
+    'linear': linear,
+    'ease_in': ease_in,
+    'ease_out': ease_out,
+    'ease_in_out': ease_in_out,
+}
+
+
+class Tween():
+    """Animation of coordinates or options of one or more items.
+
+    Start values are read from Tk when the tween starts, all of them with a single Tcl call.
+    The values of all channels are kept in one flat array of start values and one of distances,
+    the Animator stacks them with those of other tweens and interpolates all of them in one pass per frame.
+    """
+
+    def __init__(self, animator, item_ids, targets, duration, easing, on_done):
+        """Creates a tween that is not started yet.
+
+        Args:
+            animator: Animator that runs the tween.
+            item_ids: Ids of the animated items.
+            targets: {name : list with a target value per item}.
+                Name is "coords", "move" or an option, colors are given as strings.
+            duration: Duration in seconds.
+            easing: Name of a function from EASINGS or a callable taking and returning progress.
+            on_done: Callable called with the tween after it finished, or None.
+        """
+        if isinstance(easing, str):
+            try:
+                easing = EASINGS[easing]
+            except KeyError:
+                raise ValueError(f"Unknown easing {easing}, use one of {', '.join(EASINGS)} or a callable.") from None
+        self.animator = animator
+        self.item_ids = item_ids
+        self.targets = targets
+        self.duration = duration
+        self.easing = easing
+        self.on_done = on_done
+        self.chained = []
+        self.state = 'pending'
+        self.start_time = None
+        self.channels = []
+        self.start = array('d')
+        self.delta = array('d')
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self.item_ids)} items, {self.state}>"
+
+    @property
+    def done(self):
+        """Whether the tween finished or was cancelled."""
+        return self.state in ('finished', 'cancelled')
+
+    def then(self, duration=0.5, easing='linear', on_done=None, **targets):
+        """Chains a tween of the same items that starts when this one finishes.
+
+        Arguments are the same as for Animator.animate.
+
+        Returns:
+            The chained Tween."""
+        tween = Tween(self.animator, self.item_ids, self.animator._targets(len(self.item_ids), targets),
+                      duration, easing, on_done)
+        if self.state == 'finished':
+            self.animator._start(tween)
+        elif self.state == 'cancelled':
+            tween.state = 'cancelled'
+        else:
+            self.chained.append(tween)
+        return tween
+
+    def cancel(self):
+        """Stops the tween where it is, chained tweens are cancelled too."""
+        if self.done:
+            return
+        self.state = 'cancelled'
+        if self in self.animator.tweens:
+            self.animator.tweens.remove(self)
+        for tween in self.chained:
+            tween.cancel()
+
+    def begin(self):
+        """Reads start values from Tk and computes distances to the targets."""
+        better_canvas = self.animator.better_canvas
+        better_canvas.flush()
+        commands = []
+        for item_id in self.item_ids:
+            for name in self.targets:
+                if name in ('coords', 'move'):
+                    commands.append(('coords', item_id))
+                else:
+                    commands.append(('itemcget', item_id, '-' + name))
+        if set(self.targets) - {'coords', 'move'}:
+            better_canvas.items.stale.update(self.item_ids)
+        results = iter(better_canvas.backend.evaluate(commands))
+        for index, item_id in enumerate(self.item_ids):
+            for name, values in self.targets.items():
+                self._add_channel(item_id, name, next(results), values[index])
+        self.state = 'running'
+
+    def _add_channel(self, item_id, name, current, target):
+        """Adds start values and distances of a single item property."""
+        if name in ('coords', 'move'):
+            start = [float(value) for value in self.animator.better_canvas.backend.split(current)]
+            if name == 'move':
+                dx, dy = target
+                end = [value + (dx if index % 2 == 0 else dy) for index, value in enumerate(start)]
+            else:
+                end = [float(value) for value in target]
+                if len(end) != len(start):
+                    raise ValueError(f"Item {item_id} has {len(start)} coordinates. {len(end)} were given.")
+            kind = 'coords'
+        elif isinstance(target, str):
+            start = self.animator.rgb(current)
+            end = self.animator.rgb(target)
+            kind = 'color'
+        else:
+            start = [float(current or 0)]
+            end = [float(target)]
+            kind = 'number'
+        self.channels.append((item_id, 'coords' if kind == 'coords' else name, kind, len(self.start), len(start)))
+        self.start.extend(start)
+        self.delta.extend(end_value - start_value for start_value, end_value in zip(start, end))
+
+    def apply(self, progress):
+        """Records values of all channels at the given progress in the batch of the canvas."""
+        eased = self.easing(progress)
+        self.record([start + delta * eased for start, delta in zip(self.start, self.delta)])
+
+    def record(self, values, base=0):
+        """Records interpolated values of all channels in the batch of the canvas.
+
+        Args:
+            values: Flat list of values that holds those of the channels from index base on.
+            base: Index of the first value of the tween in values.
+        """
+        better_canvas = self.animator.better_canvas
+        target = better_canvas._target
+        registry = better_canvas.items
+        for item_id, name, kind, offset, length in self.channels:
+            offset += base
+            if kind == 'coords':
+                target.coords(item_id, *values[offset:offset + length])
+                continue
+            if kind == 'color':
+                red, green, blue = (min(max(round(value), 0), 255) for value in values[offset:offset + 3])
+                value = f'#{red:02x}{green:02x}{blue:02x}'
+            else:
+                value = values[offset]
+            target.itemconfig(item_id, {name: value})
+            if item_id in registry:
+                registry[item_id].invalidate_options(name)
+
+
+class Animator():
+    """Runs tweens of items of a BetterCanvas from the frame scheduler.
+
+    All tweens are advanced at the start of a frame, the start values and distances of all of them
+    are stacked into flat arrays, so their values are interpolated in one pass,
+    and the values are flushed together with other updates of the frame as a single Tcl script.
+    When no frame scheduler runs, one that applies only the updates of tweens once per frame is started
+    with the first tween and stops after the last one, other updates of the canvas stay immediate.
+    When two tweens animate the same property of an item, the one started later wins.
+    """
+
+    def __init__(self, better_canvas):
+        self.better_canvas = better_canvas
+        self.tweens = []
+        self.colors = {}
+        self.stacked = []
+        self.start = array('d')
+        self.delta = array('d')
+        self.owners = array('l')
+        self.bases = []
+
+    def __len__(self):
+        """Returns the number of running tweens."""
+        return len(self.tweens)
+
+    def animate(self, items, duration=0.5, easing='linear', on_done=None, **targets):
+        """Starts animating coordinates or options of the items.
+
+        Args:
+            items: An item or a sequence of items, ItemCollection and ItemView items are not created.
+            duration: Duration in seconds.
+            easing: Name of a function from EASINGS or a callable taking and returning progress.
+            on_done: Callable called with the tween after it finished.
+            targets: Target values by name.
+                coords: New coordinates, a single row for all items or a row per item.
+                move: Offset as (dx, dy) for all items or one per item.
+                Any option with a numeric or color value, a single value or a list with one per item.
+        Returns:
+            The started Tween.
+        """
+        if hasattr(items, 'id'):
+            item_ids = [items.id]
+        else:
+            item_ids = list(getattr(items, 'ids', None) or [item.id for item in items])
+        tween = Tween(self, item_ids, self._targets(len(item_ids), targets), duration, easing, on_done)
+        self._start(tween)
+        return tween
+
+    @staticmethod
+    def _targets(count, targets):
+        """Returns the targets with a list of values for each of count items."""
+        if not targets:
+            raise TypeError("animate expects at least one target.")
+        if 'coords' in targets and 'move' in targets:
+            raise TypeError("coords and move can't be animated together.")
+        per_item = {}
+        for name, value in targets.items():
+            if hasattr(value, 'tolist'):
+                value = value.tolist()
+            if name in ('coords', 'move'):
+                value = list(value)
+                shared = not value or not hasattr(value[0], '__len__')
+            else:
+                shared = not isinstance(value, (list, tuple))
+            if shared:
+                per_item[name] = [value] * count
+            elif len(value) != count:
+                raise ValueError(f"{name} expects a value for each of {count} items. {len(value)} were given.")
+            else:
+                per_item[name] = list(value)
+        return per_item
+
+    def rgb(self, color):
+        """Returns red, green and blue of the color in the range from 0 to 255."""
+        try:
+            return self.colors[color]
+        except KeyError:
+            pass
+        if not color:
+            raise ValueError("Transparent color can't be animated.")
+        if color.startswith('#') and len(color) in (4, 7, 13):
+            digits = (len(color) - 1) // 3
+            values = [int(color[1 + index * digits:1 + (index + 1) * digits], 16) for index in range(3)]
+            rgb = [value * 255 / (16 ** digits - 1) for value in values]
+        else:
+            rgb = [value / 257 for value in self.better_canvas.canvas.winfo_rgb(color)]
+        self.colors[color] = rgb
+        return rgb
+
+    def _start(self, tween):
+        """Reads start values of the tween and runs it from the next frame."""
+        tween.begin()
+        self.tweens.append(tween)
+        scheduler = self.better_canvas._frames()
+        if self.step not in scheduler.callbacks:
+            scheduler.callbacks.append(self.step)
+
+    def step(self, frame_time):
+        """Advances all running tweens to the frame time.
+
+        Finished tweens are removed, their chained tweens are started
+        and then their on_done callbacks are called."""
+        finished = []
+        if self.stacked != self.tweens:
+            self._stack()
+        progresses = []
+        for tween in self.stacked:
+            if tween.start_time is None:
+                tween.start_time = frame_time
+            elapsed = frame_time - tween.start_time
+            progresses.append(min(elapsed / tween.duration, 1.0) if tween.duration > 0 else 1.0)
+        eased = [tween.easing(progress) for tween, progress in zip(self.stacked, progresses)]
+        values = [start + delta * eased[owner] for start, delta, owner in zip(self.start, self.delta, self.owners)]
+        for tween, progress, base in zip(self.stacked, progresses, self.bases):
+            tween.record(values, base)
+            if progress >= 1.0:
+                self.tweens.remove(tween)
+                tween.state = 'finished'
+                finished.append(tween)
+        for tween in finished:
+            for chained in tween.chained:
+                chained.start_time = frame_time
+                self._start(chained)
+            if tween.on_done is not None:
+                tween.on_done(tween)
+        if not self.tweens:
+            scheduler = self.better_canvas.scheduler
+            if scheduler is not None and self.step in scheduler.callbacks:
+                scheduler.callbacks.remove(self.step)
+
+    def _stack(self):
+        """Stacks start values and distances of the running tweens, with the index of the tween of each value."""
+        self.stacked = list(self.tweens)
+        self.start = array('d')
+        self.delta = array('d')
+        self.owners = array('l')
+        self.bases = []
+        for position, tween in enumerate(self.stacked):
+            self.bases.append(len(self.start))
+            self.start.extend(tween.start)
+            self.delta.extend(tween.delta)
+            self.owners.extend([position] * len(tween.start))
+
+    def cancel_all(self):
+        """Cancels all running tweens."""
+        for tween in list(self.tweens):
+            tween.cancel()
@@ -0,0 +1,716 @@
+"""This module contains canvas backends, TkBackend for a tk.Canvas and MemoryCanvas kept in Python memory that needs no display.
+
+Both have evaluate, run and split for bulk subcommands, view_size, image_png and unbind,
+the after methods and event_loop, which tells whether after callbacks run on their own."""
+
+import itertools
+import math
+import time
+import tkinter as tk
+
+from . import items
+from .direct import DirectCanvas
+from .items import option_string
+
+# Values Tk reports for options that were never set, all other options default to an empty string.
+DEFAULTS = {
+    'arc': {'extent': '90.0', 'outline': 'black', 'start': '0.0', 'style': 'pieslice', 'width': '1.0'},
+    'bitmap': {'anchor': 'center', 'foreground': 'black'},
+    'image': {'anchor': 'center'},
+    'line': {'arrow': 'none', 'capstyle': 'butt', 'fill': 'black', 'joinstyle': 'round', 'width': '1.0'},
+    'oval': {'outline': 'black', 'width': '1.0'},
+    'polygon': {'fill': 'black', 'joinstyle': 'round', 'width': '1.0'},
+    'rectangle': {'outline': 'black', 'width': '1.0'},
+    'text': {'anchor': 'center', 'fill': 'black', 'font': 'TkDefaultFont', 'justify': 'left', 'width': '0'},
+    'window': {'anchor': 'center', 'height': '0', 'width': '0'},
+}
+
+# Item types whose bounding box grows by half of their outline width.
+OUTLINED = frozenset(['arc', 'line', 'oval', 'polygon', 'rectangle'])
+
+# Approximate size of a character of the default font, used for bounding boxes of text items.
+CHARACTER_WIDTH = 7
+LINE_HEIGHT = 15
+
+# Pixels per unit of a screen distance, centimeters, inches, millimeters and points, at 96 pixels per inch like SVG.
+DISTANCE_UNITS = {'c': 96 / 2.54, 'i': 96.0, 'm': 96 / 25.4, 'p': 96 / 72}
+
+
+def screen_distance(value):
+    """Returns a Tk screen distance, e.g. 2 or "1m", in pixels."""
+    value = str(value).strip()
+    unit = DISTANCE_UNITS.get(value[-1:])
+    if unit is None:
+        return float(value)
+    return float(value[:-1]) * unit
+
+
+class _MemoryItem():
+    """State of a single item of MemoryCanvas."""
+
+    __slots__ = ('type', 'coords', 'options', 'tags')
+
+    def __init__(self, item_type, coords, options, tags):
+        self.type = item_type
+        self.coords = coords
+        self.options = options
+        self.tags = tags
+
+
+class MemoryCanvas():
+    """Canvas backend that keeps items in Python memory.
+
+    It has the item methods of tk.Canvas used by BetterCanvas and items,
+    so it can be passed to BetterCanvas(backend=MemoryCanvas) or used on its own.
+    Nothing is drawn and no display or Tcl interpreter is needed,
+    so scenes can be computed in worker processes, pickled and replayed onto a Tk canvas.
+
+    Options are validated and reported as strings like Tk does.
+    Bounding boxes are computed from coordinates and outline width,
+    text, bitmap, image and window items get an approximate size,
+    and find_* methods compare bounding boxes instead of exact shapes.
+    Tags may be names or ids, tag expressions are not supported.
+    Event bindings are stored but never fired.
+    There is no event loop, after callbacks run only when update or update_idletasks is called.
+    """
+
+    event_loop = False
+
+    def __init__(self, master=None, **options):
+        """Creates an empty canvas.
+
+        Args:
+            master: Ignored, accepted for compatibility with tk.Canvas.
+            options: Options of the canvas, reported by cget.
+        """
+        self.options = options
+        self.items = {}
+        self.next_id = 1
+        self.focus_id = None
+        self.bindings = {}
+        self.timers = {}
+        self.timer_ids = itertools.count()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} with {len(self.items)} items>"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['bindings'] = {}
+        state['timers'] = {}
+        state['timer_ids'] = itertools.count()
+        return state
+
+    def cget(self, option):
+        return self.options.get(option, '')
+
+    def configure(self, cnf=None, **options):
+        self.options.update(cnf or {}, **options)
+
+    config = configure
+
+    def _ids(self, tag):
+        """Returns ids of items with the given tag or id in stacking order."""
+        if isinstance(tag, int) or (isinstance(tag, str) and tag.isdigit()):
+            item_id = int(tag)
+            return [item_id] if item_id in self.items else []
+        if tag == 'all':
+            return list(self.items)
+        if tag == 'current':
+            return []
+        return [item_id for item_id, item in self.items.items() if tag in item.tags]
+
+    def _first(self, tag):
+        """Returns the lowest item with the given tag or id, or None."""
+        if isinstance(tag, int) or (isinstance(tag, str) and tag.isdigit()):
+            return self.items.get(int(tag))
+        for item_id in self._ids(tag):
+            return self.items[item_id]
+        return None
+
+    @staticmethod
+    def _options(cnf):
+        """Returns options as a flat tuple of names prefixed with "-" and values, as tk.Canvas does."""
+        return tuple(value for name, option in cnf.items() for value in ('-' + name.rstrip('_'), option))
+
+    @staticmethod
+    def _tags(value):
+        """Returns a list of tags from an option value."""
+        if isinstance(value, str):
+            return value.split()
+        return [str(tag) for tag in value]
+
+    def _configure(self, item, options):
+        """Validates and stores options of the item."""
+        allowed = items.ITEM_TYPES[item.type].config_options
+        for name, value in options.items():
+            name = name.lstrip('-').rstrip('_')
+            if name not in allowed:
+                raise tk.TclError(f'unknown option "-{name}"')
+            if name == 'tags':
+                item.tags = self._tags(value)
+            else:
+                item.options[name] = value
+
+    def _create(self, item_type, coords, options):
+        """Creates an item and returns its id."""
+        if item_type not in items.ITEM_TYPES:
+            raise tk.TclError(f'unknown or ambiguous item type "{item_type}"')
+        coords = [float(value) for value in tk._flatten(coords)]
+        item = _MemoryItem(item_type, coords, {}, [])
+        self._configure(item, options)
+        item_id = self.next_id
+        self.next_id += 1
+        self.items[item_id] = item
+        return item_id
+
+    def create_arc(self, *coords, **options):
+        return self._create('arc', coords, options)
+
+    def create_bitmap(self, *coords, **options):
+        return self._create('bitmap', coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, options)
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create('polygon', coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create('rectangle', coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, options)
+
+    def create_window(self, *coords, **options):
+        return self._create('window', coords, options)
+
+    def coords(self, tag, *coords):
+        """Returns coordinates of the first item with the tag or replaces them."""
+        item = self._first(tag)
+        if not coords:
+            return list(item.coords) if item is not None else []
+        if item is not None:
+            item.coords = [float(value) for value in tk._flatten(coords)]
+
+    def move(self, tag, dx, dy):
+        dx = float(dx)
+        dy = float(dy)
+        for item_id in self._ids(tag):
+            coords = self.items[item_id].coords
+            for index in range(0, len(coords) - 1, 2):
+                coords[index] += dx
+                coords[index + 1] += dy
+
+    def scale(self, tag, x_origin, y_origin, x_scale, y_scale):
+        for item_id in self._ids(tag):
+            coords = self.items[item_id].coords
+            for index in range(0, len(coords) - 1, 2):
+                coords[index] = x_origin + (coords[index] - x_origin) * x_scale
+                coords[index + 1] = y_origin + (coords[index + 1] - y_origin) * y_scale
+
+    def itemconfigure(self, tag, cnf=None, **kw):
+        """Sets options of items with the tag, returns options of the first one when none are given."""
+        options = dict(cnf or {}, **kw)
+        if not options:
+            item = self._first(tag)
+            if item is None:
+                return None
+            return {name: (name, '', '', DEFAULTS[item.type].get(name, ''), self._get(item, name))
+                    for name in items.ITEM_TYPES[item.type].config_options}
+        for item_id in self._ids(tag):
+            self._configure(self.items[item_id], options)
+
+    itemconfig = itemconfigure
+
+    def _get(self, item, name):
+        """Returns the value of the option as Tk reports it."""
+        if name == 'tags':
+            return ' '.join(item.tags)
+        if name in item.options:
+            value = item.options[name]
+            tk_value = items.ITEM_TYPES[item.type].tk_value(name, value)
+            return option_string(value) if tk_value is None else tk_value
+        if name not in items.ITEM_TYPES[item.type].config_options:
+            raise tk.TclError(f'unknown option "-{name}"')
+        return DEFAULTS[item.type].get(name, '')
+
+    def itemcget(self, tag, option):
+        item = self._first(tag)
+        if item is None:
+            return ''
+        return self._get(item, option.lstrip('-'))
+
+    def type(self, tag):
+        item = self._first(tag)
+        return item.type if item is not None else None
+
+    def delete(self, *tags):
+        for tag in tags:
+            for item_id in self._ids(tag):
+                del self.items[item_id]
+                if self.focus_id == item_id:
+                    self.focus_id = None
+
+    def gettags(self, tag):
+        item = self._first(tag)
+        return tuple(item.tags) if item is not None else ()
+
+    def addtag_withtag(self, newtag, tag):
+        for item_id in self._ids(tag):
+            tags = self.items[item_id].tags
+            if newtag not in tags:
+                tags.append(newtag)
+
+    def addtag_all(self, newtag):
+        self.addtag_withtag(newtag, 'all')
+
+    def dtag(self, tag, tag_to_delete=None):
+        tag_to_delete = tag if tag_to_delete is None else tag_to_delete
+        for item_id in self._ids(tag):
+            tags = self.items[item_id].tags
+            if tag_to_delete in tags:
+                tags.remove(tag_to_delete)
+
+    def tag_raise(self, tag, above=None):
+        """Moves items with the tag just above the item above or to the top."""
+        self._restack(tag, above, after=True)
+
+    def tag_lower(self, tag, below=None):
+        """Moves items with the tag just below the item below or to the bottom."""
+        self._restack(tag, below, after=False)
+
+    lift = tkraise = tag_raise
+    lower = tag_lower
+
+    def _restack(self, tag, reference, after):
+        """Moves items with the tag next to the reference item, keeping their relative order."""
+        moved = self._ids(tag)
+        if not moved:
+            return
+        if reference is None:
+            anchor = None
+        else:
+            reference_ids = self._ids(reference)
+            if not reference_ids:
+                raise tk.TclError(f'tagOrId "{reference}" doesn\'t match any items')
+            anchor = reference_ids[-1] if after else reference_ids[0]
+        moved_set = set(moved)
+        rest = [item_id for item_id in self.items if item_id not in moved_set]
+        if anchor is None:
+            order = rest + moved if after else moved + rest
+        elif anchor in moved_set:
+            return
+        else:
+            position = rest.index(anchor) + (1 if after else 0)
+            order = rest[:position] + moved + rest[position:]
+        self.items = {item_id: self.items[item_id] for item_id in order}
+
+    def _bbox(self, item):
+        """Returns the bounding box of the item as floats, or None for hidden items."""
+        if item.options.get('state') == 'hidden' or not item.coords:
+            return None
+        xs = item.coords[0::2]
+        ys = item.coords[1::2]
+        if item.type in OUTLINED:
+            padding = screen_distance(item.options.get('width', 1.0)) / 2
+            return min(xs) - padding, min(ys) - padding, max(xs) + padding, max(ys) + padding
+        x, y = xs[0], ys[0]
+        if item.type == 'text':
+            lines = str(item.options.get('text', '')).split('\n')
+            width = max(len(line) for line in lines) * CHARACTER_WIDTH
+            height = len(lines) * LINE_HEIGHT
+        else:
+            width = screen_distance(item.options.get('width', 0) or 0)
+            height = screen_distance(item.options.get('height', 0) or 0)
+        anchor = str(item.options.get('anchor', 'center'))
+        left = x if 'w' in anchor else x - width if 'e' in anchor else x - width / 2
+        top = y if 'n' in anchor else y - height if 's' in anchor else y - height / 2
+        return left, top, left + width, top + height
+
+    def bbox(self, *tags):
+        """Returns the bounding box of all items with the tags as integers, or None."""
+        boxes = [self._bbox(self.items[item_id]) for tag in tags for item_id in self._ids(tag)]
+        boxes = [box for box in boxes if box is not None]
+        if not boxes:
+            return None
+        return (math.floor(min(box[0] for box in boxes)), math.floor(min(box[1] for box in boxes)),
+                math.ceil(max(box[2] for box in boxes)), math.ceil(max(box[3] for box in boxes)))
+
+    def find_all(self):
+        return tuple(self.items)
+
+    def find_withtag(self, tag):
+        return tuple(self._ids(tag))
+
+    def find_above(self, tag):
+        item_ids = self._ids(tag)
+        if not item_ids:
+            return ()
+        order = list(self.items)
+        position = order.index(item_ids[-1]) + 1
+        return (order[position], ) if position < len(order) else ()
+
+    def find_below(self, tag):
+        item_ids = self._ids(tag)
+        if not item_ids:
+            return ()
+        order = list(self.items)
+        position = order.index(item_ids[0]) - 1
+        return (order[position], ) if position >= 0 else ()
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        found = []
+        for item_id, item in self.items.items():
+            box = self._bbox(item)
+            if box is not None and box[0] <= x2 and box[2] >= x1 and box[1] <= y2 and box[3] >= y1:
+                found.append(item_id)
+        return tuple(found)
+
+    def find_enclosed(self, x1, y1, x2, y2):
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        found = []
+        for item_id, item in self.items.items():
+            box = self._bbox(item)
+            if box is not None and box[0] >= x1 and box[2] <= x2 and box[1] >= y1 and box[3] <= y2:
+                found.append(item_id)
+        return tuple(found)
+
+    def find_closest(self, x, y, halo=None, start=None):
+        """Returns a tuple with the id of the topmost item whose bounding box is closest to the point.
+
+        With start only items below it are considered, unless there are none."""
+        halo = halo or 0
+        order = list(self.items)
+        if start is not None:
+            start_ids = self._ids(start)
+            if start_ids and order.index(start_ids[0]) > 0:
+                order = order[:order.index(start_ids[0])]
+        best = None
+        best_distance = math.inf
+        for item_id in order:
+            box = self._bbox(self.items[item_id])
+            if box is None:
+                continue
+            dx = max(box[0] - x, 0, x - box[2])
+            dy = max(box[1] - y, 0, y - box[3])
+            distance = max(math.hypot(dx, dy) - halo, 0)
+            if distance <= best_distance:
+                best = item_id
+                best_distance = distance
+        return () if best is None else (best, )
+
+    def focus(self, tag=None):
+        """Returns the id of the focused item or an empty string, or moves the focus to the item."""
+        if tag is None:
+            return '' if self.focus_id is None else self.focus_id
+        item_ids = self._ids(tag)
+        self.focus_id = item_ids[0] if item_ids else None
+
+    def insert(self, tag, index, text):
+        for item_id in self._ids(tag):
+            item = self.items[item_id]
+            if item.type != 'text':
+                continue
+            current = str(item.options.get('text', ''))
+            position = self._index(current, index)
+            item.options['text'] = current[:position] + text + current[position:]
+
+    def dchars(self, tag, first, last=None):
+        for item_id in self._ids(tag):
+            item = self.items[item_id]
+            if item.type != 'text':
+                continue
+            current = str(item.options.get('text', ''))
+            start = self._index(current, first)
+            end = start if last is None else self._index(current, last)
+            item.options['text'] = current[:start] + current[end + 1:]
+
+    def index(self, tag, index):
+        item = self._first(tag)
+        return self._index(str(item.options.get('text', '')), index) if item is not None else 0
+
+    def icursor(self, tag, index):
+        pass
+
+    @staticmethod
+    def _index(text, index):
+        """Returns the character position for a text index, an integer or "end"."""
+        if index == 'end':
+            return len(text)
+        return min(max(int(index), 0), len(text))
+
+    def tag_bind(self, tag, sequence=None, func=None, add=None):
+        """Stores the binding, events never happen on this backend."""
+        bindings = self.bindings.setdefault(tag, {})
+        if func is None:
+            return bindings.get(sequence, '')
+        if add:
+            bindings.setdefault(sequence, []).append(func)
+        else:
+            bindings[sequence] = [func]
+        return str(id(func))
+
+    def tag_unbind(self, tag, sequence, funcid=None):
+        self.bindings.get(tag, {}).pop(sequence, None)
+
+    def bind(self, sequence=None, func=None, add=None):
+        """Stores the binding of the canvas, events never happen on this backend."""
+        return self.tag_bind(None, sequence, func, add)
+
+    def unbind(self, sequence, funcid=None):
+        bindings = self.bindings.get(None, {})
+        if funcid is None:
+            bindings.pop(sequence, None)
+        else:
+            bindings[sequence] = [func for func in bindings.get(sequence, ()) if str(id(func)) != funcid]
+
+    def canvasx(self, screenx, gridspacing=None):
+        """Returns the canvas coordinate, this backend never scrolls."""
+        return float(screenx)
+
+    def canvasy(self, screeny, gridspacing=None):
+        return float(screeny)
+
+    def direct(self):
+        """Returns the canvas itself, it has no faster way to run item commands."""
+        return self
+
+    def after(self, ms, func, *args):
+        """Queues a callback that update runs once ms milliseconds have passed, returns its id."""
+        timer_id = f'after#{next(self.timer_ids)}'
+        self.timers[timer_id] = (time.perf_counter() + ms / 1000, func, args)
+        return timer_id
+
+    def after_idle(self, func, *args):
+        """Queues a callback that the next update or update_idletasks runs, returns its id."""
+        return self.after(0, func, *args)
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def update(self):
+        """Runs queued callbacks that are due in the order of their deadlines, also those queued meanwhile."""
+        while True:
+            now = time.perf_counter()
+            due = sorted((deadline, timer_id) for timer_id, (deadline, _, _) in self.timers.items() if deadline <= now)
+            if not due:
+                return
+            for _, timer_id in due:
+                timer = self.timers.pop(timer_id, None)
+                if timer is not None:
+                    timer[1](*timer[2])
+
+    update_idletasks = update
+
+    def view_size(self):
+        """Returns width and height of the canvas from its options, or zeros when they are not numbers."""
+        try:
+            return float(self.cget('width') or 0), float(self.cget('height') or 0)
+        except ValueError:
+            return 0.0, 0.0
+
+    def winfo_rgb(self, color):
+        """Raises TclError, colors are only known to Tk."""
+        raise tk.TclError(f'unknown color name "{color}"')
+
+    def image_png(self, name):
+        """Raises TclError, images are only known to Tk."""
+        raise tk.TclError(f'image "{name}" doesn\'t exist')
+
+    def evaluate(self, commands):
+        """Runs canvas subcommands given as tuples, like TkBackend.evaluate does for Tk, and returns their results.
+
+        Coordinates and bounding boxes are returned as tuples, ids as integers and options as strings."""
+        return tuple(self._evaluate(*command) for command in commands)
+
+    def _evaluate(self, name, *args):
+        """Runs a single canvas subcommand."""
+        if name == 'create':
+            item_type, *args = args
+            position = next((index for index, value in enumerate(args) if isinstance(value, str) and value.startswith('-')), len(args))
+            return self._create(item_type, args[:position], dict(zip(args[position::2], args[position + 1::2])))
+        if name == 'coords':
+            result = self.coords(*args)
+            return () if result is None else tuple(result)
+        if name in ('itemconfigure', 'itemconfig'):
+            tag, *options = args
+            if not options:
+                config = self.itemconfigure(tag) or {}
+                return tuple(('-' + name,) + entry[1:] for name, entry in config.items())
+            return self.itemconfigure(tag, dict(zip(options[::2], options[1::2])))
+        if name == 'bbox':
+            return self.bbox(*args) or ()
+        if name == 'find':
+            how, *args = args
+            return getattr(self, 'find_' + how)(*args)
+        if name == 'addtag':
+            newtag, how, *args = args
+            return getattr(self, 'addtag_' + how)(newtag, *args)
+        if name == 'raise':
+            return self.tag_raise(*args)
+        if name == 'lower':
+            return self.tag_lower(*args)
+        if name in ('move', 'itemcget', 'delete', 'type', 'dtag', 'scale', 'insert', 'dchars', 'focus', 'gettags', 'canvasx', 'canvasy'):
+            return getattr(self, name)(*args)
+        raise tk.TclError(f'bad option "{name}"')
+
+    def run(self, commands):
+        """Runs canvas subcommands given as tuples, results are dropped."""
+        for command in commands:
+            self._evaluate(*command)
+
+    @staticmethod
+    def split(result):
+        """Returns a list result of evaluate as a tuple, a string is split at whitespace."""
+        if isinstance(result, (tuple, list)):
+            return tuple(result)
+        return tuple(str(result).split())
+
+    def create_rows(self, tk_type, rows, shared_options, item_options):
+        """Creates an item per row of coordinates and returns their ids.
+
+        Args:
+            tk_type: Item type, e.g. "oval".
+            rows: Coordinates of each item.
+            shared_options: Options of all items.
+            item_options: {option : list of values, one per item}.
+        """
+        item_ids = []
+        for index, row in enumerate(rows):
+            own_options = {option : values[index] for option, values in item_options.items()}
+            item_ids.append(self._create(tk_type, row, dict(shared_options, **own_options)))
+        return item_ids
+
+    def replay(self, canvas):
+        """Creates all items on another canvas, e.g. a tk.Canvas, in stacking order with a single Tcl call.
+
+        Returns:
+            {id on this canvas : id on the other canvas}."""
+        commands = []
+        for item in self.items.values():
+            options = dict(item.options, tags=tuple(item.tags))
+            commands.append(('create', item.type) + tuple(item.coords) + canvas._options(options))
+        new_ids = as_backend(canvas).evaluate(commands)
+        return {item_id: int(new_id) for item_id, new_id in zip(self.items, new_ids)}
+
+    def destroy(self):
+        self.items.clear()
+        self.bindings.clear()
+
+
+class TkBackend():
+    """Canvas backend of a tk.Canvas, it runs bulk subcommands as one Tcl script.
+
+    Other attribute look up is forwarded to the canvas, e.g. after and item methods.
+    The Tcl interpreter is looked up on every call, so a profiler that replaces it measures these calls too.
+    """
+
+    event_loop = True
+
+    def __init__(self, canvas: tk.Canvas):
+        self.canvas = canvas
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {self.canvas._w}>"
+
+    def __getattr__(self, name):
+        """Forward attribute look up to the canvas."""
+        return getattr(self.canvas, name)
+
+    def direct(self):
+        """Returns a DirectCanvas that calls Tcl directly for frequent item commands."""
+        return DirectCanvas(self.canvas)
+
+    def _command(self, command):
+        """Returns a canvas subcommand as Tcl code."""
+        return ' '.join(map(tk._stringify, (self.canvas._w,) + command))
+
+    def script(self, commands):
+        """Returns a Tcl script that runs the canvas subcommands."""
+        return '\n'.join(map(self._command, commands))
+
+    def evaluate(self, commands):
+        """Runs canvas subcommands given as tuples with a single Tcl call and returns their results.
+
+        Returns:
+            A tuple with the result of each subcommand."""
+        if not commands:
+            return ()
+        script = 'list ' + ' '.join('[' + self._command(command) + ']' for command in commands)
+        return self.canvas.tk.splitlist(self.canvas.tk.eval(script))
+
+    def run(self, commands):
+        """Runs canvas subcommands given as tuples with a single Tcl call, results are dropped."""
+        if commands:
+            self.canvas.tk.eval(self.script(commands))
+
+    def split(self, result):
+        """Returns a list result of evaluate, e.g. coordinates or a bounding box, as a tuple."""
+        if isinstance(result, (tuple, list)):
+            return tuple(result)
+        return self.canvas.tk.splitlist(result)
+
+    def create_rows(self, tk_type, rows, shared_options, item_options):
+        """Creates an item per row of coordinates with a single Tcl call and returns their ids, see MemoryCanvas.create_rows."""
+        canvas = self.canvas
+        prefix = f"[{canvas._w} create {tk_type} "
+        suffix = ' '.join(map(tk._stringify, canvas._options(shared_options)))
+        commands = []
+        for index, row in enumerate(rows):
+            command = prefix + ' '.join(map(tk._stringify, row))
+            if item_options:
+                own_options = {option : values[index] for option, values in item_options.items()}
+                command += ' ' + ' '.join(map(tk._stringify, canvas._options(own_options)))
+            commands.append(command + ' ' + suffix + ']')
+        result = canvas.tk.eval('list ' + ' '.join(commands))
+        return [int(item_id) for item_id in canvas.tk.splitlist(result)]
+
+    def view_size(self):
+        """Returns width and height of the visible canvas, from its options while it is not mapped."""
+        canvas = self.canvas
+        if canvas.winfo_ismapped():
+            return float(canvas.winfo_width()), float(canvas.winfo_height())
+        try:
+            return float(canvas.cget('width') or 0), float(canvas.cget('height') or 0)
+        except (ValueError, tk.TclError):
+            return 0.0, 0.0
+
+    def image_png(self, name):
+        """Returns PNG data of the image as base64, its width and its height."""
+        call = self.canvas.tk.call
+        data = call(name, 'data', '-format', 'png')
+        width, height = (int(call('image', size, name)) for size in ('width', 'height'))
+        return data, width, height
+
+    def unbind(self, sequence, funcid):
+        """Removes only the binding funcid of the sequence and deletes its command.
+
+        Misc.unbind would drop bindings added by others too."""
+        canvas = self.canvas
+        script = '\n'.join(line for line in canvas.bind(sequence).split('\n') if funcid not in line)
+        canvas.tk.call('bind', canvas._w, sequence, script)
+        canvas.deletecommand(funcid)
+
+
+def as_backend(canvas):
+    """Returns a TkBackend for a tk.Canvas and other canvas backends as they are."""
+    if isinstance(canvas, tk.Canvas):
+        return TkBackend(canvas)
+    return canvas
+
+
+# Canvas classes by name, for the backend argument of BetterCanvas.
+BACKENDS = {
+    'tk': tk.Canvas,
+    'memory': MemoryCanvas,
+}
@@ -0,0 +1,162 @@
+"""This module contains the Batch class that records item updates.
+
+Recorded updates are coalesced per item and applied with a single Tcl call."""
+
+import tkinter as tk
+
+from .backends import as_backend
+
+
+class _Update():
+    """Pending changes of a single item."""
+
+    __slots__ = ('coords', 'dx', 'dy', 'options', 'deleted')
+
+    def __init__(self):
+        self.coords = None
+        self.dx = 0
+        self.dy = 0
+        self.options = {}
+        self.deleted = False
+
+
+class Batch():
+    """Records item updates and flushes them as one Tcl script.
+
+    Batch has the same methods as tk.Canvas for the updates it records,
+    so it can be used in place of the canvas.
+    Updates of a single item are coalesced:
+    moves add together, coords override earlier moves, options override earlier values
+    and delete drops everything else recorded for the item.
+    Updates given a tag instead of an item id are run in the order they were recorded in
+    relative to updates of items, e.g. options of a tag override options its items were given before.
+    Any other canvas method flushes the batch first and is then forwarded to the canvas.
+    The recorded subcommands are run by the canvas backend, see backends.as_backend.
+    """
+
+    def __init__(self, canvas: tk.Canvas, reader=None):
+        """Creates an empty batch.
+
+        Args:
+            canvas: Canvas the updates are applied to.
+            reader: Object that answers reads and other forwarded methods, e.g. a DirectCanvas, canvas by default.
+        """
+        self.canvas = canvas
+        self.backend = as_backend(canvas)
+        self.reader = canvas if reader is None else reader
+        self.updates = {}
+        self.sealed = []
+
+    def __len__(self):
+        """Returns the number of items and tags with pending updates."""
+        return len(self.pending())
+
+    def __getattr__(self, name):
+        """Flush pending updates and forward attribute look up to the canvas."""
+        self.flush()
+        return getattr(self.reader, name)
+
+    def _update(self, item_id):
+        """Returns pending changes of the item, creating them if needed.
+
+        Changes of a tag are recorded after all pending updates, they must not be merged into earlier ones
+        and updates of items after them must not be merged into updates before them.
+        So updates recorded so far are sealed, unless the tag was the last one updated."""
+        update = self.updates.get(item_id)
+        if not isinstance(item_id, int) and self.updates and next(reversed(self.updates)) != item_id:
+            self.sealed.append(self.updates)
+            self.updates = {}
+            update = None
+        if update is None:
+            update = self.updates[item_id] = _Update()
+        return update
+
+    def pending(self):
+        """Returns the set of ids and tags with pending updates."""
+        pending = set(self.updates)
+        for updates in self.sealed:
+            pending.update(updates)
+        return pending
+
+    def retagged(self):
+        """Returns ids of items whose tags are changed by pending updates."""
+        return [item_id for updates in self.sealed + [self.updates] for item_id, update in updates.items()
+                if isinstance(item_id, int) and 'tags' in update.options]
+
+    def move(self, item_id, dx, dy):
+        """Records a move of the item by the provided offset."""
+        update = self._update(item_id)
+        update.dx += dx
+        update.dy += dy
+
+    def coords(self, item_id, *coords):
+        """Records new coordinates of the item.
+
+        When no coordinates are given pending updates are flushed
+        and the current coordinates are returned."""
+        if not coords:
+            self.flush()
+            return self.reader.coords(item_id)
+        update = self._update(item_id)
+        update.coords = tk._flatten(coords)
+        update.dx = update.dy = 0
+
+    def itemconfig(self, item_id, cnf=None, **kw):
+        """Records new options of the item."""
+        update = self._update(item_id)
+        if cnf:
+            update.options.update(cnf)
+        update.options.update(kw)
+
+    itemconfigure = itemconfig
+
+    def delete(self, item_id):
+        """Records deletion of the item."""
+        update = self._update(item_id)
+        update.coords = None
+        update.dx = update.dy = 0
+        update.options.clear()
+        update.deleted = True
+
+    def commands(self):
+        """Returns recorded updates as a list of canvas subcommands."""
+        commands = []
+        for item_id, update in (entry for updates in self.sealed + [self.updates] for entry in updates.items()):
+            if update.deleted:
+                commands.append(('delete', item_id))
+                continue
+            if update.coords is not None:
+                commands.append(('coords', item_id) + update.coords)
+            if update.dx or update.dy:
+                commands.append(('move', item_id, update.dx, update.dy))
+            if update.options:
+                commands.append(('itemconfigure', item_id) + self.canvas._options(update.options))
+        return commands
+
+    def evaluate(self, commands):
+        """Runs canvas subcommands with a single Tcl call and returns their results.
+
+        The subcommands are run right away, pending updates are not flushed.
+
+        Returns:
+            A tuple with the result of each subcommand."""
+        if not commands:
+            return ()
+        return self.backend.evaluate(commands)
+
+    def split(self, result):
+        """Returns a list result of evaluate, e.g. coordinates or a bounding box, as a tuple."""
+        return self.backend.split(result)
+
+    def flush(self):
+        """Applies all recorded updates with a single Tcl call.
+
+        Returns:
+            The number of canvas subcommands that were run."""
+        commands = self.commands()
+        self.updates = {}
+        self.sealed = []
+        if not commands:
+            return 0
+        self.backend.run(commands)
+        return len(commands)
@@ -1,11 +1,29 @@
 """This is a wrapper for tk.Canvas class."""
 
 import tkinter as tk
-from collections import defaultdict
+from contextlib import contextmanager
 
 from . import items
+from .aio import APPLIED, AsyncBridge, TkDriver
+from .animation import Animator
+from .backends import BACKENDS, as_backend
+from .batch import Batch
+from .collection import ItemCollection, ItemView, coordinate_rows
+from .events import EventDispatcher
+from .groups import Group, SceneGraph
+from .images import ImageCache
+from .listeners import Notifier
+from .profiling import Profiler
+from .registry import ItemRegistry
+from .scene import load_scene, save_scene
+from .scheduler import FrameScheduler
+from .spatial import SpatialIndex
+from .stacking import StackingOrder
+from .svg import export_svg
+from .tags import TagIndex
+from .threads import ThreadSafeCanvas
+from .virtual import VirtualCanvas
 
-#TODO: bbox, delete
 
 class BetterCanvas():
     """Wrapper for tk.Canvas."""
@@ -20,10 +38,43 @@ class BetterCanvas():
         "tkraise", "type",
     ])
 
-    def __init__(self, master=None, **kw):
-        """Create a BetterCanvas widget with parent master."""
-        self.canvas = tk.Canvas(master=master, **kw)
-        self.items = defaultdict(lambda : None)
+    def __init__(self, master=None, weak_items=False, backend=None, **kw):
+        """Create a BetterCanvas widget with parent master.
+
+        Args:
+            weak_items (bool): Hold created items weakly,
+                items that are not referenced elsewhere are dropped from self.items.
+            backend: Canvas class or its name from backends.BACKENDS, tk.Canvas by default.
+                Use "memory" for a MemoryCanvas that needs no display.
+                Bulk subcommands and timers go through self.backend, a TkBackend for a tk.Canvas.
+        """
+        if backend is None:
+            backend = tk.Canvas
+        elif isinstance(backend, str):
+            try:
+                backend = BACKENDS[backend]
+            except KeyError:
+                raise ValueError(f"Unknown backend {backend}, use one of {', '.join(BACKENDS)}.") from None
+        self.canvas = backend(master=master, **kw)
+        self.backend = as_backend(self.canvas)
+        self.items = ItemRegistry(weak=weak_items)
+        self.listeners = []
+        self.spatial_index = None
+        self.dispatcher = None
+        self.image_cache = None
+        self.thread_queue = None
+        self.tag_index = None
+        self.stacking = None
+        self.scene_graph = None
+        self.virtual = None
+        self.async_bridge = AsyncBridge(self)
+        self.scheduler = None
+        self.animator = Animator(self)
+        self.profiler = None
+        self._batch = None
+        self._direct = None
+        self._fast = None
+        self._notifier = Notifier(self)
         super().__init__()
 
     def __getattr__(self, name):
@@ -35,6 +86,124 @@ class BetterCanvas():
         else:
             raise AttributeError(f"{self} has no attribute {name}")
 
+    @property
+    def _target(self):
+        """Object that receives item commands, the open batch or the canvas.
+
+        When there are listeners the commands go through a Notifier first."""
+        if self.listeners:
+            return self._notifier
+        if self._batch is None:
+            direct_canvas = self._direct
+            return direct_canvas if direct_canvas is not None else self.direct_canvas
+        return self._batch
+
+    @property
+    def direct_canvas(self):
+        """DirectCanvas that calls Tcl directly for frequent item commands, created on first use.
+
+        It is self.canvas itself for canvas backends other than tk.Canvas.
+        Items call its Tcl command right away through self._fast when no batch is open and nothing listens."""
+        if self._direct is None:
+            self._direct = self.backend.direct()
+            self._fast = self._direct if self._direct is not self.canvas else None
+        return self._direct
+
+    def _reset_direct(self):
+        """Drops the DirectCanvas, e.g. after the Tcl interpreter of the canvas was replaced."""
+        self._direct = None
+        self._fast = None
+
+    @contextmanager
+    def batch(self):
+        """Context manager that applies item updates with a single Tcl call.
+
+        Moves, coords assignments, option assignments and deletes of items
+        created by this canvas are recorded inside the with block
+        and flushed together when it is left.
+        Nested batches are merged into the outermost one.
+        When the with block raises, updates recorded before are still applied
+        and the exception of the block is raised, not an error of applying them.
+
+        Example:
+            with canvas.batch():
+                for item in items:
+                    item.move(10, 0)
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+        self._batch = Batch(self.canvas, self.direct_canvas)
+        try:
+            yield self._batch
+        except BaseException:
+            batch, self._batch = self._batch, None
+            try:
+                batch.flush()
+            except tk.TclError:
+                pass
+            raise
+        batch, self._batch = self._batch, None
+        batch.flush()
+
+    def flush(self):
+        """Applies updates recorded by the open batch right away.
+
+        Returns:
+            An awaitable, so coroutines may await canvas.flush(), updates are already applied when it returns.
+        """
+        if self._batch is not None:
+            self._batch.flush()
+        return APPLIED
+
+    def next_frame(self):
+        """Returns an asyncio future resolved after updates of the next frame were applied.
+
+        The frame scheduler is started if needed. Call it from a coroutine.
+
+        Example:
+            item.move(10, 0)
+            await canvas.next_frame()
+
+        Returns:
+            Future of the number of canvas subcommands run by the frame.
+        """
+        return self.async_bridge.next_frame()
+
+    async def create_many_async(self, item_type, coords, **options) -> ItemCollection:
+        """Creates many items at the start of the next frame, see create_many for the arguments.
+
+        Requests of all coroutines made between two frames are created together,
+        with one Tcl call per item type and set of option names.
+
+        Returns:
+            ItemCollection of the new items.
+        """
+        rows = coordinate_rows(coords, item_type.coords_length)
+        return await self.async_bridge.create_many(item_type, rows, options)
+
+    async def run_async(self, widget=None, min_interval=0.001, max_interval=0.02):
+        """Processes Tk events from the running asyncio loop until the widget is destroyed, instead of mainloop.
+
+        Example:
+            async def main():
+                canvas = BetterCanvas(root)
+                asyncio.create_task(read_stream(canvas))
+                await canvas.run_async(root)
+
+        Args:
+            widget: Widget whose destruction ends the loop, the top level widget of the canvas by default.
+            min_interval: Sleep in seconds after Tk processed events.
+            max_interval: Longest sleep in seconds while Tk is idle.
+        """
+        if widget is None:
+            widget = self.canvas.winfo_toplevel()
+        driver = self.async_bridge.driver = TkDriver(widget, self, min_interval, max_interval)
+        try:
+            await driver.run()
+        finally:
+            self.async_bridge.driver = None
+
     def create_rectangle(self, *bbox, **options) -> items.Rectangle:
         return self.create_item(items.Rectangle, *bbox, **options)
 
@@ -62,6 +231,17 @@ class BetterCanvas():
     def create_window(self, *position, **options) -> items.Window:
         return self.create_item(items.Window, *position, **options)        
 
+    def create_group(self, *children, tag=None) -> Group:
+        """Returns a new group of items and nested groups, the scene graph is started if needed.
+
+        Args:
+            children: Items and groups put into the group.
+            tag: Tag shared by the items of the group, a new one when None.
+        """
+        if self.scene_graph is None:
+            self.use_scene_graph()
+        return Group(self.scene_graph, children, tag)
+
     def create_item(self, item_type, *args, **kwargs) -> items.Item:
         """Returns new item of the given type.
 
@@ -69,18 +249,444 @@ class BetterCanvas():
             item_type: type of the item that will be created.
         """
         item = item_type(self.canvas, *args, **kwargs)
-        self.items[item.id] = item
+        item.better_canvas = self
+        self.items.add(item)
+        options = item_type.get_create_options(**kwargs)
+        if item.option_cache and len(item._options or ()) < len(options):
+            # Some values are only known to Tk.
+            self.items.stale.add(item.id)
+        if self.listeners:
+            for listener in self.listeners:
+                listener.created(item.id, item_type, args, options)
         return item
 
+    def create_many(self, item_type, coords, **options) -> ItemCollection:
+        """Creates many items of the given type with a single Tcl call.
+
+        Args:
+            item_type: type of the items that will be created.
+            coords: Coordinates of the items, an (N, k) array with a row per item.
+                NumPy arrays, memoryviews and nested sequences are accepted.
+                A flat sequence or array is split into rows of item_type.coords_length values.
+            options: Options from item_type.config_options.
+                A list or an array of length N gives a value to each item,
+                any other value, including tuples, is shared by all items.
+        Returns:
+            ItemCollection of the new items, their instances are created on access.
+        """
+        other_options = item_type.get_other_options(**options)
+        if other_options:
+            raise TypeError(f"create_many accepts only options of {item_type.__name__}, got {', '.join(other_options)}.")
+        rows = coordinate_rows(coords, item_type.coords_length)
+        shared_options = {}
+        item_options = {}
+        for option, value in options.items():
+            if isinstance(value, list) or hasattr(value, 'tolist'):
+                values = value.tolist() if hasattr(value, 'tolist') else value
+                if len(values) != len(rows):
+                    raise ValueError(f"Option {option} has {len(values)} values for {len(rows)} items.")
+                item_options[option] = values
+            else:
+                shared_options[option] = value
+        if not rows:
+            return ItemCollection(self, item_type, (), **shared_options)
+        ids = self.backend.create_rows(item_type.tk_type, rows, shared_options, item_options)
+
+        collection = ItemCollection(self, item_type, ids, **shared_options)
+        self.items.add_collection(collection)
+        if set(item_options) - {'tags'} or len(item_type.cached_options(shared_options)) < len(shared_options):
+            self.items.stale.update(ids)
+        for listener in self.listeners:
+            for index, (item_id, row) in enumerate(zip(ids, rows)):
+                own_options = {option : values[index] for option, values in item_options.items()}
+                listener.created(item_id, item_type, row, dict(shared_options, **own_options))
+        return collection
+
+    def use_spatial_index(self, cell_size=64) -> SpatialIndex:
+        """Answers find_overlapping, find_enclosed and find_closest on the Python side.
+
+        The index follows items created and changed through this canvas
+        and tests rectangles, ovals, lines and polygons as Tk does, other items by their bounding boxes.
+        Changes made to self.canvas directly are not seen by it.
+
+        Args:
+            cell_size: Size of grid cells in canvas units,
+                about the size of a typical item works best.
+        Returns:
+            The new SpatialIndex.
+        """
+        index = SpatialIndex(self, cell_size)
+        if self.stacking is not None:
+            index.order_key = self.stacking.order_key
+        index.add_existing()
+        self.listeners.append(index)
+        self.spatial_index = index
+        return index
+
+    def use_tag_index(self) -> TagIndex:
+        """Answers find_withtag, Item.tags and tag counts on the Python side.
+
+        The index follows tags of items created through this canvas, tags assignments,
+        add_tag, remove_tag and deletes. Changes made to self.canvas directly are not seen by it.
+
+        Returns:
+            The new TagIndex.
+        """
+        index = TagIndex(self)
+        if self.stacking is not None:
+            index.order_key = self.stacking.order_key
+        if self.virtual is not None:
+            index.foreign.update(self.virtual.tags)
+        index.add_existing()
+        self.listeners.append(index)
+        self.tag_index = index
+        return index
+
+    def use_stacking_order(self) -> StackingOrder:
+        """Keeps the stacking order of items on the Python side, in named layers.
+
+        Afterwards find_above and find_below need no Tcl call, Item.raise_above and Item.lower_below
+        keep items in their layers and the spatial and tag indexes and the scene graph return items in stacking order.
+
+        Example:
+            stacking = canvas.use_stacking_order()
+            stacking.add_layer('selection')
+            stacking.set_layer(canvas.find_withtag('selected'), 'selection')
+
+        Returns:
+            The new StackingOrder, items already on the canvas are put into its "default" layer.
+        """
+        stacking = StackingOrder(self)
+        stacking.add_existing()
+        self.listeners.append(stacking)
+        self.stacking = stacking
+        for index in (self.spatial_index, self.tag_index, self.scene_graph):
+            if index is not None:
+                index.order_key = stacking.order_key
+        return stacking
+
+    def use_scene_graph(self) -> SceneGraph:
+        """Keeps groups of items created with create_group and caches bounding boxes of their items.
+
+        Afterwards Item.bbox is answered from the cache, which is kept up to date
+        with moves, coords assignments, scaling, geometry options and deletes made through this canvas.
+
+        Example:
+            room = canvas.create_group(floor, *furniture)
+            room.move(100, 0)
+            canvas.scene_graph.find_at(120, 40)
+
+        Returns:
+            The new SceneGraph.
+        """
+        scene_graph = SceneGraph(self)
+        if self.stacking is not None:
+            scene_graph.order_key = self.stacking.order_key
+        self.listeners.append(scene_graph)
+        self.scene_graph = scene_graph
+        return scene_graph
+
+    def use_event_dispatcher(self) -> EventDispatcher:
+        """Routes events of items from a single canvas binding per event sequence.
+
+        Afterwards tag_bind and Item.bind register callbacks with the dispatcher
+        instead of creating a Tcl command for every binding,
+        and callbacks of items deleted through this canvas are dropped.
+        Bindings made before are kept.
+
+        Returns:
+            The EventDispatcher, the existing one when it is already used.
+        """
+        if self.dispatcher is None:
+            self.dispatcher = EventDispatcher(self)
+            self.listeners.append(self.dispatcher)
+        return self.dispatcher
+
+    def use_image_cache(self, budget=64 * 2 ** 20, workers=4) -> ImageCache:
+        """Shares decoded images between image items and keeps them alive.
+
+        Example:
+            tile = canvas.image_cache.get('tiles/0_0.png')
+            canvas.create_image(0, 0, image=tile, anchor='nw')
+            canvas.image_cache.create_image(256, 0, 'tiles/1_0.png', anchor='nw')
+
+        Args:
+            budget: Memory in bytes the images may take, unused ones are dropped above it.
+            workers: Number of threads decoding images loaded in the background.
+        Returns:
+            The ImageCache, the existing one when it is already used.
+        """
+        if self.image_cache is None:
+            self.image_cache = ImageCache(self, budget, workers)
+            self.listeners.append(self.image_cache)
+        return self.image_cache
+
+    def threadsafe(self, interval=10) -> ThreadSafeCanvas:
+        """Returns a stand-in for this canvas that worker threads may use.
+
+        Its create_* methods and the items they return queue commands without blocking,
+        the Tk thread applies them every interval milliseconds.
+        Call it first on the Tk thread, on other canvas backends call drain of the result instead.
+
+        Example:
+            threadsafe = canvas.threadsafe()
+            # In a worker thread:
+            marker = threadsafe.create_oval(0, 0, 10, 10, fill='red')
+            marker.move(5, 0)
+            marker.fill = 'blue'
+
+        Returns:
+            The ThreadSafeCanvas, the existing one when it was already created.
+        """
+        if self.thread_queue is None:
+            self.thread_queue = ThreadSafeCanvas(self, interval)
+            if self.backend.event_loop:
+                self.thread_queue.start()
+        return self.thread_queue
+
+    def use_virtual_canvas(self, margin=256, cell_size=256, pool_size=1000) -> VirtualCanvas:
+        """Shows a scene of logical items by keeping canvas items only for those near the view.
+
+        Add logical items to the result instead of creating items, see VirtualCanvas.
+        On a Tk canvas the scene follows scrolling, configure scrollbars before calling it,
+        on other canvas backends call update of the result with the viewport.
+
+        Example:
+            scene = canvas.use_virtual_canvas()
+            scene.add_many(bc.Rectangle, rooms, fill='white')
+
+        Args:
+            margin: Distance in canvas units around the view where items are shown too.
+            cell_size: Size of cells of the spatial index in canvas units.
+            pool_size: Number of hidden canvas items kept for reuse.
+        Returns:
+            The new VirtualCanvas, a previous one is stopped and cleared.
+        """
+        if self.virtual is not None:
+            self.virtual.stop()
+            self.virtual.clear()
+        self.virtual = VirtualCanvas(self, margin, cell_size, pool_size)
+        if self.backend.event_loop:
+            self.virtual.start()
+        return self.virtual
+
+    def use_frame_scheduler(self, fps=60) -> FrameScheduler:
+        """Starts applying item updates once per frame instead of right away.
+
+        Updates are coalesced per item and flushed with a single Tcl call
+        from a canvas.after callback, see FrameScheduler.
+        A running scheduler is stopped and replaced, its frame callbacks are moved to the new one.
+
+        Args:
+            fps: Target number of frames per second.
+        Returns:
+            The started FrameScheduler.
+        """
+        previous = self.scheduler
+        if previous is not None:
+            previous.stop()
+        scheduler = FrameScheduler(self, fps)
+        if previous is not None:
+            scheduler.callbacks = previous.callbacks
+            scheduler.flushed = previous.flushed
+        scheduler.start()
+        self.scheduler = scheduler
+        return scheduler
+
+    def _frames(self) -> FrameScheduler:
+        """Returns the running frame scheduler, to hook callbacks into its frames.
+
+        When none runs, a scheduler that doesn't defer other updates is started,
+        it stops by itself once its callbacks are removed."""
+        if self.scheduler is None or not self.scheduler.running:
+            scheduler = FrameScheduler(self, defer=False)
+            if self.scheduler is not None:
+                scheduler.callbacks = self.scheduler.callbacks
+                scheduler.flushed = self.scheduler.flushed
+            scheduler.start()
+            self.scheduler = scheduler
+        return self.scheduler
+
+    def use_profiler(self, samples=10000, callers=False) -> Profiler:
+        """Starts measuring every Tcl call made by the canvas and its items.
+
+        A running profiler is uninstalled and replaced. Measurements are returned by stats.
+
+        Args:
+            samples: Number of latest latencies kept per call site for percentiles.
+            callers (bool): Add the calling code location to call site names.
+        Returns:
+            The installed Profiler, add exporters to it to receive every measured call.
+        """
+        if self.profiler is not None:
+            self.profiler.uninstall()
+        profiler = Profiler(samples, callers)
+        profiler.install(self.canvas)
+        self.profiler = profiler
+        self._reset_direct()
+        return profiler
+
+    @contextmanager
+    def profile(self, callers=False):
+        """Context manager that measures Tcl calls made inside the with block.
+
+        It can be used together with use_profiler, both see the calls.
+
+        Example:
+            with canvas.profile() as profiler:
+                redraw()
+            print(profiler.stats())
+        """
+        profiler = Profiler(callers=callers)
+        profiler.install(self.canvas)
+        self._reset_direct()
+        try:
+            yield profiler
+        finally:
+            profiler.uninstall()
+            self._reset_direct()
+
+    def stats(self):
+        """Returns a snapshot of measurements of the profiler started by use_profiler.
+
+        Returns:
+            {call site : {"count", "total", "p50", "p99", "bytes"}}, empty when no profiler runs."""
+        if self.profiler is None:
+            return {}
+        return self.profiler.stats()
+
+    def animate(self, items, duration=0.5, easing='linear', on_done=None, **targets):
+        """Animates coordinates or options of many items together.
+
+        Values of all running animations are flushed once per frame with a single Tcl call,
+        the frame scheduler is started if needed. See Animator.animate for the arguments.
+
+        Example:
+            tween = canvas.animate(rectangles, duration=1, easing='ease_out', move=(100, 0), fill='red')
+            tween.then(move=(-100, 0), on_done=lambda tween: print('done'))
+
+        Returns:
+            The started Tween.
+        """
+        return self.animator.animate(items, duration, easing, on_done, **targets)
+
+    def save_scene(self, path):
+        """Writes all items to a compact binary scene file.
+
+        Options are taken from the Python side where they are known,
+        so saving a scene created through this canvas takes two Tcl calls whatever the number of items.
+        See scene.save_scene.
+
+        Returns:
+            The saved SceneSnapshot.
+        """
+        return save_scene(self, path)
+
+    def load_scene(self, path, clear=True):
+        """Creates all items of a scene file written by save_scene with a single Tcl call.
+
+        Args:
+            path: Path of the scene file.
+            clear: Delete all items of the canvas first.
+        Returns:
+            SceneCollection of the new items in stacking order, their instances are created on access.
+        """
+        return load_scene(self, path, clear)
+
+    def export_svg(self, file, chunk_size=1000):
+        """Writes all items to an SVG document in stacking order.
+
+        Items are read and written in chunks, each chunk with a single Tcl call,
+        so exporting a large scene neither blocks on one huge string nor grows memory.
+        See svg.SvgExporter for what is exported.
+
+        Args:
+            file: A writable text file-like object or a path.
+            chunk_size: Number of items read with a single Tcl call.
+        Returns:
+            The number of exported items.
+        """
+        return export_svg(self, file, chunk_size)
+
+    def _get_item(self, item_id):
+        """Returns the item for a single item result of a canvas method.
+
+        Canvas methods return an empty tuple or string when nothing was found,
+        a tuple with one id or the id itself otherwise.
+        Items that are not registered, e.g. dropped from a weak registry
+        or created directly on self.canvas, are created from their type in Tk and registered."""
+        if isinstance(item_id, tuple):
+            item_id = item_id[0] if item_id else None
+        if item_id is None or item_id == '':
+            return None
+        item_id = int(item_id)
+        item = self.items.get(item_id)
+        if item is None:
+            item = self._materialize(item_id)
+        return item
+
+    def _materialize(self, item_id):
+        """Creates and registers an instance for an item that exists only in Tk.
+
+        Returns None when there is no such item."""
+        self.flush()
+        item_type = items.ITEM_TYPES.get(self.canvas.type(item_id))
+        if item_type is None:
+            return None
+        item = item_type.from_id(self.canvas, item_id)
+        item.better_canvas = self
+        self.items.add(item)
+        self.items.stale.add(item_id)
+        return item
+
+    def delete(self, *tags):
+        """Deletes items from the canvas and forgets them.
+
+        Args:
+            tags: Items, item ids or tags, "all" deletes every item.
+        """
+        with self.batch():
+            for tag in tags:
+                if isinstance(tag, items.Item):
+                    tag = tag.id
+                if tag == 'all':
+                    self.items.clear()
+                elif isinstance(tag, int):
+                    self.items.discard(tag)
+                else:
+                    for item_id in self._find_ids(tag):
+                        self.items.discard(item_id)
+                self._target.delete(tag)
+
+    def bbox(self, *tags):
+        """Returns the bounding box of all given items, as a 4-tuple, or None when none were found.
+
+        Args:
+            tags: Items, item ids or tags.
+        """
+        return self._target.bbox(*(tag.id if isinstance(tag, items.Item) else tag for tag in tags))
+
+    def _stacking_answers(self, item_id):
+        """Whether the stacking order knows the item and every item it may be stacked next to.
+
+        Canvas items of the virtual canvas are not ordered, with any of them Tk is asked."""
+        if self.stacking is None or item_id not in self.stacking:
+            return False
+        return self.virtual is None or not (self.virtual.shown or self.virtual.pooled)
+
     def find_above(self, item: items.Item) -> items.Item:
         """Returns the item just above the given item or None when none were found."""
-        above_id = self.canvas.find_above(item.od)
-        return self.items[above_id]
+        if self._stacking_answers(item.id):
+            return self._get_item(self.stacking.find_above(item.id))
+        above_id = self._target.find_above(item.id)
+        return self._get_item(above_id)
 
     def find_below(self, item: items.Item) -> items.Item:
         """Returns the item just below the given item or None when none were found."""
-        below_id = self.canvas.find_below(item.od)
-        return self.items[below_id]
+        if self._stacking_answers(item.id):
+            return self._get_item(self.stacking.find_below(item.id))
+        below_id = self._target.find_below(item.id)
+        return self._get_item(below_id)
 
     def find_closest(self, x, y, halo=None, start=None) -> items.Item:
         """Returns the item closest to the given position. 
@@ -97,8 +703,11 @@ class BetterCanvas():
             start: Optional start item.
         Returns:
             Item instance. """
-        item_id = self.canvas.find_closest(x, y, halo, start)
-        return self.items[item_id]
+        if self.spatial_index is not None and start is None:
+            item_id = self.spatial_index.find_closest(x, y, halo)
+        else:
+            item_id = self._target.find_closest(x, y, halo, start)
+        return self._get_item(item_id)
     
     def find_enclosed(self, x1, y1, x2, y2):
         """Finds all items completely enclosed by the rectangle (x1, y1, x2, y2).
@@ -109,9 +718,12 @@ class BetterCanvas():
             x2: Right edge.
             y2: Lower edge.
         Returns:
-            A tuple containing all matching items. """
-        item_ids = self.canvas.find_enclosed(x1, y1, x2, y2)
-        return tuple(self.items[item_id] for item_id in item_ids)
+            An ItemView of all matching items. """
+        if self.spatial_index is not None:
+            item_ids = self.spatial_index.find_enclosed(x1, y1, x2, y2)
+        else:
+            item_ids = self._target.find_enclosed(x1, y1, x2, y2)
+        return ItemView(self, item_ids)
     
     
     def find_overlapping(self, x1, y1, x2, y2):
@@ -123,32 +735,131 @@ class BetterCanvas():
             x2: Right edge.
             y2: Lower edge.
         Returns:
-            A tuple containing all matching items. """
-        item_ids = self.canvas.find_overlapping(x1, y1, x2, y2)
-        return tuple(self.items[item_id] for item_id in item_ids)
+            An ItemView of all matching items. """
+        if self.spatial_index is not None:
+            item_ids = self.spatial_index.find_overlapping(x1, y1, x2, y2)
+        else:
+            item_ids = self._target.find_overlapping(x1, y1, x2, y2)
+        return ItemView(self, item_ids)
 
     
     def find_withtag(self, tag):
-        """Finds all items having the given tag."""
-        item_ids = self.canvas.find_withtag(tag)
-        return tuple(self.items[item_id] for item_id in item_ids)
+        """Finds all items having the given tag.
+
+        Returns:
+            An ItemView of all matching items, their instances are created when accessed."""
+        item_ids = self._find_ids(tag)
+        return ItemView(self, item_ids)
+
+    def _find_ids(self, tag):
+        """Returns ids of items with the tag, from the tag index or the scene graph when they can answer."""
+        if self.tag_index is not None and self.tag_index.answers(tag):
+            return self.tag_index.find_withtag(tag)
+        if self.scene_graph is not None and self.scene_graph.answers(tag):
+            return self.scene_graph.find_withtag(tag)
+        return self._target.find_withtag(tag)
+
+    def _recorded_ids(self, tag):
+        """Returns ids of items a command recorded by the open batch may change, without flushing it.
+
+        Items whose tags the batch changes are included, whether they have the tag is known only once it's applied."""
+        if self._batch is None:
+            return self._find_ids(tag)
+        for index in (self.tag_index, self.scene_graph):
+            if index is not None and index.answers(tag):
+                return index.find_withtag(tag)
+        item_ids = self.direct_canvas.find_withtag(tag)
+        return list(item_ids) + [item_id for item_id in self._batch.retagged() if item_id not in item_ids]
+
+    @staticmethod
+    def _ids_of(targets):
+        """Returns ids of items given as Items, ids or an ItemView."""
+        ids = getattr(targets, 'ids', None)
+        if ids is not None:
+            deleted = getattr(targets, 'deleted', ())
+            return [item_id for item_id in ids if item_id not in deleted]
+        return [target.id if isinstance(target, items.Item) else target for target in targets]
+
+    def add_tag(self, tag, targets):
+        """Adds the tag to many items with a single Tcl call.
+
+        Pending updates of an open batch are applied first.
+
+        Args:
+            tag (str): Tag to add.
+            targets: Items, item ids, an ItemView or an ItemCollection.
+        """
+        item_ids = self._ids_of(targets)
+        self.flush()
+        self.backend.evaluate([('addtag', tag, 'withtag', item_id) for item_id in item_ids])
+        self._tags_changed(item_ids)
+        for listener in self.listeners:
+            listener.tags_added(item_ids, tag)
+
+    def remove_tag(self, tag, targets):
+        """Removes the tag from many items with a single Tcl call.
+
+        Pending updates of an open batch are applied first.
+
+        Args:
+            tag (str): Tag to remove.
+            targets: Items, item ids, an ItemView or an ItemCollection.
+        """
+        item_ids = self._ids_of(targets)
+        self.flush()
+        self.backend.evaluate([('dtag', item_id, tag) for item_id in item_ids])
+        self._tags_changed(item_ids)
+        for listener in self.listeners:
+            listener.tags_removed(item_ids, tag)
+
+    def _tags_changed(self, item_ids):
+        """Drops cached tags of the items."""
+        self.items.stale.update(item_ids)
+        for item_id in item_ids:
+            if item_id in self.items:
+                self.items[item_id].invalidate_options('tags')
 
     def focus(self):
         """Returns the item that currently has focus or None if no item has focus."""
-        item_id = self.canvas.focus()
-        return self.items[item_id]
+        item_id = self._target.focus()
+        return self._get_item(item_id)
 
     def tag_bind(self, tag, event, callback, add=False):
         """Adds event to multiple items that have the specified tag.
-        
+
+        When the event dispatcher is used, the callback is registered with it.
+
         Args:
             event (str): Event descriptor.
             callback (callable): Callable to bind to the event.
             add (bool): Add new binding to any existing bindings or replace them, defaults to replace.
         """
 
+        if self.dispatcher is not None:
+            self.dispatcher.bind(tag, event, callback, add)
+            return
         if add:
             add = "+"
         else:
             add = None
         self.canvas.tag_bind(tag, event, callback, add)
+
+    def tag_config(self, tag, **options):
+        """Sets options of multiple items that have the specified tag.
+
+        Cached options of the affected items are invalidated,
+        so the next read asks Tk for the new values.
+        Inside a batch the options are set after updates recorded before,
+        and the batch is not flushed to find the items.
+
+        Args:
+            tag (str): Tag of the items.
+            options: {option : value}.
+        """
+        item_ids = self._recorded_ids(tag)
+        self._target.itemconfig(tag, options)
+        for item_id in item_ids:
+            self.items.stale.add(item_id)
+            if item_id in self.items:
+                self.items[item_id].invalidate_options(*options)
+
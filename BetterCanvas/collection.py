@@ -0,0 +1,147 @@
+"""This module contains compact sequences of items backed by arrays of their ids."""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+
+class ItemView(Sequence):
+    """Read-only sequence of items backed by an array of their ids.
+
+    find_* methods of BetterCanvas return views, so a query over many items
+    does not create an Item instance for each of them.
+    Items are looked up when they are accessed, unknown ones are created from their type in Tk.
+    A view compares equal to a sequence of the same items.
+    """
+
+    def __init__(self, better_canvas, ids):
+        """Creates a view of the items with the given ids.
+
+        Args:
+            better_canvas: BetterCanvas the items belong to.
+            ids: Ids of the items.
+        """
+        self.better_canvas = better_canvas
+        self.ids = array('q', ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ItemView(self.better_canvas, self.ids[index])
+        return self.materialize(self.ids[index])
+
+    def __contains__(self, item):
+        return getattr(item, 'id', item) in self.ids
+
+    def __eq__(self, other):
+        if isinstance(other, ItemView):
+            return self.ids == other.ids
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self)} items>"
+
+    def materialize(self, item_id):
+        """Returns the item with the given id, creating its instance if needed."""
+        return self.better_canvas._get_item(item_id)
+
+
+class ItemCollection(ItemView):
+    """Sequence of items of a single type backed by an array of their ids.
+
+    Item instances are created only when they are accessed
+    and are registered with the owning BetterCanvas at that point.
+    Slices share the set of deleted ids with the collection they were taken from.
+    """
+
+    def __init__(self, better_canvas, item_type, ids, **options):
+        """Creates a collection of items that already exist on the canvas.
+
+        Args:
+            better_canvas: BetterCanvas the items belong to.
+            item_type: Type of the items.
+            ids: Ids of the items in ascending order.
+            options: Options shared by all items, they fill the option cache.
+        """
+        self.better_canvas = better_canvas
+        self.item_type = item_type
+        self.ids = array('q', ids)
+        self.options = options
+        self.deleted = set()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            collection = ItemCollection(self.better_canvas, self.item_type, self.ids[index], **self.options)
+            collection.deleted = self.deleted
+            return collection
+        return self.materialize(self.ids[index])
+
+    def __contains__(self, item):
+        item_id = getattr(item, 'id', item)
+        position = bisect_left(self.ids, item_id)
+        return position < len(self.ids) and self.ids[position] == item_id
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self)} {self.item_type.__name__} items>"
+
+    def materialize(self, item_id):
+        """Returns the item with the given id, creating its instance if needed.
+
+        Returns None for items that were deleted."""
+        if item_id in self.deleted:
+            return None
+        registry = self.better_canvas.items
+        try:
+            return registry[item_id]
+        except KeyError:
+            options = {} if item_id in registry.stale else self.options
+            item = self.item_type.from_id(self.better_canvas.canvas, item_id, **options)
+            item.better_canvas = self.better_canvas
+            registry.add(item)
+            if len(item._options or ()) < len(options):
+                registry.stale.add(item_id)
+            return item
+
+    def known_options(self, item_id):
+        """Returns options of the item known on the Python side, the shared options in the form Tk reports them.
+
+        Returns None when some of them can't be cached, e.g. booleans."""
+        if not self.item_type.option_cache:
+            return None
+        options = self.item_type.cached_options(self.options)
+        return options if len(options) == len(self.options) else None
+
+    def discard(self, item_id):
+        """Marks the item with the given id as deleted."""
+        if item_id in self:
+            self.deleted.add(item_id)
+
+    def delete(self):
+        """Deletes all items of the collection from the canvas."""
+        self.better_canvas.delete(*(item_id for item_id in self.ids if item_id not in self.deleted))
+
+
+def coordinate_rows(coords, length):
+    """Returns coordinates as a list with a sequence of values per item.
+
+    Args:
+        coords: 2-dimensional array or sequence, or a flat one.
+        length: Number of values per item used to split flat coordinates.
+    """
+    if hasattr(coords, 'tolist'):
+        coords = coords.tolist()
+    else:
+        coords = list(coords)
+    if coords and not hasattr(coords[0], '__len__'):
+        if length is None:
+            raise TypeError("Flat coordinates can't be split for items without a fixed number of coordinates.")
+        if len(coords) % length != 0:
+            raise ValueError(f"Flat coordinates must have a multiple of {length} values. {len(coords)} were given.")
+        coords = [coords[index:index + length] for index in range(0, len(coords), length)]
+    return coords
@@ -0,0 +1,101 @@
+"""This module contains the DirectCanvas class that runs frequent item commands with tk.call directly."""
+
+import tkinter as tk
+
+from . import items
+
+# "-name" of every item option, looked up instead of built on every call.
+FLAGS = {name: '-' + name for item_type in items.ITEM_TYPES.values() for name in item_type.config_options}
+
+# Option value types Tcl takes without conversion.
+PLAIN_TYPES = (str, int, float)
+
+
+class DirectCanvas():
+    """Stand-in for a tk.Canvas that calls Tcl directly for move, coords, itemconfigure, itemcget, bbox,
+    gettags and find_* commands.
+
+    The widget path and the bound tk.call are looked up once when it is created,
+    and option names come from a precomputed table, instead of going through tkinter's generic wrappers.
+    Results are the same as those of tk.Canvas.
+    Option values other than strings and numbers, e.g. callables or tuples, use the tk.Canvas method,
+    as do all other methods.
+    """
+
+    __slots__ = ('canvas', '_call', '_path', '_splitlist', '_getint', '_getdouble')
+
+    def __init__(self, canvas: tk.Canvas):
+        interpreter = canvas.tk
+        self.canvas = canvas
+        self._call = interpreter.call
+        self._path = canvas._w
+        self._splitlist = interpreter.splitlist
+        self._getint = interpreter.getint
+        self._getdouble = interpreter.getdouble
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {self._path}>"
+
+    def __getattr__(self, name):
+        """Forward attribute look up to the canvas."""
+        return getattr(self.canvas, name)
+
+    def move(self, tag, dx, dy):
+        self._call(self._path, 'move', tag, dx, dy)
+
+    def coords(self, tag, *coords):
+        if coords:
+            self._call(self._path, 'coords', tag, *tk._flatten(coords))
+            return []
+        return [self._getdouble(value) for value in self._splitlist(self._call(self._path, 'coords', tag))]
+
+    def itemconfigure(self, tag, cnf=None, **kw):
+        options = dict(cnf, **kw) if cnf and kw else (cnf or kw)
+        if not options:
+            return self.canvas.itemconfigure(tag)
+        args = []
+        for name, value in options.items():
+            if value is None:
+                continue
+            flag = FLAGS.get(name)
+            if flag is None or type(value) not in PLAIN_TYPES:
+                return self.canvas.itemconfigure(tag, options)
+            args += (flag, value)
+        self._call(self._path, 'itemconfigure', tag, *args)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, tag, option):
+        return self._call(self._path, 'itemcget', tag, FLAGS.get(option) or '-' + option)
+
+    def bbox(self, *tags):
+        result = self._call(self._path, 'bbox', *tags)
+        return tuple(map(self._getint, self._splitlist(result))) if result else None
+
+    def gettags(self, tag):
+        return self._splitlist(self._call(self._path, 'gettags', tag))
+
+    def _find(self, *args):
+        result = self._call(self._path, 'find', *args)
+        return tuple(map(self._getint, self._splitlist(result))) if result else ()
+
+    def find_all(self):
+        return self._find('all')
+
+    def find_withtag(self, tag):
+        return self._find('withtag', tag)
+
+    def find_above(self, tag):
+        return self._find('above', tag)
+
+    def find_below(self, tag):
+        return self._find('below', tag)
+
+    def find_closest(self, x, y, halo=None, start=None):
+        return self._find('closest', x, y, halo, start)
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        return self._find('overlapping', x1, y1, x2, y2)
+
+    def find_enclosed(self, x1, y1, x2, y2):
+        return self._find('enclosed', x1, y1, x2, y2)
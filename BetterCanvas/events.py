@@ -0,0 +1,167 @@
+"""This module contains EventDispatcher that routes canvas events to callbacks of items and tags."""
+
+from .listeners import CanvasListener
+
+# Item events synthesized from pointer motion, Tk sends them to the canvas widget as a whole.
+HOVER_EVENTS = ('<Enter>', '<Leave>')
+# Canvas events that track the item under the pointer.
+HOVER_SEQUENCES = ('<Motion>', '<Enter>', '<Leave>')
+
+
+class EventDispatcher(CanvasListener):
+    """Routes events of a canvas to callbacks of items and tags kept in Python dictionaries.
+
+    A single binding of the canvas widget is installed per event sequence,
+    instead of a Tcl command per bound item.
+    The item under the pointer is the Tk "current" item,
+    or the topmost item from the spatial index when the canvas uses one.
+    As with tag_bind, callbacks of the tag "all" are called first, then callbacks of tags of the item
+    and then callbacks of the item itself, a callback returning "break" stops the rest.
+    Enter and Leave of items are synthesized from pointer motion.
+    Callbacks of an item are removed when the item is deleted through the BetterCanvas.
+    Callbacks get the Tk event with an extra item attribute.
+    """
+
+    def __init__(self, better_canvas):
+        """Creates a dispatcher without callbacks.
+
+        Args:
+            better_canvas: BetterCanvas whose events are dispatched.
+        """
+        self.better_canvas = better_canvas
+        self.item_callbacks = {}
+        self.tag_callbacks = {}
+        self.hover = None
+        self._bindings = {}
+
+    def __len__(self):
+        """Returns the number of bound callbacks."""
+        return sum(len(callbacks) for targets in (self.item_callbacks, self.tag_callbacks)
+                   for callbacks_by_target in targets.values() for callbacks in callbacks_by_target.values())
+
+    def bind(self, tag, sequence, callback, add=False):
+        """Adds a callback of the event to an item or to items with a tag.
+
+        Args:
+            tag: Item id or tag.
+            sequence (str): Event descriptor.
+            callback (callable): Callable called with the event.
+            add (bool): Add the callback to existing ones or replace them, defaults to replace.
+        """
+        targets = (self.item_callbacks if isinstance(tag, int) else self.tag_callbacks).setdefault(sequence, {})
+        if add:
+            targets.setdefault(tag, []).append(callback)
+        else:
+            targets[tag] = [callback]
+        for widget_sequence in (HOVER_SEQUENCES if sequence in HOVER_EVENTS else (sequence, )):
+            if widget_sequence not in self._bindings:
+                handler = lambda event, widget_sequence=widget_sequence: self.handle(widget_sequence, event)
+                self._bindings[widget_sequence] = self.better_canvas.canvas.bind(widget_sequence, handler, '+')
+
+    def unbind(self, tag, sequence, callback=None):
+        """Removes a callback of the event, or all callbacks of the item or tag when callback is None."""
+        targets = (self.item_callbacks if isinstance(tag, int) else self.tag_callbacks).get(sequence, {})
+        if callback is None:
+            targets.pop(tag, None)
+        elif callback in targets.get(tag, ()):
+            targets[tag].remove(callback)
+            if not targets[tag]:
+                del targets[tag]
+
+    def clear(self):
+        """Removes all callbacks and the canvas bindings."""
+        self.item_callbacks.clear()
+        self.tag_callbacks.clear()
+        self.hover = None
+        backend = self.better_canvas.backend
+        for sequence, funcid in self._bindings.items():
+            backend.unbind(sequence, funcid)
+        self._bindings.clear()
+
+    def _bound(self, sequence):
+        """Whether any callback of the sequence exists."""
+        return bool(self.item_callbacks.get(sequence) or self.tag_callbacks.get(sequence))
+
+    def _resolve(self, event, with_tags):
+        """Returns the id of the item under the pointer or None, and its tags when asked for."""
+        canvas = self.better_canvas.canvas
+        backend = self.better_canvas.backend
+        index = self.better_canvas.spatial_index
+        if index is not None:
+            x, y = (float(value) for value in backend.evaluate((('canvasx', event.x), ('canvasy', event.y))))
+            item_ids = index.find_overlapping(x, y, x, y)
+            item_id = item_ids[-1] if item_ids else None
+            if item_id is None or not with_tags:
+                return item_id, ()
+            tags = self.better_canvas.tag_index.tags_of(item_id) if self.better_canvas.tag_index is not None else None
+            if tags is not None:
+                return item_id, tags
+            return item_id, tuple(map(str, backend.split(canvas.gettags(item_id))))
+        if not with_tags:
+            item_ids = canvas.find_withtag('current')
+            return (int(item_ids[0]) if item_ids else None), ()
+        item_ids, tags = backend.evaluate((('find', 'withtag', 'current'), ('gettags', 'current')))
+        item_ids = backend.split(item_ids)
+        if not item_ids:
+            return None, ()
+        return int(item_ids[0]), tuple(map(str, backend.split(tags)))
+
+    def handle(self, sequence, event):
+        """Dispatches an event of the canvas widget.
+
+        It is called by the canvas bindings, call it to feed events from elsewhere.
+
+        Returns:
+            "break" when a callback returned it.
+        """
+        hovering = sequence in HOVER_SEQUENCES and any(self._bound(hover) for hover in HOVER_EVENTS)
+        dispatched = sequence not in HOVER_EVENTS and self._bound(sequence)
+        if not hovering and not dispatched:
+            return None
+        with_tags = any(self.tag_callbacks.get(name) for name in ((sequence, ) + HOVER_EVENTS if hovering else (sequence, )))
+        item_id, tags = (None, ()) if sequence == '<Leave>' else self._resolve(event, with_tags)
+        if hovering and item_id != self.hover:
+            previous, self.hover = self.hover, item_id
+            if previous is not None:
+                self.dispatch('<Leave>', previous, event)
+            if item_id is not None:
+                self.dispatch('<Enter>', item_id, event, tags)
+        if dispatched and item_id is not None:
+            return self.dispatch(sequence, item_id, event, tags)
+        return None
+
+    def dispatch(self, sequence, item_id, event, tags=None):
+        """Calls callbacks of the sequence bound to the item and its tags.
+
+        Args:
+            sequence (str): Event descriptor.
+            item_id: Id of the item the event happened on.
+            event: Event passed to the callbacks, its item attribute is set to the item.
+            tags: Tags of the item, they are read from the canvas when needed and not given.
+        Returns:
+            "break" when a callback returned it.
+        """
+        callbacks = []
+        tag_targets = self.tag_callbacks.get(sequence)
+        if tag_targets:
+            if tags is None:
+                tags = tuple(map(str, self.better_canvas.backend.split(self.better_canvas.canvas.gettags(item_id))))
+            for tag in ('all', ) + tuple(tags):
+                callbacks.extend(tag_targets.get(tag, ()))
+        callbacks.extend(self.item_callbacks.get(sequence, {}).get(item_id, ()))
+        if not callbacks:
+            return None
+        event.item = self.better_canvas._get_item(item_id)
+        for callback in callbacks:
+            if callback(event) == 'break':
+                return 'break'
+        return None
+
+    def deleted(self, item_ids):
+        """Removes callbacks of the deleted items."""
+        for targets in self.item_callbacks.values():
+            if targets:
+                for item_id in item_ids:
+                    targets.pop(item_id, None)
+        if self.hover in item_ids:
+            self.hover = None
@@ -0,0 +1,480 @@
+"""This module contains the ItemGroup class that updates coordinates of many items at once
+and the Group and SceneGraph classes that build a hierarchy of items."""
+
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+from itertools import count
+
+from .backends import as_backend
+from .batch import Batch
+from .listeners import CanvasListener
+from .spatial import GEOMETRY_OPTIONS
+
+
+class ItemGroup(Sequence):
+    """Group of items whose coordinates are kept in a single array.
+
+    Coordinates of all members are stored one after another in self.buffer,
+    an array of doubles that can be wrapped without copying, e.g. with numpy.frombuffer.
+    Reading coords never calls Tk, updates are pushed with a single Tcl call
+    and only members whose coordinates changed are sent.
+    Changes made to the members behind the group's back are picked up by refresh.
+    """
+
+    def __init__(self, items):
+        """Creates a group of the given items and reads their coordinates with a single Tcl call.
+
+        Args:
+            items: Items of the group, all on the same canvas.
+                An ItemCollection is used as it is, its items are not created.
+        """
+        self.items = items if isinstance(items, Sequence) else list(items)
+        self.ids = array('q', getattr(self.items, 'ids', None) or [item.id for item in self.items])
+        self.better_canvas = getattr(self.items, 'better_canvas', None)
+        if self.better_canvas is not None:
+            self.canvas = self.better_canvas.canvas
+        elif self.items:
+            self.canvas = self.items[0].canvas
+            self.better_canvas = self.items[0].better_canvas
+        else:
+            self.canvas = None
+        self.buffer = array('d')
+        self.offsets = array('q', [0])
+        self.refresh()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def refresh(self):
+        """Reads coordinates of all members from Tk with a single Tcl call."""
+        if self.better_canvas is not None:
+            self.better_canvas.flush()
+        backend = as_backend(self.canvas)
+        results = backend.evaluate([('coords', item_id) for item_id in self.ids]) if self.ids else ()
+        self.buffer = array('d')
+        self.offsets = array('q', [0])
+        for result in results:
+            self.buffer.extend(float(value) for value in backend.split(result))
+            self.offsets.append(len(self.buffer))
+
+    def _row(self, index):
+        """Returns bounds of the member's coordinates in self.buffer."""
+        return self.offsets[index], self.offsets[index + 1]
+
+    @property
+    def coords(self):
+        """Returns a list with coordinates of each member."""
+        return [self.buffer[start:end].tolist() for start, end in zip(self.offsets, self.offsets[1:])]
+
+    @contextmanager
+    def _updates(self):
+        """Returns a context manager with the batch that receives updates of the group."""
+        if self.better_canvas is not None:
+            with self.better_canvas.batch():
+                yield self.better_canvas._target
+        else:
+            batch = Batch(self.canvas)
+            yield batch
+            batch.flush()
+
+    def move(self, dx, dy):
+        """Moves all members by the provided offset."""
+        if not (dx or dy) or not self.ids:
+            return
+        buffer = self.buffer
+        for index in range(0, len(buffer), 2):
+            buffer[index] += dx
+            buffer[index + 1] += dy
+        with self._updates() as batch:
+            for item_id in self.ids:
+                batch.move(item_id, dx, dy)
+
+    def move_each(self, offsets):
+        """Moves every member by its own offset.
+
+        Args:
+            offsets: (N, 2) array or sequence with dx and dy of each member, or a flat one.
+                Members with a zero offset are not sent to Tk.
+        """
+        offsets = _flatten(offsets)
+        if len(offsets) != 2 * len(self):
+            raise ValueError(f"ItemGroup of {len(self)} items expects {2 * len(self)} offsets. {len(offsets)} were given.")
+        buffer = self.buffer
+        with self._updates() as batch:
+            for index, item_id in enumerate(self.ids):
+                dx = offsets[2 * index]
+                dy = offsets[2 * index + 1]
+                if not (dx or dy):
+                    continue
+                start, end = self._row(index)
+                for position in range(start, end, 2):
+                    buffer[position] += dx
+                    buffer[position + 1] += dy
+                batch.move(item_id, dx, dy)
+
+    def set_coords(self, coords):
+        """Replaces coordinates of all members.
+
+        Args:
+            coords: Array or sequence with a row of coordinates per member,
+                or a flat one with coordinates of all members one after another.
+                Members whose coordinates did not change are not sent to Tk.
+        """
+        flat = _flatten(coords)
+        if len(flat) != len(self.buffer):
+            raise ValueError(f"ItemGroup expects {len(self.buffer)} coordinates. {len(flat)} were given.")
+        new_buffer = array('d', flat)
+        buffer = self.buffer
+        with self._updates() as batch:
+            for index, item_id in enumerate(self.ids):
+                start, end = self._row(index)
+                row = new_buffer[start:end]
+                if row != buffer[start:end]:
+                    buffer[start:end] = row
+                    batch.coords(item_id, *row)
+
+
+class Group():
+    """Node of a scene graph that holds items and nested groups.
+
+    All items in the subtree of a group have its tag, so moving or scaling the group
+    is a single canvas command that Tk applies to every item.
+    The union bounding box of the group is cached and dropped only when one of the items in its subtree changes.
+    Replacing tags of a member, e.g. with item.tags = (...), removes the group tags from it in Tk.
+    """
+
+    def __init__(self, scene_graph, children=(), tag=None):
+        """Creates a group, use BetterCanvas.create_group instead.
+
+        Args:
+            scene_graph: SceneGraph of the canvas.
+            children: Items and groups put into the group.
+            tag: Tag shared by the items of the group, a new one when None.
+
+        Raises:
+            ValueError: The tag is used by another group or by items, they would be moved with the group.
+        """
+        self.scene_graph = scene_graph
+        self.better_canvas = scene_graph.better_canvas
+        if tag is None:
+            tag = scene_graph.new_tag()
+        elif scene_graph.used(tag):
+            raise ValueError(f"Tag {tag} is already used, a group needs a tag of its own.")
+        self.tag = tag
+        self.parent = None
+        self.children = []
+        self._bbox = None
+        self._bbox_valid = False
+        scene_graph.groups[self.tag] = self
+        if children:
+            self.add(*children)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.tag} with {len(self.children)} children>"
+
+    def __len__(self):
+        return len(self.children)
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def ancestors(self):
+        """Returns the group and its parents, the group first."""
+        group = self
+        while group is not None:
+            yield group
+            group = group.parent
+
+    def groups(self):
+        """Returns the group and all groups in its subtree, parents before their children."""
+        yield self
+        for child in self.children:
+            if isinstance(child, Group):
+                yield from child.groups()
+
+    def items(self):
+        """Returns all items in the subtree of the group, depth first."""
+        for child in self.children:
+            if isinstance(child, Group):
+                yield from child.items()
+            else:
+                yield child
+
+    def item_ids(self):
+        """Returns ids of all items in the subtree of the group, depth first."""
+        return [item.id for item in self.items()]
+
+    def invalidate(self):
+        """Drops cached bounding boxes of the group and its parents."""
+        for group in self.ancestors():
+            if not group._bbox_valid:
+                break
+            group._bbox_valid = False
+
+    def add(self, *children):
+        """Moves items and groups into the group, the group tags are added with one Tcl call per level.
+
+        Args:
+            children: Items and groups, they are removed from their previous groups.
+        """
+        item_ids = []
+        for child in children:
+            if isinstance(child, Group):
+                if child in self.ancestors():
+                    raise ValueError(f"{child} can't be put into its own subtree.")
+                if child.parent is not None:
+                    child.parent.remove(child)
+                child.parent = self
+                item_ids.extend(child.item_ids())
+            else:
+                previous = self.scene_graph.parents.get(child.id)
+                if previous is not None:
+                    previous.remove(child)
+                self.scene_graph.parents[child.id] = self
+                item_ids.append(child.id)
+            self.children.append(child)
+        if item_ids:
+            for group in self.ancestors():
+                self.better_canvas.add_tag(group.tag, item_ids)
+        self.invalidate()
+
+    def remove(self, *children):
+        """Takes items and groups out of the group, the group tags are removed with one Tcl call per level."""
+        item_ids = []
+        for child in children:
+            self.children.remove(child)
+            if isinstance(child, Group):
+                child.parent = None
+                item_ids.extend(child.item_ids())
+            else:
+                self.scene_graph.parents.pop(child.id, None)
+                item_ids.append(child.id)
+        if item_ids:
+            for group in self.ancestors():
+                self.better_canvas.remove_tag(group.tag, item_ids)
+        self.invalidate()
+
+    def move(self, dx, dy):
+        """Moves all items of the subtree by the provided offset with a single Tcl call.
+
+        Inside a batch the moves are recorded per item, so they coalesce with other updates."""
+        if not (dx or dy):
+            return
+        target = self.better_canvas._target
+        if self.better_canvas._batch is None:
+            target.move(self.tag, dx, dy)
+        else:
+            for item_id in self.item_ids():
+                target.move(item_id, dx, dy)
+
+    def scale(self, x_origin, y_origin, x_scale, y_scale):
+        """Scales coordinates of all items of the subtree relative to the origin with a single Tcl call."""
+        self.better_canvas._target.scale(self.tag, x_origin, y_origin, x_scale, y_scale)
+
+    @property
+    def bbox(self):
+        """Union of bounding boxes of the items in the subtree, as a 4-tuple, or None when it has no visible items.
+
+        Unknown bounding boxes of items are read with a single Tcl call, cached ones need none."""
+        if self._bbox_valid:
+            return self._bbox
+        self.scene_graph.measure(self.item_ids())
+        return self._union()
+
+    def _union(self):
+        """Computes the bounding box from the cached bounding boxes of the children."""
+        boxes = []
+        for child in self.children:
+            if isinstance(child, Group):
+                bbox = child._bbox if child._bbox_valid else child._union()
+            else:
+                bbox = self.scene_graph.bboxes.get(child.id)
+            if bbox is not None:
+                boxes.append(bbox)
+        self._bbox = _union(boxes)
+        self._bbox_valid = True
+        return self._bbox
+
+    def find_at(self, x, y, halo=0):
+        """Returns items of the subtree whose bounding box contains the point, depth first.
+
+        Groups whose bounding box misses the point are skipped with all their items.
+
+        Args:
+            x, y: Canvas coordinates of the point.
+            halo: Distance by which bounding boxes are enlarged.
+        """
+        found = []
+        if _contains(self.bbox, x, y, halo):
+            self._find_at(x, y, halo, found)
+        return found
+
+    def _find_at(self, x, y, halo, found):
+        """Adds items of the subtree hit by the point to found, bounding boxes are already known."""
+        for child in self.children:
+            if isinstance(child, Group):
+                if _contains(child._bbox if child._bbox_valid else child._union(), x, y, halo):
+                    child._find_at(x, y, halo, found)
+            elif _contains(self.scene_graph.bboxes.get(child.id), x, y, halo):
+                found.append(child)
+
+    def delete(self):
+        """Deletes all items of the subtree from the canvas and removes the group from the scene graph."""
+        self.better_canvas.delete(self.tag)
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent.invalidate()
+            self.parent = None
+        for group in list(self.groups()):
+            self.scene_graph.groups.pop(group.tag, None)
+
+
+class SceneGraph(CanvasListener):
+    """Groups of a BetterCanvas and cached bounding boxes of their items.
+
+    It follows moves, coords assignments, scaling, geometry options and deletes of items
+    made through the canvas, and drops cached bounding boxes of the changed items and the groups they are in.
+    Moves by whole pixels shift cached bounding boxes instead.
+    Changes made to self.canvas directly are not seen by it.
+    Items of a group tag are returned sorted by order_key, by default by id, as TagIndex does.
+    """
+
+    def __init__(self, better_canvas, prefix='group'):
+        """Creates an empty scene graph.
+
+        Args:
+            better_canvas: BetterCanvas the groups belong to.
+            prefix: Start of the tags of new groups.
+        """
+        self.better_canvas = better_canvas
+        self.prefix = prefix
+        self.groups = {}
+        self.parents = {}
+        self.bboxes = {}
+        self.order_key = None
+        self._counter = count(1)
+
+    def __len__(self):
+        """Returns the number of groups."""
+        return len(self.groups)
+
+    def new_tag(self):
+        """Returns a tag that is not used by a group or by items yet."""
+        tag = f'{self.prefix}{next(self._counter)}'
+        while self.used(tag):
+            tag = f'{self.prefix}{next(self._counter)}'
+        return tag
+
+    def used(self, tag):
+        """Whether the tag belongs to a group or items have it."""
+        return tag in self.groups or bool(self.better_canvas._find_ids(tag))
+
+    @property
+    def roots(self):
+        """Groups without a parent."""
+        return [group for group in self.groups.values() if group.parent is None]
+
+    def answers(self, tag):
+        """Whether the tag belongs to a group, so its items are known without Tk."""
+        return tag in self.groups
+
+    def find_withtag(self, tag):
+        """Returns ids of the items of the group with the tag, in stacking order."""
+        return tuple(sorted(self.groups[tag].item_ids(), key=self.order_key))
+
+    def group_of(self, item):
+        """Returns the group that directly contains the item or id, or None."""
+        return self.parents.get(getattr(item, 'id', item))
+
+    def measure(self, item_ids):
+        """Reads bounding boxes of the items that are not cached with a single Tcl call."""
+        item_ids = [item_id for item_id in item_ids if item_id not in self.bboxes]
+        if not item_ids:
+            return
+        self.better_canvas.flush()
+        backend = self.better_canvas.backend
+        results = backend.evaluate([('bbox', item_id) for item_id in item_ids])
+        for item_id, result in zip(item_ids, results):
+            bbox = backend.split(result)
+            self.bboxes[item_id] = tuple(int(value) for value in bbox) if bbox else None
+
+    def bbox_of(self, item_id):
+        """Returns the cached bounding box of the item, it is read from Tk when it's not known."""
+        if item_id not in self.bboxes:
+            self.measure([item_id])
+        return self.bboxes[item_id]
+
+    def find_at(self, x, y, halo=0):
+        """Returns items of all groups whose bounding box contains the point, see Group.find_at."""
+        return [item for group in self.roots for item in group.find_at(x, y, halo)]
+
+    def _changed(self, item_ids):
+        """Drops cached bounding boxes of the items and of the groups they are in."""
+        for item_id in item_ids:
+            self.bboxes.pop(item_id, None)
+            group = self.parents.get(item_id)
+            if group is not None:
+                group.invalidate()
+
+    def moved(self, item_ids, dx, dy):
+        if not (float(dx).is_integer() and float(dy).is_integer()):
+            self._changed(item_ids)
+            return
+        dx, dy = int(dx), int(dy)
+        for item_id in item_ids:
+            bbox = self.bboxes.get(item_id)
+            if bbox is not None:
+                self.bboxes[item_id] = (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy)
+            group = self.parents.get(item_id)
+            if group is not None:
+                group.invalidate()
+
+    def coords_changed(self, item_id, coords):
+        self._changed((item_id, ))
+
+    def scaled(self, item_ids, x_origin, y_origin, x_scale, y_scale):
+        self._changed(item_ids)
+
+    def configured(self, item_ids, options):
+        if 'state' in options or GEOMETRY_OPTIONS.intersection(options):
+            self._changed(item_ids)
+
+    def deleted(self, item_ids):
+        self._changed(item_ids)
+        removed = {}
+        for item_id in item_ids:
+            group = self.parents.pop(item_id, None)
+            if group is not None:
+                removed.setdefault(group, set()).add(item_id)
+        for group, ids in removed.items():
+            group.children = [child for child in group.children if isinstance(child, Group) or child.id not in ids]
+
+
+def _union(boxes):
+    """Returns the bounding box of all boxes, or None when there are none."""
+    if not boxes:
+        return None
+    return (min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes))
+
+
+def _contains(bbox, x, y, halo):
+    """Whether the bounding box enlarged by halo contains the point."""
+    return bbox is not None and bbox[0] - halo <= x <= bbox[2] + halo and bbox[1] - halo <= y <= bbox[3] + halo
+
+
+def _flatten(values):
+    """Returns a flat list of numbers from a flat or 2-dimensional array or sequence."""
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    flat = []
+    for value in values:
+        if hasattr(value, '__len__'):
+            flat.extend(value)
+        else:
+            flat.append(value)
+    return flat
@@ -0,0 +1,339 @@
+"""This module contains ImageCache that shares decoded images between image items."""
+
+import base64
+import hashlib
+import io
+import os
+import queue
+import time
+import tkinter as tk
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .listeners import CanvasListener
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+# Options of image items that refer to images.
+IMAGE_OPTIONS = ('image', 'activeimage', 'disabledimage')
+
+
+class ImageCache(CanvasListener):
+    """Decodes images once and shares them between image items of a BetterCanvas.
+
+    Sources are file paths or encoded image bytes, identical contents are stored once
+    even when they come from different files. Loading a source again returns the same PhotoImage.
+    The cache keeps references to its images, so callers don't have to,
+    and counts items that show each image through the listener interface.
+    When the images take more than the budget, the least recently used ones
+    that no item shows are dropped.
+
+    load reads, decodes and resizes files in a thread pool, with Pillow when it is installed,
+    and hands the result to the Tk thread from an after callback,
+    a few images per callback, so loading many tiles does not stall the UI.
+    Without Pillow Tk decodes PNG, GIF and PPM data on its thread and sizes are approached
+    by integer subsampling. XBM data gives a BitmapImage, shown by Image items.
+    Bitmap items are not routed through the cache, their bitmap option takes a bitmap name
+    or "@" and a file path rather than an image, and Tk already shares bitmaps by name.
+    """
+
+    def __init__(self, better_canvas, budget=64 * 2 ** 20, workers=4, poll_interval=10, slice_time=0.008):
+        """Creates an empty cache.
+
+        Args:
+            better_canvas: BetterCanvas whose items show the images.
+            budget: Memory in bytes the images may take, unused ones are dropped above it.
+            workers: Number of threads decoding images for load.
+            poll_interval: Delay in milliseconds between checks for decoded images.
+            slice_time: Time in seconds spent creating decoded images per check.
+        """
+        self.better_canvas = better_canvas
+        self.budget = budget
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.slice_time = slice_time
+        self.images = OrderedDict()
+        self.sizes = {}
+        self.refs = {}
+        self.names = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._sources = {}
+        self._item_images = {}
+        self._pending = {}
+        self._ready = queue.SimpleQueue()
+        self._executor = None
+        self._after_id = None
+
+    def __len__(self):
+        return len(self.images)
+
+    def stats(self):
+        """Returns cache statistics.
+
+        Returns:
+            A dict with the number of images, bytes they take, the budget,
+            cache hits and misses, dropped images and loads in progress.
+        """
+        return {
+            'images': len(self.images),
+            'bytes': self.bytes,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pending': len(self._pending),
+        }
+
+    @staticmethod
+    def _source_key(source, size):
+        """Returns a key of the source that is known before it is read."""
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return ('data', hashlib.sha1(source).hexdigest(), size)
+        path = os.path.realpath(source)
+        return ('file', path, os.stat(path).st_mtime_ns, size)
+
+    def _cached(self, source_key):
+        """Returns the cached image of the source and marks it as recently used, or None."""
+        key = self._sources.get(source_key, source_key)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+        return image
+
+    def get(self, source, size=None):
+        """Returns the image of the source, decoding it on this thread when it is not cached.
+
+        Args:
+            source: Path of an image file or encoded image bytes.
+            size: (width, height) the image is resized to, or None to keep its size.
+        """
+        source_key = self._source_key(source, size)
+        image = self._cached(source_key)
+        if image is not None:
+            return image
+        self.misses += 1
+        return self._add(source_key, self.prepare(source, size))
+
+    def load(self, source, size=None, callback=None):
+        """Starts loading the image of the source in the thread pool.
+
+        Requests of a source that is already being loaded share its result.
+
+        Args:
+            source: Path of an image file or encoded image bytes.
+            size: (width, height) the image is resized to, or None to keep its size.
+            callback: Callable called with the image on the Tk thread once it is loaded.
+        Returns:
+            A concurrent.futures.Future of the image, it is resolved on the Tk thread.
+        """
+        source_key = self._source_key(source, size)
+        future = self._pending.get(source_key)
+        if future is None:
+            future = Future()
+            image = self._cached(source_key)
+            if image is not None:
+                future.set_result(image)
+            else:
+                self.misses += 1
+                self._pending[source_key] = future
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='BetterCanvas-images')
+                self._executor.submit(self._work, source_key, source, size)
+                self._schedule()
+        if callback is not None:
+            future.add_done_callback(lambda future: future.exception() is None and callback(future.result()))
+        return future
+
+    def create_image(self, x, y, source, size=None, **options):
+        """Creates an image item right away and shows the image of the source once it is loaded.
+
+        Args:
+            x, y: Position of the item.
+            source: Path of an image file or encoded image bytes.
+            size: (width, height) the image is resized to, or None to keep its size.
+            options: Options of the Image item, image is shown until the source is loaded.
+        Returns:
+            The new Image item.
+        """
+        item = self.better_canvas.create_image(x, y, **options)
+        def show(image):
+            if item.id in self._item_images:
+                item.image = image
+        self._item_images.setdefault(item.id, {})
+        self.load(source, size, show)
+        return item
+
+    def _work(self, source_key, source, size):
+        """Prepares the source on a worker thread and queues the result for the Tk thread."""
+        try:
+            self._ready.put((source_key, self.prepare(source, size), None))
+        except Exception as error:
+            self._ready.put((source_key, None, error))
+
+    @staticmethod
+    def prepare(source, size):
+        """Reads and decodes the source, it may run on any thread.
+
+        Returns:
+            (key, kind, data, size), key identifies the content,
+            kind is "photo" or "bitmap", data is what Tk needs to create the image
+            and size is the size Tk still has to resize it to, or None.
+        """
+        if not isinstance(source, (bytes, bytearray, memoryview)):
+            with open(source, 'rb') as file:
+                source = file.read()
+        data = bytes(source)
+        key = ('data', hashlib.sha1(data).hexdigest(), size)
+        if data.lstrip().startswith(b'#define'):
+            return key, 'bitmap', data.decode('ascii'), None
+        if PILImage is not None:
+            with PILImage.open(io.BytesIO(data)) as image:
+                if image.mode not in ('RGB', 'RGBA'):
+                    image = image.convert('RGBA')
+                if size is not None and tuple(size) != image.size:
+                    image = image.resize(tuple(size))
+                output = io.BytesIO()
+                image.save(output, 'PNG', compress_level=1)
+            return key, 'photo', base64.b64encode(output.getvalue()), None
+        return key, 'photo', base64.b64encode(data), size
+
+    def create(self, kind, data, size):
+        """Creates a Tk image from prepared data, it runs on the Tk thread."""
+        master = self.better_canvas.canvas
+        if kind == 'bitmap':
+            return tk.BitmapImage(master=master, data=data)
+        image = tk.PhotoImage(master=master, data=data)
+        if size is not None:
+            x_factor = max(round(image.width() / size[0]), 1)
+            y_factor = max(round(image.height() / size[1]), 1)
+            if x_factor > 1 or y_factor > 1:
+                image = image.subsample(x_factor, y_factor)
+        return image
+
+    def _add(self, source_key, prepared):
+        """Caches the image of prepared data and returns it, content already cached is reused."""
+        key, kind, data, size = prepared
+        if source_key[0] == 'file':
+            self._sources[source_key] = key
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            return image
+        image = self.create(kind, data, size)
+        self.images[key] = image
+        self.sizes[key] = image.width() * image.height() * 4
+        self.bytes += self.sizes[key]
+        self.names[str(image)] = key
+        self.evict(keep=key)
+        return image
+
+    def evict(self, keep=None):
+        """Drops least recently used images that no item shows until the images fit the budget."""
+        if self.bytes <= self.budget:
+            return
+        for key in list(self.images):
+            if self.bytes <= self.budget:
+                break
+            if key == keep or self.refs.get(key):
+                continue
+            image = self.images.pop(key)
+            self.names.pop(str(image), None)
+            self.bytes -= self.sizes.pop(key)
+            self.refs.pop(key, None)
+            self.evictions += 1
+        for source_key, key in list(self._sources.items()):
+            if key not in self.images:
+                del self._sources[source_key]
+
+    def drain(self):
+        """Creates images decoded by the workers and resolves their futures.
+
+        It is called from after callbacks while loads are in progress
+        and stops when slice_time is over, the rest is left for the next call.
+
+        Returns:
+            The number of resolved loads.
+        """
+        deadline = time.perf_counter() + self.slice_time
+        resolved = 0
+        while time.perf_counter() < deadline or not resolved:
+            try:
+                source_key, prepared, error = self._ready.get_nowait()
+            except queue.Empty:
+                break
+            future = self._pending.pop(source_key, None)
+            if future is None:
+                # Load cancelled by close
+                continue
+            if error is None:
+                try:
+                    image = self._add(source_key, prepared)
+                except tk.TclError as tcl_error:
+                    error = tcl_error
+            if error is None:
+                future.set_result(image)
+            else:
+                future.set_exception(error)
+            resolved += 1
+        return resolved
+
+    def _schedule(self):
+        """Schedules the next drain while loads are in progress."""
+        backend = self.better_canvas.backend
+        if self._after_id is None and backend.event_loop:
+            self._after_id = backend.after(self.poll_interval, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self.drain()
+        if self._pending:
+            self._schedule()
+
+    def close(self):
+        """Cancels loads in progress and stops the worker threads, cached images are kept."""
+        if self._after_id is not None:
+            self.better_canvas.backend.after_cancel(self._after_id)
+            self._after_id = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def _reference(self, item_id, options):
+        """Updates reference counts after image options of the item were set."""
+        item_images = self._item_images.setdefault(item_id, {})
+        for option in IMAGE_OPTIONS:
+            if option not in options:
+                continue
+            previous = item_images.pop(option, None)
+            if previous is not None and previous in self.refs:
+                self.refs[previous].discard(item_id)
+            key = self.names.get(str(options[option])) if options[option] is not None else None
+            if key is not None:
+                item_images[option] = key
+                self.refs.setdefault(key, set()).add(item_id)
+
+    def created(self, item_id, item_type, coords, options):
+        if any(option in options for option in IMAGE_OPTIONS):
+            self._reference(item_id, options)
+
+    def configured(self, item_ids, options):
+        if any(option in options for option in IMAGE_OPTIONS):
+            for item_id in item_ids:
+                self._reference(item_id, options)
+
+    def deleted(self, item_ids):
+        for item_id in item_ids:
+            for key in self._item_images.pop(item_id, {}).values():
+                if key in self.refs:
+                    self.refs[key].discard(item_id)
+        self.evict()
@@ -5,35 +5,116 @@ Items can be created with BetterCanvas create_x methods or on their own."""
 import tkinter as tk
 from functools import wraps
 
+from .streaming import LineStream
+
+def option_string(value):
+    """Returns an option value as Tk reports it, e.g. "{Times New Roman} 12" for ('Times New Roman', 12)."""
+    if isinstance(value, (tuple, list)):
+        return tk._join(value)
+    return str(value)
+
 def forward(method):
-    """Forward method calls to the canvas instance and supply the correct item id."""
+    """Forward method calls to the canvas instance and supply the correct item id.
+
+    The DirectCanvas of the owning BetterCanvas is used right away when no batch is open and nothing listens."""
+    name = method.__name__
     @wraps(method)
     def forwarded(self, *args, **kwargs):
-        return getattr(self.canvas, method.__name__)(self.id, *args, **kwargs)
+        better_canvas = self.better_canvas
+        if better_canvas is not None:
+            fast = better_canvas._fast
+            if fast is not None and better_canvas._batch is None and not better_canvas.listeners:
+                return getattr(fast, name)(self.id, *args, **kwargs)
+        return getattr(self._target, name)(self.id, *args, **kwargs)
     return forwarded
 
 class Item():
     """Base class for all item classes.
     
-    All non abstract subclasses must implement _get_new_id method."""
+    All non abstract subclasses must implement _get_new_id method.
+    Options from config_options should be passed to _get_new_id,
+    so the item is created with all of them in a single call.
+
+    Instances keep their state in slots and allocate the option cache on first use.
+    Subclasses may still set any attributes, they are stored in an instance dictionary
+    that is created only when one is set."""
+
+    __slots__ = ('canvas', 'id', 'better_canvas', '_options', '__dict__', '__weakref__')
 
     config_options=[]
 
+    # Name of the item type used by Tk.
+    tk_type = None
 
+    # Number of coordinates the item takes, None when it varies.
+    coords_length = None
+
+    # Set to False to always read and write options through Tk, e.g. when debugging.
+    option_cache = True
+
+    # Options Tk reports as numbers of its own form, e.g. "2.0" for a width of 2, with the type of the number.
+    number_options = {}
+
+    # Options Tk reports in a form only it knows, e.g. "true" for smooth set to 1, they are never cached.
+    tk_options = frozenset()
 
     def __init__(self, **items):
-        """Creates an Item instance that belongs to canvas Canvas."""
-        self.init_options(**items)
-        super().__init__(**self.get_other_options(**items))
+        """Creates an Item instance that belongs to canvas Canvas.
+
+        Options from config_options were already given to _get_new_id,
+        the remaining ones are set as attributes of the instance
+        and passed on to __init__ of classes that follow Item in the method resolution order, e.g. mixins."""
+        self.better_canvas = None
+        self._options = self.cached_options(self.get_create_options(**items)) or None
+        other_options = self.get_other_options(**items)
+        self.init_options(**other_options)
+        mro = type(self).__mro__
+        if mro[mro.index(Item) + 1] is object:
+            super().__init__()
+        else:
+            super().__init__(**other_options)
 
-    @forward
     def move(self, dx, dy):
         """Moves canvas item by the provided offset."""
+        better_canvas = self.better_canvas
+        if better_canvas is not None:
+            fast = better_canvas._fast
+            if fast is not None and better_canvas._batch is None and not better_canvas.listeners:
+                fast._call(fast._path, 'move', self.id, dx, dy)
+                return
+        self._target.move(self.id, dx, dy)
 
     def _get_new_id(self, *args, **options) -> int:
         """Creates a new item on self.canvas and returns its id."""
         raise NotImplementedError
 
+    @classmethod
+    def from_id(cls, canvas: tk.Canvas, item_id, **options):
+        """Returns an instance for an item that already exists on the canvas.
+
+        __init__ is not called, so attributes set there by subclasses are missing.
+
+        Args:
+            canvas: Canvas the item belongs to.
+            item_id: Id of the item.
+            options: Known options of the item, they fill the option cache.
+        """
+        item = cls.__new__(cls)
+        item.canvas = canvas
+        item.id = item_id
+        item.better_canvas = None
+        item._options = cls.cached_options(cls.get_create_options(**options)) or None
+        return item
+
+    @property
+    def _target(self):
+        """Object that receives item commands.
+
+        It is the batch of the owning BetterCanvas while one is open, self.canvas otherwise."""
+        if self.better_canvas is None:
+            return self.canvas
+        return self.better_canvas._target
+
     def init_options(self, **options):
         """Set the given options of the item.
         
@@ -47,53 +128,207 @@ class Item():
         """Returns only options relevant to the class."""
         return {option : value for option, value in options.items() if option in cls.config_options}
 
+    @classmethod
+    def tk_value(cls, name, value):
+        """Returns the option value as Tk reports it, e.g. "2.0" for a width of 2 and "2 2" for a dash of (2, 2).
+
+        Returns None when only Tk knows it, e.g. for booleans, distances with units or options from tk_options,
+        and for None, which tkinter leaves out."""
+        if value is None or isinstance(value, bool) or name in cls.tk_options:
+            return None
+        number = cls.number_options.get(name)
+        if number is None:
+            return option_string(value)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        if number is int:
+            return str(int(value)) if value.is_integer() else None
+        return repr(value)
+
+    @classmethod
+    def cached_options(cls, options):
+        """Returns the options whose values are known in the form Tk reports them, in that form.
+
+        Callers that keep options of an item must mark it stale in the registry when some were left out."""
+        cached = {}
+        for name, value in options.items():
+            value = cls.tk_value(name, value)
+            if value is not None:
+                cached[name] = value
+        return cached
+
     @classmethod
     def get_other_options(cls, **options):
         """Return options not relevant to the current class."""
         return {option : value for option, value in options.items() if option not in cls.config_options}
 
     @property
-    @forward
     def bbox(self):
         """The bounding box, as a 4-tuple.
         Note that the bounding box is approximate and may differ a few pixels from the real value.
-        """ 
+
+        It is cached by the scene graph of the BetterCanvas when it is used.
+        """
+        better_canvas = self.better_canvas
+        if better_canvas is not None:
+            if better_canvas.scene_graph is not None:
+                return better_canvas.scene_graph.bbox_of(self.id)
+            fast = better_canvas._fast
+            if fast is not None and better_canvas._batch is None and not better_canvas.listeners:
+                return fast.bbox(self.id)
+        return self._target.bbox(self.id)
 
     @property
-    @forward
     def coords(self):
         """Returns the coordinates of the item."""
-    
+        better_canvas = self.better_canvas
+        if better_canvas is not None:
+            fast = better_canvas._fast
+            if fast is not None and better_canvas._batch is None and not better_canvas.listeners:
+                return list(map(fast._getdouble, fast._splitlist(fast._call(fast._path, 'coords', self.id))))
+        return self._target.coords(self.id)
+
     @coords.setter
-    @forward
-    def coords(self, *newcoords):
+    def coords(self, newcoords):
         """Sets the coordinates of the item."""
+        better_canvas = self.better_canvas
+        if better_canvas is not None:
+            fast = better_canvas._fast
+            if fast is not None and better_canvas._batch is None and not better_canvas.listeners:
+                fast._call(fast._path, 'coords', self.id, *tk._flatten(newcoords))
+                return
+        self._target.coords(self.id, newcoords)
 
     @property
     def tags(self):
-        """Returns all tags attached to the item."""
-        return self.canvas.gettags(self.id)
+        """Returns all tags attached to the item.
+
+        They are taken from the tag index of the BetterCanvas when it is used."""
+        if self.better_canvas is not None and self.better_canvas.tag_index is not None:
+            tags = self.better_canvas.tag_index.tags_of(self.id)
+            if tags is not None:
+                return tags
+        return self._target.gettags(self.id)
 
     @tags.setter
     def tags(self, new_tags):
         """Replaces all tags attached to the item."""
-        self.canvas.itemconfig(self.id, tags=new_tags)
+        self.__setattr__('tags', new_tags)
+
+    def has_tag(self, tag):
+        """Whether the tag is attached to the item."""
+        return tag in self.tags
+
+    def invalidate_options(self, *names):
+        """Drops cached option values, so they are read from Tk again.
+
+        Call it after changing options behind the item's back,
+        e.g. with tk.Canvas.itemconfig on a tag.
+
+        Args:
+            names: Options to drop, all cached options are dropped when omitted."""
+        if self.better_canvas is not None:
+            self.better_canvas.items.stale.add(self.id)
+        if self._options is None:
+            return
+        if names:
+            for name in names:
+                self._options.pop(name, None)
+        else:
+            self._options = None
 
     def __getattr__(self, name):
-        """Return property of the item."""
+        """Return property of the item.
+
+        Values are cached, Tk is asked only for options that are not known yet.
+        They are cached in the form Tk reports them, e.g. "2.0" for a width set to 2,
+        so reads return the same with and without the cache."""
         if name in self.config_options:
-            return self.canvas.itemcget(self.id, name)
+            if not self.option_cache:
+                return self._target.itemcget(self.id, name)
+            options = self._options
+            if options is not None and name in options:
+                return options[name]
+            value = self._target.itemcget(self.id, name)
+            if options is None:
+                self._options = {name: value}
+            else:
+                options[name] = value
+            return value
         raise AttributeError(f"{self} has no attribute {name}.")
 
     def __setattr__(self, name, value):
         if name in self.config_options:
-            self.canvas.itemconfig(self.id, {name:value})
+            if not self.option_cache:
+                self._target.itemconfig(self.id, {name:value})
+                return
+            options = self._options
+            cached = self.tk_value(name, value)
+            if options is not None and cached is not None and options.get(name) == cached:
+                return
+            self._target.itemconfig(self.id, {name:value})
+            if cached is None:
+                # The cache no longer holds every option that was set.
+                if options is not None:
+                    options.pop(name, None)
+                if self.better_canvas is not None:
+                    self.better_canvas.items.stale.add(self.id)
+            elif options is None:
+                self._options = {name: cached}
+            else:
+                options[name] = cached
         else:
             super().__setattr__(name, value)
 
-    @forward
     def delete(self):
         """Deletes the underlying item from the canvas."""
+        self._target.delete(self.id)
+        if self.better_canvas is not None:
+            self.better_canvas.items.discard(self.id)
+
+    def animate(self, duration=0.5, easing='linear', on_done=None, **targets):
+        """Animates coordinates or options of the item.
+
+        Only items created by a BetterCanvas can be animated, see BetterCanvas.animate.
+
+        Args:
+            duration: Duration in seconds.
+            easing: Name of an easing function or a callable taking and returning progress.
+            on_done: Callable called with the tween after it finished.
+            targets: Target values, coords, move as (dx, dy) or options with a numeric or color value.
+        Returns:
+            The started Tween."""
+        if self.better_canvas is None:
+            raise RuntimeError(f"{self} can't be animated, it was not created by a BetterCanvas.")
+        return self.better_canvas.animate(self, duration, easing, on_done, **targets)
+
+    def raise_above(self, other=None):
+        """Moves the item right above the other item, or to the top when other is None.
+
+        With the stacking order of the BetterCanvas the item moves to the layer of other,
+        or to the top of its own layer."""
+        stacking = self.better_canvas.stacking if self.better_canvas is not None else None
+        if stacking is not None:
+            stacking.raise_items([self.id], other)
+            return
+        if self.better_canvas is not None:
+            self.better_canvas.flush()
+        self.canvas.tag_raise(self.id, *(() if other is None else (getattr(other, 'id', other), )))
+
+    def lower_below(self, other=None):
+        """Moves the item right below the other item, or to the bottom when other is None.
+
+        With the stacking order of the BetterCanvas the item moves to the layer of other,
+        or to the bottom of its own layer."""
+        stacking = self.better_canvas.stacking if self.better_canvas is not None else None
+        if stacking is not None:
+            stacking.lower_items([self.id], other)
+            return
+        if self.better_canvas is not None:
+            self.better_canvas.flush()
+        self.canvas.tag_lower(self.id, *(() if other is None else (getattr(other, 'id', other), )))
 
     @forward
     def focus(self):
@@ -102,11 +337,16 @@ class Item():
     def bind(self, event, callback, add=False):
         """Adds an event binding to the item.
 
+        When the event dispatcher of the BetterCanvas is used, the callback is registered with it.
+
         Args:
             event (str): Event descriptor.
             callback (callable): Callable to bind to the event.
             add (bool): Add new binding to any existing bindings or replace them, defaults to replace.
         """
+        if self.better_canvas is not None and self.better_canvas.dispatcher is not None:
+            self.better_canvas.dispatcher.bind(self.id, event, callback, add)
+            return
         if add:
             add = "+"
         else:
@@ -116,11 +356,17 @@ class Item():
 class Rectangle(Item):
     """Rectangle canvas item."""
 
+    __slots__ = ()
+
+    tk_type = 'rectangle'
+    number_options = {'activewidth': float, 'disabledwidth': float, 'width': float}
+    coords_length = 4
+
     def __init__(self, canvas: tk.Canvas, *bbox, **kwargs):
         if len(bbox) != 4:
             raise TypeError(f"Rectangle item expects 4 values as its bounding box. {len(bbox)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*bbox)
+        self.id = self._get_new_id(*bbox, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
         
     config_options = set([
@@ -157,6 +403,12 @@ class Rectangle(Item):
 class Arc(Item):
     """Arc canvas item."""
 
+    __slots__ = ()
+
+    tk_type = 'arc'
+    number_options = {'activewidth': float, 'disabledwidth': float, 'extent': float, 'start': float, 'width': float}
+    coords_length = 4
+
     config_options = set([
         'activedash',
         'activefill',
@@ -190,15 +442,20 @@ class Arc(Item):
         if len(bbox) != 4:
             raise TypeError(f"Arc item expects 4 values as its bounding box. {len(bbox)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*bbox)
+        self.id = self._get_new_id(*bbox, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *bbox) -> int:
+    def _get_new_id(self, *bbox, **options) -> int:
         """Creates a new id of arc item on self.canvas."""
-        return self.canvas.create_arc(*bbox)
+        return self.canvas.create_arc(*bbox, **options)
 
 class Bitmap(Item):
     """Bitmap canvas item."""
+
+    __slots__ = ()
+
+    tk_type = 'bitmap'
+    coords_length = 2
     
     config_options = set([
         'activebackground',
@@ -219,15 +476,20 @@ class Bitmap(Item):
         if len(position) != 2:
             raise TypeError(f"Image item expects 2 values as its position box. {len(position)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*position)
+        self.id = self._get_new_id(*position, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *position) -> int:
+    def _get_new_id(self, *position, **options) -> int:
         """Creates a bitmap item on self.canvas and returns its id."""
-        return self.canvas.create_bitmap(*position)
+        return self.canvas.create_bitmap(*position, **options)
 
 class Image(Item):
     """Image canvas item."""
+
+    __slots__ = ()
+
+    tk_type = 'image'
+    coords_length = 2
     
     config_options = set([
         'activeimage',
@@ -242,15 +504,23 @@ class Image(Item):
         if len(position) != 2:
             raise TypeError(f"Image item expects 2 values as its position. {len(position)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*position)
+        self.id = self._get_new_id(*position, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *position) -> int:
+    def _get_new_id(self, *position, **options) -> int:
         """Creates a image item on self.canvas and returns its id."""
-        return self.canvas.create_image(*position) 
+        return self.canvas.create_image(*position, **options)
 
 class Line(Item):
-    """Line canvas item."""
+    """Line canvas item.
+
+    Points can be streamed into the line with append, see use_stream."""
+
+    __slots__ = ('stream', )
+
+    tk_type = 'line'
+    number_options = {'activewidth': float, 'disabledwidth': float, 'width': float}
+    tk_options = frozenset(['smooth'])
         
     config_options = set([
         'activedash',
@@ -278,18 +548,50 @@ class Line(Item):
     ])
 
     def __init__(self, canvas: tk.Canvas, *coords, **kwargs):
-        if len(coords) != 4:
-            raise TypeError(f"Line item expects 4 values as its position. {len(coords)} were given.")
+        if len(coords) < 4 or len(coords) % 2 != 0:
+            raise TypeError(f"Line item expects an even number of at least 4 coordinates. {len(coords)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*coords)
+        self.id = self._get_new_id(*coords, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *coords) -> int:
+    def _get_new_id(self, *coords, **options) -> int:
         """Creates a line item on self.canvas and returns its id."""
-        return self.canvas.create_line(*coords) 
+        return self.canvas.create_line(*coords, **options)
+
+    def use_stream(self, capacity=10000, pixels=None) -> LineStream:
+        """Makes the line show the latest points appended with append, replacing a previous stream.
+
+        Only lines created by a BetterCanvas can be streamed.
+
+        Args:
+            capacity: Number of latest points the line shows.
+            pixels: Number of buckets the points are decimated to,
+                the width of the canvas when None, no decimation when 0.
+        Returns:
+            The LineStream of the line."""
+        if self.better_canvas is None:
+            raise RuntimeError(f"{self} can't be streamed, it was not created by a BetterCanvas.")
+        self.stream = LineStream(self, capacity, pixels)
+        return self.stream
+
+    def append(self, points):
+        """Appends points given as (x, y) pairs to the stream of the line.
+
+        The coordinates are pushed at most once per frame, a stream with default arguments is used
+        when use_stream was not called."""
+        stream = getattr(self, 'stream', None)
+        if stream is None:
+            stream = self.use_stream()
+        stream.append(points)
 
 class Oval(Item):
     """Oval canvas item."""
+
+    __slots__ = ()
+
+    tk_type = 'oval'
+    number_options = {'activewidth': float, 'disabledwidth': float, 'width': float}
+    coords_length = 4
     
     config_options = set([
         'activedash',
@@ -321,15 +623,22 @@ class Oval(Item):
         if len(bbox) != 4:
             raise TypeError(f"Oval item expects 4 values as its position. {len(bbox)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*bbox)
+        self.id = self._get_new_id(*bbox, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *bbox) -> int:
+    def _get_new_id(self, *bbox, **options) -> int:
         """Creates an oval item on self.canvas and returns its id."""
-        return self.canvas.create_oval(*bbox) 
+        return self.canvas.create_oval(*bbox, **options)
 
 class Polygon(Item):
     """Polygon canvas item."""
+
+    __slots__ = ()
+
+    tk_type = 'polygon'
+    number_options = {'activewidth': float, 'disabledwidth': float, 'width': float}
+    tk_options = frozenset(['smooth'])
+    coords_length = None
     
     config_options = set([
         'activedash',
@@ -364,15 +673,21 @@ class Polygon(Item):
         if len(coords) % 2 != 0:
             raise TypeError(f"Polygon item expects an even number of coordinates. {len(coords)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*coords)
+        self.id = self._get_new_id(*coords, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *coords) -> int:
+    def _get_new_id(self, *coords, **options) -> int:
         """Creates an oval item on self.canvas and returns its id."""
-        return self.canvas.create_polygon(*coords) 
+        return self.canvas.create_polygon(*coords, **options)
 
 class Text(Item):
     """Text canvas item."""
+
+    __slots__ = ()
+
+    tk_type = 'text'
+    number_options = {'width': int}
+    coords_length = 2
     
     config_options = set([
         'activefill',
@@ -395,14 +710,13 @@ class Text(Item):
         if len(position) != 2:
             raise TypeError(f"Text item expects 2 arguments as its coordinates. {len(position)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*position)
+        self.id = self._get_new_id(*position, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *position) -> int:
+    def _get_new_id(self, *position, **options) -> int:
         """Creates an text item on self.canvas and returns its id."""
-        return self.canvas.create_text(*position) 
+        return self.canvas.create_text(*position, **options)
 
-    @forward
     def dchars(self, start, to=None):
         """Deletes text.
         
@@ -410,6 +724,8 @@ class Text(Item):
             start: Where to start deleting text.
             to: Where to stop deleting text. 
             If omitted, a single character is removed."""
+        self._target.dchars(self.id, start, to)
+        self.invalidate_options('text')
 
     @forward
     def icursor(self, index):
@@ -435,7 +751,6 @@ class Text(Item):
             A numerical index (an integer).
         """
 
-    @forward
     def insert(self, index, text):
         """Inserts text into an item.
         
@@ -445,9 +760,17 @@ class Text(Item):
                 If you insert text at the INSERT index, the cursor is moved along with the text. 
             text: The text to insert.
         """
+        self._target.insert(self.id, index, text)
+        self.invalidate_options('text')
 
 class Window(Item):
     """Window canvas item is used to place another widget on the canvas."""
+
+    __slots__ = ()
+
+    tk_type = 'window'
+    number_options = {'height': int, 'width': int}
+    coords_length = 2
     
     config_options = set([
         'anchor',
@@ -462,9 +785,13 @@ class Window(Item):
         if len(position) != 2:
             raise TypeError(f"Window item expects 2 arguments as its coordinates. {len(position)} were given.")
         self.canvas = canvas
-        self.id = self._get_new_id(*position)
+        self.id = self._get_new_id(*position, **self.get_create_options(**kwargs))
         super().__init__(**kwargs)
 
-    def _get_new_id(self, *position) -> int:
+    def _get_new_id(self, *position, **options) -> int:
         """Creates an text item on self.canvas and returns its id."""
-        return self.canvas.create_window(*position) 
\ No newline at end of file
+        return self.canvas.create_window(*position, **options) 
+
+
+# Item classes by the name of their type used by Tk.
+ITEM_TYPES = {item_type.tk_type : item_type for item_type in (Arc, Bitmap, Image, Line, Oval, Polygon, Rectangle, Text, Window)}
@@ -0,0 +1,132 @@
+"""This module contains classes that let Python side models follow changes of canvas items."""
+
+import tkinter as tk
+
+
+class CanvasListener():
+    """Base class for objects notified about changes of items created through a BetterCanvas.
+
+    Add instances to BetterCanvas.listeners. All methods do nothing by default.
+    """
+
+    def created(self, item_id, item_type, coords, options):
+        """Called after an item was created.
+
+        Args:
+            item_id: Id of the new item.
+            item_type: Item class of the new item.
+            coords: Coordinates the item was created with.
+            options: Options from config_options the item was created with.
+        """
+
+    def moved(self, item_ids, dx, dy):
+        """Called after items were moved by the provided offset."""
+
+    def coords_changed(self, item_id, coords):
+        """Called after coordinates of the item were replaced."""
+
+    def scaled(self, item_ids, x_origin, y_origin, x_scale, y_scale):
+        """Called after coordinates of items were scaled relative to the origin."""
+
+    def configured(self, item_ids, options):
+        """Called after options of items were changed.
+
+        Args:
+            item_ids: Ids of the changed items.
+            options: {option : value}, value is None when it's not known on the Python side.
+        """
+
+    def tags_added(self, item_ids, tag):
+        """Called after the tag was added to items."""
+
+    def tags_removed(self, item_ids, tag):
+        """Called after the tag was removed from items."""
+
+    def deleted(self, item_ids):
+        """Called before items are deleted."""
+
+
+class Notifier():
+    """Forwards item commands to the canvas or the open batch of a BetterCanvas
+    and notifies its listeners about the changes.
+
+    Commands given a tag instead of an item id are resolved to ids with Tk.
+    """
+
+    def __init__(self, better_canvas):
+        self.better_canvas = better_canvas
+
+    @property
+    def target(self):
+        """The open batch or the direct canvas."""
+        better_canvas = self.better_canvas
+        if better_canvas._batch is None:
+            return better_canvas.direct_canvas
+        return better_canvas._batch
+
+    def __getattr__(self, name):
+        """Forward attribute look up to the target."""
+        return getattr(self.target, name)
+
+    def _ids(self, tag):
+        """Returns ids of the items with the given tag or id."""
+        if isinstance(tag, int):
+            return (tag, )
+        index = self.better_canvas.tag_index
+        if index is not None and index.answers(tag):
+            return index.find_withtag(tag)
+        scene_graph = self.better_canvas.scene_graph
+        if scene_graph is not None and scene_graph.answers(tag):
+            return scene_graph.find_withtag(tag)
+        return self.better_canvas.direct_canvas.find_withtag(tag)
+
+    def move(self, tag, dx, dy):
+        self.target.move(tag, dx, dy)
+        item_ids = self._ids(tag)
+        for listener in self.better_canvas.listeners:
+            listener.moved(item_ids, dx, dy)
+
+    def coords(self, tag, *coords):
+        result = self.target.coords(tag, *coords)
+        if coords:
+            item_ids = self._ids(tag)
+            if item_ids:
+                for listener in self.better_canvas.listeners:
+                    listener.coords_changed(item_ids[0], tk._flatten(coords))
+        return result
+
+    def scale(self, tag, x_origin, y_origin, x_scale, y_scale):
+        self.target.scale(tag, x_origin, y_origin, x_scale, y_scale)
+        item_ids = self._ids(tag)
+        for listener in self.better_canvas.listeners:
+            listener.scaled(item_ids, x_origin, y_origin, x_scale, y_scale)
+
+    def itemconfig(self, tag, cnf=None, **kw):
+        options = dict(cnf or {}, **kw)
+        item_ids = self._ids(tag)
+        self.target.itemconfig(tag, options)
+        for listener in self.better_canvas.listeners:
+            listener.configured(item_ids, options)
+
+    itemconfigure = itemconfig
+
+    def _text_changed(self, tag):
+        """Notifies listeners that text of the items changed to an unknown value."""
+        item_ids = self._ids(tag)
+        for listener in self.better_canvas.listeners:
+            listener.configured(item_ids, {'text': None})
+
+    def insert(self, tag, index, text):
+        self.target.insert(tag, index, text)
+        self._text_changed(tag)
+
+    def dchars(self, tag, first, last=None):
+        self.target.dchars(tag, first, last)
+        self._text_changed(tag)
+
+    def delete(self, *tags):
+        item_ids = [item_id for tag in tags for item_id in self._ids(tag)]
+        for listener in self.better_canvas.listeners:
+            listener.deleted(item_ids)
+        for tag in tags:
+            self.target.delete(tag)
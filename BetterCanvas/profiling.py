@@ -0,0 +1,175 @@
+"""This module contains the Profiler class that measures Tcl calls made by a canvas."""
+
+import math
+import os
+import sys
+import time
+import tkinter as tk
+from collections import deque
+
+# Canvas subcommands whose first argument is part of the call site name.
+SUBCOMMANDS = frozenset(['create', 'find', 'select', 'xview', 'yview'])
+
+# Frames from these directories are skipped when looking for the caller of a Tcl call.
+INTERNAL_DIRECTORIES = (os.path.dirname(tk.__file__), os.path.dirname(__file__))
+
+
+class CallStats():
+    """Measurements of a single call site."""
+
+    __slots__ = ('count', 'total', 'bytes', 'samples')
+
+    def __init__(self, samples):
+        self.count = 0
+        self.total = 0.0
+        self.bytes = 0
+        self.samples = deque(maxlen=samples)
+
+    def percentile(self, fraction):
+        """Returns the latency below which the given fraction of the kept samples lies."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+class Profiler():
+    """Records count, latency and marshalled bytes of Tcl calls made through canvas widgets.
+
+    The profiler replaces the Tcl interpreter of the widget with a measuring proxy,
+    so calls made by tkinter on behalf of BetterCanvas, items, batches and schedulers are all seen.
+    Calls are grouped by site, the canvas subcommand, e.g. "coords" or "create rectangle",
+    a whole batch script is reported as "script" and Batch.evaluate as "evaluate".
+    With callers enabled the site also names the first frame outside tkinter and this package.
+    Exporters are called with the site, the duration in seconds and the marshalled bytes of every call.
+    """
+
+    def __init__(self, samples=10000, callers=False):
+        """Creates a profiler that is not installed anywhere yet.
+
+        Args:
+            samples: Number of latest latencies kept per site for percentiles.
+            callers (bool): Add the calling code location to site names, it makes every call slower.
+        """
+        self.samples = samples
+        self.callers = callers
+        self.sites = {}
+        self.exporters = []
+        self._installed = []
+
+    def install(self, widget):
+        """Starts measuring Tcl calls made by the widget."""
+        if not isinstance(widget, tk.Misc):
+            raise TypeError(f"Profiler measures Tcl calls of Tk widgets, {widget} has none.")
+        proxy = _ProfiledInterpreter(widget.tk, self, widget._w)
+        self._installed.append((widget, proxy))
+        widget.tk = proxy
+
+    def uninstall(self):
+        """Stops measuring, widgets get back their previous interpreters."""
+        while self._installed:
+            widget, proxy = self._installed.pop()
+            proxy.profiler = None
+            if widget.tk is proxy:
+                widget.tk = proxy.interpreter
+
+    def reset(self):
+        """Drops all measurements."""
+        self.sites.clear()
+
+    def site(self, args, path):
+        """Returns the call site name for arguments of a Tcl call made by the widget with the given path."""
+        if not args:
+            return ''
+        if args[0] == path and len(args) > 1:
+            args = args[1:]
+        name = str(args[0])
+        if name in SUBCOMMANDS and len(args) > 1:
+            name = f'{name} {args[1]}'
+        if self.callers:
+            name = f'{name} @ {_caller()}'
+        return name
+
+    def record(self, site, seconds, size):
+        """Adds a single call to the measurements of the site and passes it to exporters."""
+        stats = self.sites.get(site)
+        if stats is None:
+            stats = self.sites[site] = CallStats(self.samples)
+        stats.count += 1
+        stats.total += seconds
+        stats.bytes += size
+        stats.samples.append(seconds)
+        for exporter in self.exporters:
+            exporter(site, seconds, size)
+
+    def stats(self):
+        """Returns a snapshot of the measurements.
+
+        Returns:
+            {site : {"count", "total", "p50", "p99", "bytes"}}, times are in seconds."""
+        return {
+            site: {
+                'count': stats.count,
+                'total': stats.total,
+                'p50': stats.percentile(0.5),
+                'p99': stats.percentile(0.99),
+                'bytes': stats.bytes,
+            }
+            for site, stats in self.sites.items()
+        }
+
+
+class _ProfiledInterpreter():
+    """Measures call and eval of a Tcl interpreter and forwards everything else."""
+
+    def __init__(self, interpreter, profiler, path):
+        self.interpreter = interpreter
+        self.profiler = profiler
+        self.path = path
+
+    def call(self, *args):
+        profiler = self.profiler
+        if profiler is None:
+            return self.interpreter.call(*args)
+        if len(args) == 1 and isinstance(args[0], tuple):
+            args = args[0]
+        start = time.perf_counter()
+        result = self.interpreter.call(*args)
+        seconds = time.perf_counter() - start
+        profiler.record(profiler.site(args, self.path), seconds, _size(args) + _size(result))
+        return result
+
+    def eval(self, script):
+        profiler = self.profiler
+        if profiler is None:
+            return self.interpreter.eval(script)
+        start = time.perf_counter()
+        result = self.interpreter.eval(script)
+        seconds = time.perf_counter() - start
+        site = 'evaluate' if script.startswith('list ') else 'script'
+        if profiler.callers:
+            site = f'{site} @ {_caller()}'
+        profiler.record(site, seconds, _size(script) + _size(result))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.interpreter, name)
+
+
+def _size(value):
+    """Returns the approximate number of characters needed to marshal the value."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_size(element) + 1 for element in value)
+    return len(str(value))
+
+
+def _caller():
+    """Returns "file:line (function)" of the first frame outside tkinter and this package."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(INTERNAL_DIRECTORIES):
+        frame = frame.f_back
+    if frame is None:
+        return 'unknown'
+    return f'{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})'
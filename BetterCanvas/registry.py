@@ -0,0 +1,164 @@
+"""This module contains the ItemRegistry class that maps item ids to items."""
+
+import sys
+import weakref
+from bisect import bisect_right
+
+
+class ItemRegistry():
+    """Maps canvas item ids to Item instances.
+
+    Look ups never insert anything, deleted items must be discarded explicitly.
+    A weak registry does not keep items alive,
+    an item is dropped as soon as no other reference to it exists.
+    Items of added collections are created by get when they are first looked up,
+    the collection of an id is found by a binary search over the id ranges of the collections.
+    Ids in self.stale belong to items whose options may differ from what the Python side knows,
+    e.g. after options were set by tag or invalidated.
+    """
+
+    def __init__(self, weak=False):
+        """Creates an empty registry.
+
+        Args:
+            weak (bool): Hold items with weak references.
+        """
+        self.weak = weak
+        self._items = weakref.WeakValueDictionary() if weak else {}
+        self.collections = []
+        self._starts = []
+        self._ranges = []
+        self._overlapping = False
+        self.stale = set()
+        self.registered = 0
+        self.discarded = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def __iter__(self):
+        """Iterates over registered item ids."""
+        return iter(list(self._items.keys()))
+
+    def __getitem__(self, item_id):
+        return self._items[item_id]
+
+    def add(self, item):
+        """Registers the item under its id."""
+        self._items[item.id] = item
+        self.registered += 1
+
+    def add_collection(self, collection):
+        """Registers items of an ItemCollection without creating their instances.
+
+        Ids of the collection must be in ascending order."""
+        self.collections.append(collection)
+        if not len(collection.ids):
+            return
+        first, last = collection.ids[0], collection.ids[-1]
+        index = bisect_right(self._starts, first)
+        if index > 0 and self._ranges[index - 1][1] >= first:
+            self._overlapping = True
+        if index < len(self._starts) and self._starts[index] <= last:
+            self._overlapping = True
+        self._starts.insert(index, first)
+        self._ranges.insert(index, (first, last, collection))
+
+    def _remove_collection(self, collection):
+        """Stops looking up items in the collection."""
+        self.collections.remove(collection)
+        for index, (_, _, other) in enumerate(self._ranges):
+            if other is collection:
+                del self._starts[index]
+                del self._ranges[index]
+                break
+
+    def _collections_of(self, item_id):
+        """Returns added collections that contain the id."""
+        if self._overlapping:
+            return [collection for collection in self.collections if item_id in collection]
+        index = bisect_right(self._starts, item_id) - 1
+        if index < 0:
+            return []
+        first, last, collection = self._ranges[index]
+        if item_id <= last and item_id in collection:
+            return [collection]
+        return []
+
+    def get(self, item_id, default=None):
+        """Returns the item with the given id or default when it is not registered."""
+        item = self._items.get(item_id)
+        if item is not None:
+            return item
+        for collection in self._collections_of(item_id):
+            item = collection.materialize(item_id)
+            return default if item is None else item
+        return default
+
+    def values(self):
+        """Returns a list of registered items."""
+        return list(self._items.values())
+
+    def discard(self, item_id):
+        """Removes the item with the given id if it is registered."""
+        if self._items.pop(item_id, None) is not None:
+            self.discarded += 1
+        self.stale.discard(item_id)
+        for collection in self._collections_of(item_id):
+            collection.discard(item_id)
+            if len(collection.deleted) == len(collection):
+                self._remove_collection(collection)
+
+    def clear(self):
+        """Removes all items."""
+        self.discarded += len(self._items)
+        self._items.clear()
+        self.collections.clear()
+        self._starts.clear()
+        self._ranges.clear()
+        self._overlapping = False
+        self.stale.clear()
+
+    def known_options(self, item_id):
+        """Returns options of the item known on the Python side, without asking Tk.
+
+        Returns:
+            {option : value} with every option that was set on the item,
+            or None when they are not known, e.g. for stale items, whose cache lacks values only Tk knows,
+            or items created behind the canvas' back."""
+        if item_id in self.stale:
+            return None
+        item = self._items.get(item_id)
+        if item is not None:
+            return dict(item._options or {}) if item.option_cache else None
+        for collection in self._collections_of(item_id):
+            return collection.known_options(item_id)
+        return None
+
+    def stats(self):
+        """Returns size and memory statistics of the registry.
+
+        Returns:
+            A dict with the number of item instances, the number of items in collections,
+            the number of items registered and discarded so far,
+            whether items are held weakly and an estimate of bytes used by the registry and its items.
+        """
+        size = sys.getsizeof(self._items)
+        for collection in self.collections:
+            size += sys.getsizeof(collection.ids) + sys.getsizeof(collection.deleted)
+        if self.weak:
+            size += sys.getsizeof(self._items.data)
+        for item in self.values():
+            size += sys.getsizeof(item)
+            size += sys.getsizeof(getattr(item, '_options', None))
+        return {
+            'items': len(self),
+            'collected': sum(len(collection) - len(collection.deleted) for collection in self.collections),
+            'registered': self.registered,
+            'discarded': self.discarded,
+            'weak': self.weak,
+            'bytes': size,
+        }
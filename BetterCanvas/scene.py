@@ -0,0 +1,392 @@
+"""This module contains a compact binary format for snapshots of all items of a canvas.
+
+A scene file starts with a header and a table of sections, every section is a flat
+little-endian array aligned to 8 bytes, so a snapshot can be memory-mapped and read
+without parsing:
+
+    strings     offsets into the string blob (q) and the utf-8 blob itself,
+                types, tags and option names and values are interned there
+    types       string index of the type of each item (i)
+    ids         id each item had on the saved canvas (q)
+    coords      offsets per item (q) into one flat array of all coordinates (d)
+    tags        offsets per item (q) into one array of string indexes (i)
+    options     offsets per item (q) into one array of (name, value) string index pairs (i)
+
+Items are stored in stacking order, from the lowest to the topmost one.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+
+from . import items
+from .collection import ItemView
+from .items import option_string
+
+MAGIC = b'BCSCENE\x01'
+VERSION = 1
+# Magic, version, number of items and number of sections.
+HEADER = struct.Struct('<8sIII4x')
+# Offset and length in bytes of a section.
+SECTION = struct.Struct('<qq')
+# Array type codes of the sections in the order they are stored.
+SECTIONS = ('q', 'B', 'i', 'q', 'q', 'd', 'q', 'i', 'q', 'i')
+
+
+def _align(size):
+    return (size + 7) & ~7
+
+
+class SceneSnapshot():
+    """Types, coordinates, tags and options of items in stacking order, kept in flat arrays.
+
+    Snapshots read from a file are memory-mapped,
+    the arrays are memoryviews of the file until close is called.
+    """
+
+    def __init__(self, strings, types, ids, coords_offsets, coords, tags_offsets, tags, options_offsets, options):
+        """Creates a snapshot from its arrays, use from_records or read to build one.
+
+        Args:
+            strings: Interned strings, indexed by the other arrays.
+            types: String index of the type of each item.
+            ids: Original id of each item.
+            coords_offsets, tags_offsets, options_offsets: len(ids) + 1 offsets
+                of the values of each item in coords, tags and options.
+            coords: Flat coordinates.
+            tags: Flat string indexes of tags.
+            options: Flat string indexes of option names and values, alternating.
+        """
+        self.strings = strings
+        self.types = types
+        self.ids = ids
+        self.coords_offsets = coords_offsets
+        self.coords = coords
+        self.tags_offsets = tags_offsets
+        self.tags = tags
+        self.options_offsets = options_offsets
+        self.options = options
+        self._mmap = None
+        self._views = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {len(self)} items>"
+
+    @classmethod
+    def from_records(cls, records):
+        """Builds a snapshot from (item_id, item_type, coords, tags, options) records in stacking order.
+
+        Args:
+            records: Iterable of records, item_type is a Tk type name,
+                tags a sequence of strings and options a dict of strings.
+        """
+        strings = {}
+        def intern(string):
+            try:
+                return strings[string]
+            except KeyError:
+                index = strings[string] = len(strings)
+                return index
+        types, ids = array('i'), array('q')
+        coords_offsets, coords = array('q', [0]), array('d')
+        tags_offsets, tags = array('q', [0]), array('i')
+        options_offsets, options = array('q', [0]), array('i')
+        for item_id, item_type, item_coords, item_tags, item_options in records:
+            types.append(intern(item_type))
+            ids.append(item_id)
+            coords.extend(map(float, item_coords))
+            coords_offsets.append(len(coords))
+            tags.extend(map(intern, item_tags))
+            tags_offsets.append(len(tags))
+            for name, value in item_options.items():
+                options.append(intern(name))
+                options.append(intern(value))
+            options_offsets.append(len(options))
+        return cls(list(strings), types, ids, coords_offsets, coords, tags_offsets, tags, options_offsets, options)
+
+    @classmethod
+    def read(cls, path):
+        """Memory-maps a scene file.
+
+        Raises:
+            ValueError: The file is not a scene file or was written by a newer version."""
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if file.seek(0, 2) else b''
+        views = []
+        try:
+            snapshot = cls._map(path, data, views)
+        except BaseException:
+            # The file stays mapped while views of it exist.
+            for view in reversed(views):
+                view.release()
+            if isinstance(data, mmap.mmap):
+                data.close()
+            raise
+        snapshot._mmap = data
+        snapshot._views = views
+        return snapshot
+
+    @classmethod
+    def _map(cls, path, data, views):
+        """Returns a snapshot whose arrays are views of the data, every view made is added to views."""
+        if len(data) < HEADER.size:
+            raise ValueError(f"{path} is not a scene file.")
+        magic, version, count, section_count = HEADER.unpack_from(data)
+        if magic != MAGIC or section_count != len(SECTIONS):
+            raise ValueError(f"{path} is not a scene file.")
+        if version > VERSION:
+            raise ValueError(f"{path} has scene format version {version}, only {VERSION} is supported.")
+        view = memoryview(data)
+        views.append(view)
+        arrays = []
+        for index, typecode in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(data, HEADER.size + index * SECTION.size)
+            if offset + length > len(data):
+                raise ValueError(f"{path} is truncated.")
+            section = view[offset:offset + length]
+            views.append(section)
+            if sys.byteorder != 'little' and typecode != 'B':
+                section = array(typecode, section.tobytes())
+                section.byteswap()
+            elif length % array(typecode).itemsize:
+                raise ValueError(f"{path} is corrupted.")
+            else:
+                section = section.cast(typecode)
+                views.append(section)
+            arrays.append(section)
+        string_offsets, blob, *arrays = arrays
+        strings = [str(blob[string_offsets[index]:string_offsets[index + 1]], 'utf-8')
+                   for index in range(len(string_offsets) - 1)]
+        snapshot = cls(strings, *arrays)
+        if len(snapshot.ids) != count:
+            raise ValueError(f"{path} is corrupted.")
+        return snapshot
+
+    def write(self, path):
+        """Writes the snapshot to a scene file."""
+        blobs = [string.encode('utf-8') for string in self.strings]
+        string_offsets = array('q', [0])
+        for blob in blobs:
+            string_offsets.append(string_offsets[-1] + len(blob))
+        sections = [string_offsets, b''.join(blobs), array('i', self.types), array('q', self.ids),
+                    array('q', self.coords_offsets), array('d', self.coords),
+                    array('q', self.tags_offsets), array('i', self.tags),
+                    array('q', self.options_offsets), array('i', self.options)]
+        if sys.byteorder != 'little':
+            for section in sections:
+                if isinstance(section, array):
+                    section.byteswap()
+        table = []
+        offset = _align(HEADER.size + len(SECTIONS) * SECTION.size)
+        for section in sections:
+            length = len(section) * getattr(section, 'itemsize', 1)
+            table.append((offset, length))
+            offset = _align(offset + length)
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(self), len(SECTIONS)))
+            for entry in table:
+                file.write(SECTION.pack(*entry))
+            for (offset, length), section in zip(table, sections):
+                file.write(b'\0' * (offset - file.tell()))
+                file.write(section)
+
+    def detach(self):
+        """Copies the arrays of a snapshot that was read into memory and releases the file."""
+        if self._mmap is None:
+            return
+        for name in ('types', 'ids', 'coords_offsets', 'coords', 'tags_offsets', 'tags', 'options_offsets', 'options'):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                setattr(self, name, array(view.format, view))
+        self.close()
+
+    def close(self):
+        """Releases the memory-mapped file of a snapshot that was read, its arrays can't be used anymore."""
+        if self._mmap is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._mmap = None
+
+    def type(self, index):
+        """Returns the Tk type of the item at the index."""
+        return self.strings[self.types[index]]
+
+    def item_coords(self, index):
+        """Returns coordinates of the item at the index as a list."""
+        return self.coords[self.coords_offsets[index]:self.coords_offsets[index + 1]].tolist()
+
+    def item_tags(self, index):
+        """Returns tags of the item at the index as a tuple."""
+        strings = self.strings
+        return tuple(strings[tag] for tag in self.tags[self.tags_offsets[index]:self.tags_offsets[index + 1]])
+
+    def item_options(self, index):
+        """Returns {option : value} of the item at the index, tags excluded."""
+        strings = self.strings
+        pairs = self.options[self.options_offsets[index]:self.options_offsets[index + 1]]
+        return {strings[pairs[position]]: strings[pairs[position + 1]] for position in range(0, len(pairs), 2)}
+
+    def commands(self, canvas):
+        """Returns a create subcommand for each item in stacking order, to be run by Batch.evaluate."""
+        commands = []
+        for index in range(len(self)):
+            options = self.item_options(index)
+            tags = self.item_tags(index)
+            if tags:
+                options['tags'] = tags
+            commands.append(('create', self.type(index)) + tuple(self.item_coords(index)) + canvas._options(options))
+        return commands
+
+
+class SceneCollection(ItemView):
+    """Sequence of items created from a scene snapshot.
+
+    Item instances are created only when they are accessed,
+    with their type and option cache taken from the snapshot.
+    """
+
+    def __init__(self, better_canvas, snapshot, ids):
+        """Creates a collection of items created from the snapshot.
+
+        Args:
+            better_canvas: BetterCanvas the items belong to.
+            snapshot: SceneSnapshot the items were created from.
+            ids: New id of each item of the snapshot, in ascending order.
+        """
+        self.better_canvas = better_canvas
+        self.snapshot = snapshot
+        self.ids = array('q', ids)
+        self.deleted = set()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ItemView(self.better_canvas, self.ids[index])
+        return self.materialize(self.ids[index])
+
+    def __contains__(self, item):
+        return self._index(getattr(item, 'id', item)) is not None
+
+    def _index(self, item_id):
+        """Returns the snapshot index of the item with the given id, or None."""
+        position = bisect_left(self.ids, item_id)
+        if position < len(self.ids) and self.ids[position] == item_id:
+            return position
+        return None
+
+    def materialize(self, item_id):
+        """Returns the item with the given id, creating its instance if needed.
+
+        Returns None for items that were deleted."""
+        if item_id in self.deleted:
+            return None
+        registry = self.better_canvas.items
+        try:
+            return registry[item_id]
+        except KeyError:
+            index = self._index(item_id)
+            item_type = items.ITEM_TYPES.get(self.snapshot.type(index))
+            if item_type is None:
+                return None
+            options = {} if item_id in registry.stale else self.snapshot.item_options(index)
+            item = item_type.from_id(self.better_canvas.canvas, item_id, **options)
+            item.better_canvas = self.better_canvas
+            registry.add(item)
+            if len(item._options or ()) < len(options):
+                registry.stale.add(item_id)
+            return item
+
+    def known_options(self, item_id):
+        """Returns options of the item as they were saved, or None when some of them can't be cached."""
+        index = self._index(item_id)
+        item_type = items.ITEM_TYPES.get(self.snapshot.type(index))
+        if item_type is None or not item_type.option_cache:
+            return None
+        options = self.snapshot.item_options(index)
+        return options if len(item_type.cached_options(options)) == len(options) else None
+
+    def discard(self, item_id):
+        """Marks the item with the given id as deleted."""
+        if item_id in self:
+            self.deleted.add(item_id)
+
+
+def save_scene(better_canvas, path):
+    """Writes all items of the canvas to a scene file.
+
+    Item ids are listed with one Tcl call, their types, coordinates and tags are read with another.
+    Options are taken from the Python side where they are known,
+    only items with unknown options, e.g. created directly on the canvas or configured by tag,
+    are asked for their configuration, all of them in the same call.
+    Options with default values are not saved.
+
+    Args:
+        better_canvas: BetterCanvas to save.
+        path: Path of the file to write.
+    Returns:
+        The saved SceneSnapshot.
+    """
+    better_canvas.flush()
+    backend = better_canvas.backend
+    item_ids = [int(item_id) for item_id in backend.find_all()]
+    registry = better_canvas.items
+    known = [registry.known_options(item_id) for item_id in item_ids]
+    commands = []
+    for item_id in item_ids:
+        commands.extend((('type', item_id), ('coords', item_id), ('gettags', item_id)))
+    commands.extend(('itemconfigure', item_id) for item_id, options in zip(item_ids, known) if options is None)
+    results = iter(backend.evaluate(commands))
+    records = []
+    for item_id in item_ids:
+        item_type, coords, tags = str(next(results)), backend.split(next(results)), backend.split(next(results))
+        records.append([item_id, item_type, coords, tuple(map(str, tags)), None])
+    for record, options in zip(records, known):
+        if options is None:
+            options = {}
+            for entry in backend.split(next(results)):
+                name, _, _, default, value = map(str, backend.split(entry))
+                if value != default:
+                    options[name[1:]] = value
+        record[4] = {name: option_string(value) for name, value in options.items()
+                     if name != 'tags' and value is not None}
+    snapshot = SceneSnapshot.from_records(records)
+    snapshot.write(path)
+    return snapshot
+
+
+def load_scene(better_canvas, path, clear=True):
+    """Creates all items of a scene file on the canvas with a single Tcl call.
+
+    The file is released once the items are created, so it can be overwritten right away.
+
+    Args:
+        better_canvas: BetterCanvas to create the items on.
+        path: Path of a file written by save_scene.
+        clear: Delete all items of the canvas first.
+    Returns:
+        SceneCollection of the new items in stacking order, their instances are created on access.
+    """
+    snapshot = SceneSnapshot.read(path)
+    if clear:
+        better_canvas.delete('all')
+    better_canvas.flush()
+    item_ids = [int(item_id) for item_id in better_canvas.backend.evaluate(snapshot.commands(better_canvas.canvas))]
+    snapshot.detach()
+    collection = SceneCollection(better_canvas, snapshot, item_ids)
+    if item_ids:
+        better_canvas.items.add_collection(collection)
+    for listener in better_canvas.listeners:
+        for index, item_id in enumerate(item_ids):
+            options = snapshot.item_options(index)
+            tags = snapshot.item_tags(index)
+            if tags:
+                options['tags'] = tags
+            listener.created(item_id, items.ITEM_TYPES.get(snapshot.type(index)), snapshot.item_coords(index), options)
+    return collection
@@ -0,0 +1,182 @@
+"""This module contains the FrameScheduler class that applies item updates once per frame."""
+
+import time
+
+from .batch import Batch
+
+
+class FrameScheduler():
+    """Keeps a batch of a BetterCanvas open and flushes it from a canvas.after callback at a fixed rate.
+
+    While the scheduler runs, moves, coords assignments, option assignments and deletes
+    of items created by the canvas are recorded and coalesced per item,
+    so an item updated many times between two frames costs one Tcl call per frame at most.
+    Reading an item state from Tk flushes pending updates first, as with BetterCanvas.batch.
+    Callbacks in self.callbacks are called at the start of every frame with the frame time,
+    e.g. to advance animations, callbacks in self.flushed after updates of the frame were applied
+    with the number of canvas subcommands that were run.
+
+    A scheduler created with defer=False only runs frames for its callbacks:
+    updates made by the callbacks are applied at the end of the frame, all other updates stay immediate,
+    and it stops by itself once no callbacks are left.
+    """
+
+    def __init__(self, better_canvas, fps=60, defer=True):
+        """Creates a stopped scheduler.
+
+        Args:
+            better_canvas: BetterCanvas whose updates are scheduled.
+            fps: Target number of frames per second.
+            defer (bool): Record all item updates of the canvas until the next frame,
+                otherwise only updates made by frame callbacks are.
+        """
+        if fps <= 0:
+            raise ValueError(f"FrameScheduler expects a positive fps. {fps} was given.")
+        self.better_canvas = better_canvas
+        self.fps = fps
+        self.defer = defer
+        self.batch = None
+        self.callbacks = []
+        self.flushed = []
+        self._command = None
+        self._after_id = None
+        self._deadline = 0.0
+        self.reset_stats()
+
+    @property
+    def budget(self):
+        """Duration of a single frame in seconds."""
+        return 1 / self.fps
+
+    @property
+    def running(self):
+        """Whether frames are scheduled."""
+        return self._command is not None
+
+    @property
+    def dirty(self):
+        """Ids of items with updates waiting for the next frame."""
+        if self.batch is None:
+            return set()
+        return self.batch.pending()
+
+    def reset_stats(self):
+        """Sets all frame statistics to zero."""
+        self.frames = 0
+        self.operations = 0
+        self.overruns = 0
+        self.dropped = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+
+    def stats(self):
+        """Returns frame statistics.
+
+        Returns:
+            A dictionary with the number of frames, canvas subcommands flushed,
+            frames that took longer than the budget and frames dropped because a tick came late,
+            and the last, average and maximum frame time in seconds.
+        """
+        return {
+            'frames': self.frames,
+            'operations': self.operations,
+            'overruns': self.overruns,
+            'dropped': self.dropped,
+            'last_time': self.last_time,
+            'average_time': self.total_time / self.frames if self.frames else 0.0,
+            'max_time': self.max_time,
+        }
+
+    def start(self):
+        """Opens the batch and schedules the first frame."""
+        if self.running:
+            return
+        better_canvas = self.better_canvas
+        if not better_canvas.backend.event_loop:
+            raise RuntimeError("FrameScheduler needs the Tk event loop, it can't run on other canvas backends.")
+        if self.defer:
+            if better_canvas._batch is not None:
+                raise RuntimeError("FrameScheduler can't be started inside BetterCanvas.batch.")
+            self.batch = better_canvas._batch = Batch(better_canvas.canvas, better_canvas.direct_canvas)
+        self._command = better_canvas.canvas.register(self._tick)
+        self._deadline = time.perf_counter() + self.budget
+        self._schedule()
+
+    def stop(self):
+        """Cancels scheduled frames, applies pending updates and closes the batch."""
+        if not self.running:
+            return
+        canvas = self.better_canvas.canvas
+        if self._after_id is not None:
+            canvas.tk.call('after', 'cancel', self._after_id)
+            self._after_id = None
+        canvas.deletecommand(self._command)
+        self._command = None
+        batch, self.batch = self.batch, None
+        if batch is None:
+            return
+        if self.better_canvas._batch is batch:
+            self.better_canvas._batch = None
+        batch.flush()
+
+    def _schedule(self):
+        """Schedules the next frame at the current deadline."""
+        delay = max(round((self._deadline - time.perf_counter()) * 1000), 1)
+        self._after_id = self.better_canvas.canvas.tk.call('after', delay, self._command)
+
+    def _tick(self):
+        """Runs a frame and schedules the next one, skipping deadlines that already passed.
+
+        The next frame is scheduled even when a callback or the flush raised,
+        the exception is then reported by Tk.
+        A scheduler that doesn't defer updates stops instead when no callbacks are left."""
+        self._after_id = None
+        if not self.running:
+            return
+        budget = self.budget
+        late = time.perf_counter() - self._deadline
+        if late >= budget:
+            missed = int(late // budget)
+            self.dropped += missed
+            self._deadline += missed * budget
+        try:
+            self.frame()
+        finally:
+            if self.running:
+                if not self.defer and not self.callbacks and not self.flushed:
+                    self.stop()
+                else:
+                    self._deadline += budget
+                    self._schedule()
+
+    def frame(self):
+        """Calls frame callbacks and applies pending updates with a single Tcl call.
+
+        It is called by the scheduler, call it directly to apply updates before the next tick.
+
+        Returns:
+            The number of canvas subcommands that were run."""
+        start = time.perf_counter()
+        better_canvas = self.better_canvas
+        batch = self.batch
+        if batch is None and better_canvas._batch is None:
+            batch = better_canvas._batch = Batch(better_canvas.canvas, better_canvas.direct_canvas)
+        try:
+            for callback in list(self.callbacks):
+                callback(start)
+        finally:
+            if batch is not self.batch and better_canvas._batch is batch:
+                better_canvas._batch = None
+            operations = batch.flush() if batch is not None else 0
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.operations += operations
+        self.last_time = elapsed
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        if elapsed > self.budget:
+            self.overruns += 1
+        for callback in list(self.flushed):
+            callback(operations)
+        return operations
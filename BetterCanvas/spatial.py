@@ -0,0 +1,627 @@
+"""This module contains the SpatialIndex class that answers area queries on the Python side."""
+
+import math
+from collections import defaultdict
+
+from . import items
+from .listeners import CanvasListener
+
+# Item types whose bounding box is computed from their coordinates and outline width.
+SHAPES = (items.Arc, items.Line, items.Oval, items.Polygon, items.Rectangle)
+
+# Options that change the bounding box of an item.
+GEOMETRY_OPTIONS = frozenset([
+    'anchor',
+    'arrow',
+    'arrowshape',
+    'bitmap',
+    'capstyle',
+    'extent',
+    'font',
+    'height',
+    'image',
+    'joinstyle',
+    'justify',
+    'smooth',
+    'splinesteps',
+    'start',
+    'style',
+    'text',
+    'width',
+    'window',
+])
+
+# Fill and outline of shapes that were not given them.
+STYLES = {
+    'arc': ('', 'black'),
+    'line': ('black', ''),
+    'oval': ('', 'black'),
+    'polygon': ('black', ''),
+    'rectangle': ('', 'black'),
+}
+
+# Geometry options a shape follows, others make its bounding box be read from Tk.
+SHAPE_OPTIONS = frozenset(['width', 'start', 'extent', 'style'])
+
+# Options of shapes read from Tk for items that exist before the index, by item type.
+SHAPE_READS = {
+    'arc': ('width', 'fill', 'outline'),
+    'line': ('width', 'arrow', 'smooth', 'joinstyle'),
+    'oval': ('width', 'fill', 'outline'),
+    'polygon': ('width', 'fill', 'outline', 'smooth', 'joinstyle'),
+    'rectangle': ('width', 'fill', 'outline'),
+}
+
+# Values Tk reads as false, e.g. of the smooth option.
+FALSE = frozenset(['', '0', 'false', 'no', 'off'])
+
+
+def _round(value):
+    """Rounds half away from zero, as Tk rounds coordinates of rectangles and ovals."""
+    return int(value + 0.5) if value >= 0 else int(value - 0.5)
+
+
+def _area_distance(x, y, area):
+    """Returns the distance of the point from the area (x1, y1, x2, y2)."""
+    return math.hypot(max(area[0] - x, 0, x - area[2]), max(area[1] - y, 0, y - area[3]))
+
+
+def _segment_distance(x, y, x1, y1, x2, y2):
+    """Returns the distance of the point from the segment."""
+    dx = x2 - x1
+    dy = y2 - y1
+    length = dx * dx + dy * dy
+    if length:
+        position = min(max(((x - x1) * dx + (y - y1) * dy) / length, 0.0), 1.0)
+        x1 += position * dx
+        y1 += position * dy
+    return math.hypot(x - x1, y - y1)
+
+
+def _segment_crosses(x1, y1, x2, y2, area):
+    """Whether the segment has a point inside the area, clipped like Liang and Barsky do."""
+    start, end = 0.0, 1.0
+    dx = x2 - x1
+    dy = y2 - y1
+    for direction, distance in ((-dx, x1 - area[0]), (dx, area[2] - x1), (-dy, y1 - area[1]), (dy, area[3] - y1)):
+        if direction == 0:
+            if distance < 0:
+                return False
+        elif direction < 0:
+            start = max(start, distance / direction)
+        else:
+            end = min(end, distance / direction)
+        if start > end:
+            return False
+    return True
+
+
+def _segment_area_distance(x1, y1, x2, y2, area):
+    """Returns the distance of the segment from the area."""
+    if _segment_crosses(x1, y1, x2, y2, area):
+        return 0.0
+    return min(_area_distance(x1, y1, area), _area_distance(x2, y2, area),
+               *(_segment_distance(x, y, x1, y1, x2, y2) for x in (area[0], area[2]) for y in (area[1], area[3])))
+
+
+def _inside_polygon(x, y, coords):
+    """Whether the point is inside the closed polygon, by the even-odd rule."""
+    inside = False
+    x1, y1 = coords[-2], coords[-1]
+    for index in range(0, len(coords), 2):
+        x2, y2 = coords[index], coords[index + 1]
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+class _Shape():
+    """Coordinates and style of a rectangle, oval, arc, line or polygon, tested against areas and points as Tk does.
+
+    Arcs are only bounded, whether they overlap an area or how close they are is left to Tk."""
+
+    __slots__ = ('type', 'coords', 'width', 'fill', 'outline')
+
+    def __init__(self, item_type, options):
+        """Raises ValueError when the shape can't be followed, e.g. for arrows or curves."""
+        self.type = item_type
+        self.coords = ()
+        self.fill, self.outline = STYLES[item_type]
+        self.width = 1.0
+        self.configure(options)
+
+    def configure(self, options):
+        """Follows new options, raises ValueError for those the shape can't follow."""
+        for name, value in options.items():
+            if value is None or name in SHAPE_OPTIONS or name not in GEOMETRY_OPTIONS:
+                continue
+            if name == 'arrow' and value == 'none' or name == 'capstyle' or name == 'joinstyle' and value != 'miter':
+                continue
+            if name == 'smooth' and str(value).lower() in FALSE:
+                continue
+            raise ValueError(f"{name} {value} is not followed.")
+        if options.get('width') is not None:
+            self.width = float(options['width'])
+        for name in ('fill', 'outline'):
+            if options.get(name) is not None:
+                setattr(self, name, options[name])
+
+    def half_width(self):
+        """Returns half of the outline width, lines are at least one unit wide."""
+        if self.type == 'line':
+            return max(self.width, 1.0) / 2
+        return self.width / 2 if self.outline else 0.0
+
+    def filled(self):
+        """Whether the inside of the shape is part of it, also when neither fill nor outline is drawn."""
+        return bool(self.fill) or not self.outline
+
+    def bbox(self):
+        """Returns the bounding box Tk reports for the shape, in whole units."""
+        coords = self.coords
+        xs = coords[0::2]
+        ys = coords[1::2]
+        if self.type in ('line', 'polygon'):
+            if self.type == 'line' or self.outline:
+                padding = int(max(self.width, 1.0) + 0.5) + 1
+            else:
+                padding = 1
+            return (int(min(xs) + 0.5) - padding, int(min(ys) + 0.5) - padding,
+                    int(max(xs) + 0.5) + padding, int(max(ys) + 0.5) + padding)
+        padding = int(self.width + 1) // 2 if self.outline else 0
+        x1, y1, x2, y2 = min(xs), min(ys), max(xs), max(ys)
+        return (_round(x1) - padding, _round(y1) - padding,
+                _round(max(x2, x1 + 1)) + padding, _round(max(y2, y1 + 1)) + padding)
+
+    def segments(self):
+        """Yields the segments of a line or the edges of a polygon."""
+        coords = self.coords
+        for index in range(0, len(coords) - 2, 2):
+            yield coords[index:index + 4]
+        if self.type == 'polygon' and len(coords) > 4:
+            yield coords[-2:] + coords[:2]
+
+    def area(self, area):
+        """Returns 1 when the area encloses the shape, 0 when they overlap and -1 otherwise, as Tk does."""
+        half_width = self.half_width()
+        xs = self.coords[0::2]
+        ys = self.coords[1::2]
+        x1, y1, x2, y2 = min(xs) - half_width, min(ys) - half_width, max(xs) + half_width, max(ys) + half_width
+        if area[0] <= x1 and area[1] <= y1 and area[2] >= x2 and area[3] >= y2:
+            return 1
+        if self.type == 'rectangle':
+            if area[2] <= x1 or area[0] >= x2 or area[3] <= y1 or area[1] >= y2:
+                return -1
+            if not self.filled() and (area[0] >= x1 + 2 * half_width and area[1] >= y1 + 2 * half_width
+                                      and area[2] <= x2 - 2 * half_width and area[3] <= y2 - 2 * half_width):
+                return -1
+            return 0
+        if self.type == 'oval':
+            return self._oval_area(area, (x1, y1, x2, y2), half_width)
+        if self.type == 'polygon' and self.filled():
+            if _inside_polygon(area[0], area[1], self.coords):
+                return 0
+        for segment in self.segments():
+            if _segment_area_distance(*segment, area) <= half_width:
+                return 0
+        if len(self.coords) == 2 and _area_distance(xs[0], ys[0], area) <= half_width:
+            return 0
+        return -1
+
+    def _oval_area(self, area, oval, half_width):
+        """Tests an oval against an area, like TkOvalToArea and the check of unfilled ovals of Tk."""
+        if area[2] < oval[0] or area[0] > oval[2] or area[3] < oval[1] or area[1] > oval[3]:
+            return -1
+        center_x = (oval[0] + oval[2]) / 2
+        center_y = (oval[1] + oval[3]) / 2
+        radius_x = (oval[2] - oval[0]) / 2
+        radius_y = (oval[3] - oval[1]) / 2
+        if radius_x <= 0 or radius_y <= 0:
+            return 0
+        dx = (min(max(center_x, area[0]), area[2]) - center_x) / radius_x
+        dy = (min(max(center_y, area[1]), area[3]) - center_y) / radius_y
+        if dx * dx + dy * dy > 1.0:
+            return -1
+        if self.filled():
+            return 0
+        inner_x = radius_x - 2 * half_width
+        inner_y = radius_y - 2 * half_width
+        if inner_x <= 0 or inner_y <= 0:
+            return 0
+        for x in (area[0], area[2]):
+            for y in (area[1], area[3]):
+                if ((x - center_x) / inner_x) ** 2 + ((y - center_y) / inner_y) ** 2 >= 1.0:
+                    return 0
+        return -1
+
+    def distance(self, x, y):
+        """Returns the distance of the point from the shape, as Tk measures it for find closest."""
+        half_width = self.half_width()
+        xs = self.coords[0::2]
+        ys = self.coords[1::2]
+        x1, y1, x2, y2 = min(xs) - half_width, min(ys) - half_width, max(xs) + half_width, max(ys) + half_width
+        if self.type == 'rectangle':
+            if x1 <= x < x2 and y1 <= y < y2:
+                if self.filled():
+                    return 0.0
+                return max(min(x - x1, x2 - x, y - y1, y2 - y) - 2 * half_width, 0.0)
+            return _area_distance(x, y, (x1, y1, x2, y2))
+        if self.type == 'oval':
+            return self._oval_distance(x, y, (x1, y1, x2, y2), 2 * half_width)
+        if self.type == 'polygon' and self.filled() and _inside_polygon(x, y, self.coords):
+            return 0.0
+        distance = min((_segment_distance(x, y, *segment) for segment in self.segments()),
+                       default=math.hypot(x - xs[0], y - ys[0]))
+        return max(distance - half_width, 0.0)
+
+    def _oval_distance(self, x, y, oval, width):
+        """Returns the distance of the point from an oval, approximated like TkOvalToPoint."""
+        dx = x - (oval[0] + oval[2]) / 2
+        dy = y - (oval[1] + oval[3]) / 2
+        radius_x = (oval[2] - oval[0]) / 2
+        radius_y = (oval[3] - oval[1]) / 2
+        if radius_x <= 0 or radius_y <= 0:
+            return _area_distance(x, y, oval)
+        to_center = math.hypot(dx, dy)
+        scaled = math.hypot(dx / radius_x, dy / radius_y)
+        if scaled > 1.0:
+            return to_center / scaled * (scaled - 1.0)
+        if self.filled():
+            return 0.0
+        if scaled > 1e-10:
+            to_outline = to_center / scaled * (1.0 - scaled) - width
+        else:
+            to_outline = min(radius_x, radius_y) - width
+        return max(to_outline, 0.0)
+
+
+class SpatialIndex(CanvasListener):
+    """Uniform grid of item bounding boxes that answers find_* queries without Tk.
+
+    Rectangles, ovals, lines and polygons are kept with their coordinates, outline width, fill and outline,
+    their bounding boxes are padded as Tk pads them and queries test their exact shapes as Tk does,
+    e.g. the inside of an oval without fill is not part of it.
+    Bounding boxes of other items, and of items the index can't follow, e.g. curves or lines with arrows,
+    are read from Tk before the next query, with a single Tcl call for all of them, and queries test them.
+    Arcs are bounded by their ovals, queries that come close to one ask Tk.
+    Results are in stacking order, the lowest item first, as Tk returns them.
+    """
+
+    # Items spanning more cells are kept aside and tested by every query.
+    max_cells = 256
+
+    def __init__(self, better_canvas, cell_size=64):
+        """Creates an empty index.
+
+        Args:
+            better_canvas: BetterCanvas the index belongs to.
+            cell_size: Width and height of a grid cell in canvas units.
+        """
+        self.better_canvas = better_canvas
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+        self.large = set()
+        self.bboxes = {}
+        self.shapes = {}
+        self.measured = set()
+        self.stale = set()
+        self.hidden = set()
+        self.extent = None
+        self.order_key = None
+
+    def __len__(self):
+        return len(self.bboxes) + len(self.stale)
+
+    def __contains__(self, item_id):
+        return item_id in self.bboxes or item_id in self.stale
+
+    def add_existing(self):
+        """Adds all items that are already on the canvas.
+
+        Their types and coordinates are read with a single Tcl call and options of shapes with another one,
+        bounding boxes of other items are read from Tk."""
+        self.better_canvas.flush()
+        backend = self.better_canvas.backend
+        item_ids = [int(item_id) for item_id in backend.find_all()]
+        results = iter(backend.evaluate([command for item_id in item_ids for command in (('type', item_id), ('coords', item_id))]))
+        records = [(item_id, str(next(results)), backend.split(next(results))) for item_id in item_ids]
+        commands = []
+        for item_id, item_type, _ in records:
+            options = ('state', ) + (SHAPE_READS.get(item_type, ()))
+            commands.extend(('itemcget', item_id, '-' + name) for name in options)
+        results = iter(backend.evaluate(commands))
+        for item_id, item_type, coords in records:
+            options = {name: str(next(results)) for name in ('state', ) + SHAPE_READS.get(item_type, ())}
+            self.created(item_id, items.ITEM_TYPES[item_type], coords, options)
+
+    def _cell_ranges(self, bbox):
+        """Returns ranges of cell columns and rows covered by the bounding box."""
+        size = self.cell_size
+        x1, y1, x2, y2 = bbox
+        return (range(math.floor(x1 / size), math.floor(x2 / size) + 1),
+                range(math.floor(y1 / size), math.floor(y2 / size) + 1))
+
+    def _insert(self, item_id, bbox):
+        """Stores the bounding box of the item in the grid."""
+        self.bboxes[item_id] = bbox
+        columns, rows = self._cell_ranges(bbox)
+        if len(columns) * len(rows) > self.max_cells:
+            self.large.add(item_id)
+            return
+        for column in columns:
+            for row in rows:
+                self.cells[column, row].add(item_id)
+        if self.extent is None:
+            self.extent = [columns[0], rows[0], columns[-1], rows[-1]]
+        else:
+            extent = self.extent
+            extent[0] = min(extent[0], columns[0])
+            extent[1] = min(extent[1], rows[0])
+            extent[2] = max(extent[2], columns[-1])
+            extent[3] = max(extent[3], rows[-1])
+
+    def _remove(self, item_id):
+        """Removes the bounding box of the item from the grid."""
+        bbox = self.bboxes.pop(item_id, None)
+        if bbox is None:
+            return
+        if item_id in self.large:
+            self.large.discard(item_id)
+            return
+        columns, rows = self._cell_ranges(bbox)
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((column, row))
+                if cell is not None:
+                    cell.discard(item_id)
+                    if not cell:
+                        del self.cells[column, row]
+
+    def insert(self, item_id, bbox):
+        """Stores a bounding box given by the caller, replacing the known one, queries test only the bounding box.
+
+        Ids don't need to belong to canvas items, e.g. VirtualCanvas indexes its logical items with it."""
+        self._remove(item_id)
+        self.stale.discard(item_id)
+        self.shapes.pop(item_id, None)
+        self._insert(item_id, tuple(bbox))
+
+    def remove(self, item_id):
+        """Drops the bounding box stored with insert."""
+        self._remove(item_id)
+        self.hidden.discard(item_id)
+
+    def _shape_bbox(self, item_id, coords):
+        """Stores coordinates of the shape and its bounding box, or marks the item stale."""
+        self._remove(item_id)
+        try:
+            coords = tuple(float(value) for value in coords)
+        except (TypeError, ValueError):
+            coords = ()
+        if len(coords) < 2 or len(coords) % 2:
+            self._measure(item_id)
+            return
+        shape = self.shapes[item_id]
+        shape.coords = coords
+        self._insert(item_id, shape.bbox())
+
+    def _measure(self, item_id):
+        """Drops the shape of the item, its bounding box is read from Tk before the next query."""
+        self._remove(item_id)
+        self.shapes.pop(item_id, None)
+        self.measured.add(item_id)
+        self.stale.add(item_id)
+
+    def _mark_stale(self, item_id):
+        """Drops the bounding box of the item, it's read from Tk before the next query."""
+        self._remove(item_id)
+        self.stale.add(item_id)
+
+    def _update(self):
+        """Reads bounding boxes of stale items from Tk with a single Tcl call."""
+        if not self.stale:
+            return
+        self.better_canvas.flush()
+        backend = self.better_canvas.backend
+        item_ids = list(self.stale)
+        self.stale.clear()
+        results = backend.evaluate([('bbox', item_id) for item_id in item_ids])
+        for item_id, result in zip(item_ids, results):
+            bbox = backend.split(result)
+            if bbox:
+                self._insert(item_id, tuple(float(value) for value in bbox))
+            else:
+                self.bboxes[item_id] = None
+
+    def created(self, item_id, item_type, coords, options):
+        if options.get('state') == 'hidden':
+            self.hidden.add(item_id)
+        if not issubclass(item_type, SHAPES):
+            self._measure(item_id)
+            return
+        try:
+            self.shapes[item_id] = _Shape(item_type.tk_type, options)
+        except (TypeError, ValueError):
+            self._measure(item_id)
+            return
+        self._shape_bbox(item_id, coords)
+
+    def moved(self, item_ids, dx, dy):
+        for item_id in item_ids:
+            shape = self.shapes.get(item_id)
+            if shape is not None:
+                self._shape_bbox(item_id, [value + (dx if index % 2 == 0 else dy) for index, value in enumerate(shape.coords)])
+                continue
+            bbox = self.bboxes.get(item_id)
+            if bbox is None:
+                continue
+            self._remove(item_id)
+            self._insert(item_id, (bbox[0] + dx, bbox[1] + dy, bbox[2] + dx, bbox[3] + dy))
+
+    def coords_changed(self, item_id, coords):
+        if item_id not in self:
+            return
+        if item_id in self.shapes:
+            self._shape_bbox(item_id, coords)
+        else:
+            self._mark_stale(item_id)
+
+    def scaled(self, item_ids, x_origin, y_origin, x_scale, y_scale):
+        for item_id in item_ids:
+            shape = self.shapes.get(item_id)
+            if shape is not None:
+                self._shape_bbox(item_id, [x_origin + (value - x_origin) * x_scale if index % 2 == 0 else y_origin + (value - y_origin) * y_scale
+                                           for index, value in enumerate(shape.coords)])
+            elif item_id in self:
+                self._mark_stale(item_id)
+
+    def configured(self, item_ids, options):
+        for item_id in item_ids:
+            if item_id not in self:
+                continue
+            if 'state' in options:
+                if options['state'] == 'hidden':
+                    self.hidden.add(item_id)
+                else:
+                    self.hidden.discard(item_id)
+            shape = self.shapes.get(item_id)
+            if shape is not None:
+                try:
+                    shape.configure(options)
+                except (TypeError, ValueError):
+                    self._measure(item_id)
+                else:
+                    if 'width' in options or 'outline' in options:
+                        self._shape_bbox(item_id, shape.coords)
+            elif 'state' in options or GEOMETRY_OPTIONS.intersection(options):
+                # Tk has no bounding box for hidden items, it's read again when they are shown.
+                self._mark_stale(item_id)
+
+    def deleted(self, item_ids):
+        for item_id in item_ids:
+            self._remove(item_id)
+            self.stale.discard(item_id)
+            self.measured.discard(item_id)
+            self.hidden.discard(item_id)
+            self.shapes.pop(item_id, None)
+
+    def _candidates(self, x1, y1, x2, y2):
+        """Returns ids of items in cells covered by the area."""
+        columns, rows = self._cell_ranges((x1, y1, x2, y2))
+        candidates = set(self.large)
+        if len(columns) * len(rows) > len(self.cells):
+            for cell in self.cells.values():
+                candidates.update(cell)
+            return candidates
+        for column in columns:
+            for row in rows:
+                cell = self.cells.get((column, row))
+                if cell:
+                    candidates.update(cell)
+        return candidates
+
+    def _sorted(self, item_ids):
+        """Returns the ids in stacking order."""
+        return tuple(sorted(item_ids, key=self.order_key))
+
+    def _find_area(self, x1, y1, x2, y2, enclosed):
+        """Returns ids of items that overlap the area, or that it encloses, in stacking order."""
+        self._update()
+        area = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+        bboxes = self.bboxes
+        shapes = self.shapes
+        found = []
+        arcs = []
+        for item_id in self._candidates(*area):
+            if item_id in self.hidden:
+                continue
+            bbox = bboxes[item_id]
+            if bbox[0] > area[2] or bbox[2] < area[0] or bbox[1] > area[3] or bbox[3] < area[1]:
+                continue
+            shape = shapes.get(item_id)
+            if shape is None:
+                if not enclosed or (bbox[0] >= area[0] and bbox[2] <= area[2] and bbox[1] >= area[1] and bbox[3] <= area[3]):
+                    found.append(item_id)
+            elif shape.type == 'arc':
+                arcs.append(item_id)
+            elif shape.area(area) >= enclosed:
+                found.append(item_id)
+        if arcs:
+            self.better_canvas.flush()
+            backend = self.better_canvas.backend
+            query = backend.find_enclosed if enclosed else backend.find_overlapping
+            found.extend(set(arcs).intersection(int(item_id) for item_id in query(*area)))
+        return self._sorted(found)
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        """Returns ids of items that overlap the rectangle or are enclosed by it."""
+        return self._find_area(x1, y1, x2, y2, 0)
+
+    def find_enclosed(self, x1, y1, x2, y2):
+        """Returns ids of items that are completely enclosed by the rectangle."""
+        return self._find_area(x1, y1, x2, y2, 1)
+
+    def find_closest(self, x, y, halo=None):
+        """Returns a tuple with the id of the item closest to the point.
+
+        Items within halo distance are treated as overlapping the point.
+        From items at the same distance the topmost one is returned.
+        Returns an empty tuple when there are no items."""
+        self._update()
+        halo = halo or 0
+        order_key = self.order_key or (lambda item_id: item_id)
+        best = None
+        best_distance = math.inf
+        arc_distance = math.inf
+
+        def consider(item_ids):
+            nonlocal best, best_distance, arc_distance
+            for item_id in item_ids:
+                if item_id in self.hidden:
+                    continue
+                bbox = self.bboxes[item_id]
+                distance = _area_distance(x, y, bbox)
+                shape = self.shapes.get(item_id)
+                if shape is not None:
+                    if shape.type == 'arc':
+                        arc_distance = min(arc_distance, max(distance - halo, 0))
+                        continue
+                    if distance - halo > best_distance:
+                        continue
+                    distance = shape.distance(x, y)
+                distance = max(distance - halo, 0)
+                if distance < best_distance or (distance == best_distance and order_key(item_id) > order_key(best)):
+                    best = item_id
+                    best_distance = distance
+
+        consider(self.large)
+        if self.extent is not None:
+            size = self.cell_size
+            column = math.floor(x / size)
+            row = math.floor(y / size)
+            extent = self.extent
+            max_radius = max(column - extent[0], extent[2] - column, row - extent[1], extent[3] - row, 0)
+            for radius in range(max_radius + 1):
+                if best is not None and best_distance + halo < (radius - 1) * size:
+                    break
+                for cell in self._ring(column, row, radius):
+                    consider(self.cells.get(cell, ()))
+        if arc_distance <= best_distance:
+            # An arc may be closer, only Tk knows.
+            self.better_canvas.flush()
+            return tuple(int(item_id) for item_id in self.better_canvas.backend.find_closest(x, y, halo or None))
+        return () if best is None else (best, )
+
+    @staticmethod
+    def _ring(column, row, radius):
+        """Yields cells at the given Chebyshev distance from the cell."""
+        if radius == 0:
+            yield column, row
+            return
+        for offset in range(-radius, radius + 1):
+            yield column + offset, row - radius
+            yield column + offset, row + radius
+        for offset in range(-radius + 1, radius):
+            yield column - radius, row + offset
+            yield column + radius, row + offset
@@ -0,0 +1,309 @@
+"""This module contains the StackingOrder class that keeps the stacking order of items on the Python side."""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from .listeners import CanvasListener
+
+
+class _Layer():
+    """Items of a layer in stacking order, the lowest first, with ascending order keys."""
+
+    __slots__ = ('name', 'rank', 'keys', 'ids')
+
+    def __init__(self, name):
+        self.name = name
+        self.rank = 0
+        self.keys = []
+        self.ids = []
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name} with {len(self.ids)} items>"
+
+
+class StackingOrder(CanvasListener):
+    """Stacking order of items kept in named layers, each a sorted list of order keys.
+
+    All items of a layer are drawn above the items of lower layers.
+    New items are put on top of the current layer, "default" unless changed with in_layer.
+    Moving items inserts them between the keys of their new neighbours, so a move costs
+    a binary search and a list insertion, and neighbours are found without Tk.
+    Items are restacked in Tk with one raise or lower subcommand per moved item,
+    all of them in a single Tcl call.
+    Changes made with canvas.tag_raise or tag_lower directly are not seen by it.
+    """
+
+    # Smallest gap between order keys of neighbours before a layer is renumbered.
+    min_gap = 1e-9
+
+    def __init__(self, better_canvas, default='default'):
+        """Creates a stacking order with a single empty layer.
+
+        Args:
+            better_canvas: BetterCanvas whose items are ordered.
+            default: Name of the first layer, new items go to it.
+        """
+        self.better_canvas = better_canvas
+        self.layers = []
+        self.by_name = {}
+        self.positions = {}
+        self.pending = set()
+        self._after_id = None
+        self.add_layer(default)
+        self.current = self.by_name[default]
+
+    def __len__(self):
+        """Returns the number of ordered items."""
+        return len(self.positions)
+
+    def __contains__(self, item_id):
+        return item_id in self.positions
+
+    @property
+    def names(self):
+        """Names of the layers from the lowest to the topmost."""
+        return [layer.name for layer in self.layers]
+
+    def add_layer(self, name, above=None, below=None):
+        """Adds an empty layer.
+
+        Args:
+            name: Name of the new layer.
+            above: Name of the layer the new one is put right above.
+            below: Name of the layer the new one is put right below, the new layer is the topmost when both are None.
+        """
+        if name in self.by_name:
+            raise ValueError(f"Layer {name} already exists.")
+        if above is not None:
+            index = self.layers.index(self._layer(above)) + 1
+        elif below is not None:
+            index = self.layers.index(self._layer(below))
+        else:
+            index = len(self.layers)
+        layer = _Layer(name)
+        self.layers.insert(index, layer)
+        self.by_name[name] = layer
+        for rank, layer in enumerate(self.layers):
+            layer.rank = rank
+
+    def _layer(self, name):
+        """Returns the layer with the name."""
+        try:
+            return self.by_name[name]
+        except KeyError:
+            raise ValueError(f"Unknown layer {name}, use one of {', '.join(self.by_name)}.") from None
+
+    @contextmanager
+    def in_layer(self, name):
+        """Context manager that puts items created inside the with block on top of the layer.
+
+        Example:
+            with canvas.stacking.in_layer('labels'):
+                canvas.create_text(10, 10, text='Kitchen')
+        """
+        previous, self.current = self.current, self._layer(name)
+        try:
+            yield
+        finally:
+            self.current = previous
+
+    def add_existing(self):
+        """Adds all items that are already on the canvas to the current layer, in their stacking order in Tk."""
+        self.better_canvas.flush()
+        item_ids = [int(item_id) for item_id in self.better_canvas.canvas.find_all()]
+        self._insert(self.current, len(self.current.ids), [item_id for item_id in item_ids if item_id not in self.positions])
+
+    def order_key(self, item_id):
+        """Returns a key that sorts ids in stacking order, the lowest item first.
+
+        It can be used as order_key of SpatialIndex and TagIndex.
+        Items that are not ordered, e.g. created behind the canvas' back, sort below all others."""
+        position = self.positions.get(item_id)
+        if position is None:
+            return (-1, float(item_id))
+        return (position[0].rank, position[1])
+
+    def layer_of(self, item_id):
+        """Returns the name of the layer of the item."""
+        return self.positions[item_id][0].name
+
+    def items_in(self, name):
+        """Returns ids of the items of the layer, the lowest first."""
+        return tuple(self._layer(name).ids)
+
+    def _index(self, item_id):
+        """Returns the layer of the item and the item's index in it."""
+        layer, key = self.positions[item_id]
+        return layer, bisect_left(layer.keys, key)
+
+    def find_above(self, item_id):
+        """Returns the id of the item right above the item, or None."""
+        layer, index = self._index(item_id)
+        if index + 1 < len(layer.ids):
+            return layer.ids[index + 1]
+        for upper in self.layers[layer.rank + 1:]:
+            if upper.ids:
+                return upper.ids[0]
+        return None
+
+    def find_below(self, item_id):
+        """Returns the id of the item right below the item, or None."""
+        layer, index = self._index(item_id)
+        if index > 0:
+            return layer.ids[index - 1]
+        for lower in reversed(self.layers[:layer.rank]):
+            if lower.ids:
+                return lower.ids[-1]
+        return None
+
+    def _renumber(self, layer):
+        """Spreads order keys of the layer evenly."""
+        layer.keys = [float(index) for index in range(len(layer.ids))]
+        for key, item_id in zip(layer.keys, layer.ids):
+            self.positions[item_id] = (layer, key)
+
+    def _insert(self, layer, index, item_ids):
+        """Inserts ids at the index of the layer, between the keys of their new neighbours."""
+        if not item_ids:
+            return
+        count = len(item_ids)
+        keys = layer.keys
+        for _ in range(2):
+            low = keys[index - 1] if index > 0 else (keys[0] - count - 1 if keys else 0.0)
+            high = keys[index] if index < len(keys) else low + count + 1
+            step = (high - low) / (count + 1)
+            if step > self.min_gap * max(1.0, abs(low)):
+                break
+            self._renumber(layer)
+            keys = layer.keys
+        new_keys = [low + step * (offset + 1) for offset in range(count)]
+        keys[index:index] = new_keys
+        layer.ids[index:index] = item_ids
+        for key, item_id in zip(new_keys, item_ids):
+            self.positions[item_id] = (layer, key)
+
+    def _remove(self, item_ids):
+        """Removes the ids from their layers."""
+        by_layer = {}
+        for item_id in item_ids:
+            position = self.positions.pop(item_id, None)
+            if position is not None:
+                by_layer.setdefault(position[0], []).append(position[1])
+        for layer, keys in by_layer.items():
+            if len(keys) < 32:
+                for key in keys:
+                    index = bisect_left(layer.keys, key)
+                    del layer.keys[index]
+                    del layer.ids[index]
+            else:
+                removed = set(keys)
+                kept = [(key, item_id) for key, item_id in zip(layer.keys, layer.ids) if key not in removed]
+                layer.keys = [key for key, _ in kept]
+                layer.ids = [item_id for _, item_id in kept]
+
+    def _sorted(self, item_ids):
+        """Returns known ids without duplicates, in stacking order."""
+        return sorted({item_id for item_id in item_ids if item_id in self.positions}, key=self.order_key)
+
+    def set_layer(self, targets, name):
+        """Moves items on top of the layer, keeping their relative order.
+
+        Args:
+            targets: Items, item ids, an ItemView or an ItemCollection.
+            name: Name of the layer.
+        """
+        layer = self._layer(name)
+        item_ids = self._sorted(self.better_canvas._ids_of(targets))
+        self._remove(item_ids)
+        self._insert(layer, len(layer.ids), item_ids)
+        self._restack(item_ids)
+
+    def raise_items(self, targets, above=None):
+        """Moves items up, keeping their relative order, with a single Tcl call.
+
+        Args:
+            targets: Items, item ids, an ItemView or an ItemCollection.
+            above: Item or id the items are put right above, in its layer,
+                every item goes on top of its own layer when None.
+        """
+        item_ids = self._sorted(self.better_canvas._ids_of(targets))
+        if above is None:
+            by_layer = {}
+            for item_id in item_ids:
+                by_layer.setdefault(self.positions[item_id][0], []).append(item_id)
+            self._remove(item_ids)
+            for layer, ids in by_layer.items():
+                self._insert(layer, len(layer.ids), ids)
+        else:
+            above = getattr(above, 'id', above)
+            item_ids = [item_id for item_id in item_ids if item_id != above]
+            self._remove(item_ids)
+            layer, index = self._index(above)
+            self._insert(layer, index + 1, item_ids)
+        self._restack(item_ids)
+
+    def lower_items(self, targets, below=None):
+        """Moves items down, keeping their relative order, with a single Tcl call.
+
+        Args:
+            targets: Items, item ids, an ItemView or an ItemCollection.
+            below: Item or id the items are put right below, in its layer,
+                every item goes to the bottom of its own layer when None.
+        """
+        item_ids = self._sorted(self.better_canvas._ids_of(targets))
+        if below is None:
+            by_layer = {}
+            for item_id in item_ids:
+                by_layer.setdefault(self.positions[item_id][0], []).append(item_id)
+            self._remove(item_ids)
+            for layer, ids in by_layer.items():
+                self._insert(layer, 0, ids)
+        else:
+            below = getattr(below, 'id', below)
+            item_ids = [item_id for item_id in item_ids if item_id != below]
+            self._remove(item_ids)
+            layer, index = self._index(below)
+            self._insert(layer, index, item_ids)
+        self._restack(item_ids)
+
+    def _restack(self, item_ids):
+        """Restacks the moved items and items waiting for it in Tk with a single Tcl call.
+
+        Items are handled from the lowest up and each is put right above the item below it,
+        which is either in place already or was moved before, or to the bottom when it's the lowest item."""
+        item_ids = sorted(self.pending.union(item_ids), key=self.order_key)
+        self.pending.clear()
+        if self._after_id is not None:
+            self.better_canvas.backend.after_cancel(self._after_id)
+            self._after_id = None
+        commands = []
+        for item_id in item_ids:
+            if item_id not in self.positions:
+                continue
+            below = self.find_below(item_id)
+            if below is not None:
+                commands.append(('raise', item_id, below))
+            else:
+                commands.append(('lower', item_id))
+        self.better_canvas.backend.evaluate(commands)
+
+    def apply(self):
+        """Restacks items created below the top of the canvas in Tk, it is called when Tk is idle."""
+        self._after_id = None
+        if self.pending:
+            self._restack(())
+
+    def created(self, item_id, item_type, coords, options):
+        layer = self.current
+        self._insert(layer, len(layer.ids), [item_id])
+        if any(upper.ids for upper in self.layers[layer.rank + 1:]):
+            self.pending.add(item_id)
+            backend = self.better_canvas.backend
+            if not backend.event_loop:
+                self.apply()
+            elif self._after_id is None:
+                self._after_id = backend.after_idle(self.apply)
+
+    def deleted(self, item_ids):
+        self._remove(item_ids)
+        self.pending.difference_update(item_ids)
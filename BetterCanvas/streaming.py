@@ -0,0 +1,187 @@
+"""This module contains classes that stream points into a line item and push them once per frame."""
+
+import tkinter as tk
+from array import array
+
+
+class RingBuffer():
+    """Fixed number of the latest points, kept in two arrays of doubles.
+
+    Appending costs time proportional to the number of appended points,
+    the oldest points are overwritten once the buffer is full.
+    """
+
+    def __init__(self, capacity):
+        """Creates an empty buffer.
+
+        Args:
+            capacity: Number of points the buffer keeps.
+        """
+        if capacity < 2:
+            raise ValueError(f"RingBuffer expects a capacity of at least 2. {capacity} was given.")
+        self.capacity = capacity
+        self.x = array('d', bytes(8 * capacity))
+        self.y = array('d', bytes(8 * capacity))
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, points):
+        """Appends points given as (x, y) pairs, or as a flat sequence of x and y values.
+
+        Returns:
+            The number of appended points."""
+        if hasattr(points, 'tolist'):
+            points = points.tolist()
+        elif not isinstance(points, (list, tuple)):
+            points = list(points)
+        values = tk._flatten(points)
+        if len(values) % 2 != 0:
+            raise ValueError(f"Points must have an even number of values. {len(values)} were given.")
+        count = len(values) // 2
+        capacity = self.capacity
+        if count >= capacity:
+            values = values[2 * (count - capacity):]
+            self.x = array('d', values[0::2])
+            self.y = array('d', values[1::2])
+            self.start = 0
+            self.length = capacity
+            return count
+        end = (self.start + self.length) % capacity
+        first = min(count, capacity - end)
+        self.x[end:end + first] = array('d', values[0:2 * first:2])
+        self.y[end:end + first] = array('d', values[1:2 * first:2])
+        if first < count:
+            self.x[:count - first] = array('d', values[2 * first::2])
+            self.y[:count - first] = array('d', values[2 * first + 1::2])
+        overflow = max(self.length + count - capacity, 0)
+        self.start = (self.start + overflow) % capacity
+        self.length += count - overflow
+        return count
+
+    def clear(self):
+        """Drops all points."""
+        self.start = 0
+        self.length = 0
+
+    def values(self):
+        """Returns x and y values of the points from the oldest to the latest, as two arrays."""
+        start, end = self.start, self.start + self.length
+        if end <= self.capacity:
+            return self.x[start:end], self.y[start:end]
+        end -= self.capacity
+        return self.x[start:] + self.x[:end], self.y[start:] + self.y[:end]
+
+
+def decimate(x, y, buckets):
+    """Returns flat coordinates of at most 2 * buckets points that keep the shape of the line.
+
+    Points are split into buckets of consecutive points and the lowest and the highest point
+    of every bucket are kept in their original order, so spikes stay visible.
+    With a bucket per pixel column of evenly sampled data the line looks the same as with all points.
+
+    Args:
+        x: Sequence of x values.
+        y: Sequence of y values.
+        buckets: Number of buckets, usually the visible width in pixels.
+    """
+    count = len(y)
+    if buckets <= 0 or count <= 2 * buckets:
+        coords = [0.0] * (2 * count)
+        coords[0::2] = x
+        coords[1::2] = y
+        return coords
+    coords = []
+    for bucket in range(buckets):
+        first = bucket * count // buckets
+        last = (bucket + 1) * count // buckets
+        part = y[first:last]
+        low = first + part.index(min(part))
+        high = first + part.index(max(part))
+        if low > high:
+            low, high = high, low
+        coords += (x[low], y[low])
+        if high != low:
+            coords += (x[high], y[high])
+    return coords
+
+
+class LineStream():
+    """Points streamed into a line item.
+
+    Appended points are kept in a RingBuffer of fixed capacity, so old points drop out.
+    The line coordinates are pushed at most once per frame of the frame scheduler,
+    which is started for the stream when none runs and stops once the line is up to date,
+    decimated to about two points per visible pixel column, however many points were appended.
+    On canvas backends without the Tk event loop call update to push the coordinates.
+    """
+
+    def __init__(self, line, capacity=10000, pixels=None):
+        """Creates an empty stream of the line.
+
+        Args:
+            line: Line item created by a BetterCanvas.
+            capacity: Number of latest points the line shows.
+            pixels: Number of buckets the points are decimated to,
+                the width of the canvas when None, no decimation when 0.
+        """
+        self.line = line
+        self.buffer = RingBuffer(capacity)
+        self.pixels = pixels
+        self.dirty = False
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def append(self, points):
+        """Appends points given as (x, y) pairs, the line shows them from the next frame."""
+        if not self.buffer.append(points):
+            return
+        self.dirty = True
+        better_canvas = self.line.better_canvas
+        if better_canvas is None or not better_canvas.backend.event_loop:
+            return
+        scheduler = better_canvas._frames()
+        if self.frame not in scheduler.callbacks:
+            scheduler.callbacks.append(self.frame)
+
+    def clear(self):
+        """Drops all points, the line keeps its coordinates until new points are appended."""
+        self.buffer.clear()
+        self.dirty = False
+
+    def width(self):
+        """Returns the number of buckets points are decimated to."""
+        if self.pixels is not None:
+            return self.pixels
+        better_canvas = self.line.better_canvas
+        if better_canvas is None:
+            return 0
+        return int(better_canvas.backend.view_size()[0])
+
+    def coords(self):
+        """Returns flat coordinates of the decimated points."""
+        x, y = self.buffer.values()
+        return decimate(x, y, self.width())
+
+    def update(self):
+        """Pushes the coordinates of the line if points were appended since the last update.
+
+        Returns:
+            Whether the coordinates were pushed."""
+        if not self.dirty or len(self.buffer) < 2:
+            return False
+        self.line.coords = self.coords()
+        self.dirty = False
+        self.updates += 1
+        return True
+
+    def frame(self, frame_time):
+        """Updates the line, it is called at the start of a frame."""
+        self.update()
+        scheduler = self.line.better_canvas.scheduler
+        if scheduler is not None and self.frame in scheduler.callbacks:
+            scheduler.callbacks.remove(self.frame)
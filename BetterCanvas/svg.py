@@ -0,0 +1,265 @@
+"""This module contains SvgExporter that writes items of a canvas to an SVG file as a stream."""
+
+import math
+import os
+import re
+import tkinter as tk
+from array import array
+from xml.sax.saxutils import escape, quoteattr
+
+from .backends import DEFAULTS, screen_distance
+from .items import option_string
+
+# Tk capstyle values mapped to SVG stroke-linecap.
+LINECAPS = {'butt': 'butt', 'projecting': 'square', 'round': 'round'}
+# Dash lengths of Tk dash pattern characters in multiples of the line width.
+DASH_CHARACTERS = {'.': (2, 4), '-': (6, 4), ',': (4, 4), '_': (8, 4)}
+# Parts of a Tk font description, braced families may contain spaces.
+FONT_PART = re.compile(r'\{([^}]*)\}|(\S+)')
+
+
+class SvgExporter():
+    """Writes items of a BetterCanvas as SVG elements, in stacking order and in chunks.
+
+    Items are read chunk by chunk, each chunk with a single Tcl call,
+    and its elements are written before the next one is read, so memory use does not grow with the scene.
+    Options are taken from the Python side where they are known,
+    only items with unknown options are asked for their configuration.
+    Rectangles, ovals, arcs, lines, polygons, texts and images are exported with their
+    fill, outline, width, dash and state, hidden items are left out.
+    Smoothing, arrows, stipples, bitmaps and windows are not exported.
+    Override the method named after a Tk item type to change how items of the type are written.
+    """
+
+    def __init__(self, better_canvas, chunk_size=1000):
+        """Creates an exporter of the canvas.
+
+        Args:
+            better_canvas: BetterCanvas to export.
+            chunk_size: Number of items read with a single Tcl call.
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"SvgExporter expects a positive chunk_size. {chunk_size} was given.")
+        self.better_canvas = better_canvas
+        self.chunk_size = chunk_size
+        self.colors = {}
+        self.images = {}
+
+    def export(self, file):
+        """Writes the SVG document.
+
+        Args:
+            file: A writable text file-like object or a path.
+        Returns:
+            The number of exported items.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'w', encoding='utf-8') as opened:
+                return self.export(opened)
+        better_canvas = self.better_canvas
+        better_canvas.flush()
+        canvas = better_canvas.canvas
+        item_ids = array('q', map(int, canvas.find_all()))
+        x1, y1, x2, y2 = canvas.bbox('all') or (0, 0, 0, 0)
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+                   f'width="{x2 - x1}" height="{y2 - y1}" viewBox="{x1} {y1} {x2 - x1} {y2 - y1}">\n')
+        exported = 0
+        for start in range(0, len(item_ids), self.chunk_size):
+            elements = []
+            for item_type, coords, options in self._read(item_ids[start:start + self.chunk_size]):
+                method = getattr(self, item_type, None)
+                if method is None or options.get('state') == 'hidden':
+                    continue
+                element = method(coords, options)
+                if element:
+                    elements.append(element)
+            exported += len(elements)
+            if elements:
+                file.write('\n'.join(elements) + '\n')
+        file.write('</svg>\n')
+        return exported
+
+    def _read(self, item_ids):
+        """Returns (type, coords, options) of the items, options include defaults of the type."""
+        backend = self.better_canvas.backend
+        registry = self.better_canvas.items
+        known = [registry.known_options(item_id) for item_id in item_ids]
+        commands = []
+        for item_id in item_ids:
+            commands.extend((('type', item_id), ('coords', item_id)))
+        commands.extend(('itemconfigure', item_id) for item_id, options in zip(item_ids, known) if options is None)
+        results = iter(backend.evaluate(commands))
+        records = [(str(next(results)), [float(value) for value in backend.split(next(results))]) for _ in item_ids]
+        exported = []
+        for (item_type, coords), options in zip(records, known):
+            if options is None:
+                options = {}
+                for entry in backend.split(next(results)):
+                    name, _, _, _, value = backend.split(entry)
+                    options[str(name)[1:]] = str(value)
+            values = dict(DEFAULTS.get(item_type, {}))
+            for name, value in options.items():
+                if value is not None:
+                    values[name] = option_string(value)
+            exported.append((item_type, coords, values))
+        return exported
+
+    def color(self, color):
+        """Returns the Tk color as an SVG color, "none" for transparent."""
+        if not color:
+            return 'none'
+        try:
+            return self.colors[color]
+        except KeyError:
+            pass
+        if color.startswith('#') and len(color) in (10, 13):
+            digits = (len(color) - 1) // 3
+            svg_color = '#' + ''.join(color[1 + index * digits:3 + index * digits] for index in range(3))
+        elif color.startswith('#'):
+            svg_color = color.replace(' ', '').lower()
+        else:
+            try:
+                red, green, blue = (round(value) for value in self.better_canvas.animator.rgb(color))
+                svg_color = f'#{red:02x}{green:02x}{blue:02x}'
+            except tk.TclError:
+                # Color names are only known to Tk.
+                svg_color = color.replace(' ', '').lower()
+        self.colors[color] = svg_color
+        return svg_color
+
+    def _state_option(self, options, name):
+        """Returns the value of the option, its disabled variant for disabled items if set."""
+        if options.get('state') == 'disabled' and options.get('disabled' + name):
+            return options['disabled' + name]
+        return options.get(name, '')
+
+    def _stroke(self, options, color_option):
+        """Returns stroke attributes for the color option, width and dash of the item."""
+        width = screen_distance(self._state_option(options, 'width') or 1)
+        color = self._state_option(options, color_option)
+        if not color or width <= 0:
+            return ' stroke="none"'
+        attributes = f' stroke={quoteattr(self.color(color))} stroke-width="{width:g}"'
+        dash = self._state_option(options, 'dash').strip()
+        if dash:
+            if dash[0].isdigit():
+                lengths = dash.split()
+            else:
+                lengths = [length * width for character in dash for length in DASH_CHARACTERS.get(character, ())]
+            if lengths:
+                attributes += f' stroke-dasharray="{" ".join(f"{float(length):g}" for length in lengths)}"'
+        return attributes
+
+    def _fill(self, options):
+        return f' fill={quoteattr(self.color(self._state_option(options, "fill")))}'
+
+    def rectangle(self, coords, options):
+        x1, y1, x2, y2 = coords
+        return (f'<rect x="{min(x1, x2):g}" y="{min(y1, y2):g}" width="{abs(x2 - x1):g}" height="{abs(y2 - y1):g}"'
+                f'{self._fill(options)}{self._stroke(options, "outline")}/>')
+
+    def oval(self, coords, options):
+        x1, y1, x2, y2 = coords
+        return (f'<ellipse cx="{(x1 + x2) / 2:g}" cy="{(y1 + y2) / 2:g}" rx="{abs(x2 - x1) / 2:g}" ry="{abs(y2 - y1) / 2:g}"'
+                f'{self._fill(options)}{self._stroke(options, "outline")}/>')
+
+    def arc(self, coords, options):
+        x1, y1, x2, y2 = coords
+        extent = float(options['extent'])
+        if abs(extent) >= 360:
+            return self.oval(coords, options)
+        cx, cy, rx, ry = (x1 + x2) / 2, (y1 + y2) / 2, abs(x2 - x1) / 2, abs(y2 - y1) / 2
+        start = math.radians(float(options['start']))
+        end = start + math.radians(extent)
+        path = (f'M {cx + rx * math.cos(start):g} {cy - ry * math.sin(start):g} '
+                f'A {rx:g} {ry:g} 0 {int(abs(extent) > 180)} {int(extent < 0)} '
+                f'{cx + rx * math.cos(end):g} {cy - ry * math.sin(end):g}')
+        style = options['style']
+        if style == 'pieslice':
+            path += f' L {cx:g} {cy:g} Z'
+        elif style == 'chord':
+            path += ' Z'
+        fill = ' fill="none"' if style == 'arc' else self._fill(options)
+        return f'<path d="{path}"{fill}{self._stroke(options, "outline")}/>'
+
+    def _points(self, coords):
+        return ' '.join(f'{x:g},{y:g}' for x, y in zip(coords[::2], coords[1::2]))
+
+    def line(self, coords, options):
+        return (f'<polyline points="{self._points(coords)}" fill="none"{self._stroke(options, "fill")}'
+                f' stroke-linecap="{LINECAPS.get(options["capstyle"], "butt")}" stroke-linejoin="{options["joinstyle"]}"/>')
+
+    def polygon(self, coords, options):
+        return (f'<polygon points="{self._points(coords)}"{self._fill(options)}{self._stroke(options, "outline")}'
+                f' stroke-linejoin="{options["joinstyle"]}"/>')
+
+    def text(self, coords, options):
+        x, y = coords
+        lines = options.get('text', '').split('\n')
+        anchor = options['anchor']
+        text_anchor = 'start' if 'w' in anchor else 'end' if 'e' in anchor else 'middle'
+        if anchor.startswith('n'):
+            baseline, shift = 'hanging', 0
+        elif anchor.startswith('s'):
+            baseline, shift = 'text-after-edge', len(lines) - 1
+        else:
+            baseline, shift = 'central', (len(lines) - 1) / 2
+        tspans = ''.join(f'<tspan x="{x:g}" dy="{-shift * 1.2 if index == 0 else 1.2:g}em">{escape(line)}</tspan>'
+                         for index, line in enumerate(lines))
+        return (f'<text x="{x:g}" y="{y:g}" text-anchor="{text_anchor}" dominant-baseline="{baseline}"'
+                f'{self._font(options["font"])}{self._fill(options)}>{tspans}</text>')
+
+    def _font(self, font):
+        """Returns font attributes of a Tk font description like "{Times New Roman} 12 bold"."""
+        parts = [braced or plain for braced, plain in FONT_PART.findall(font)]
+        if not parts or parts[0].startswith('Tk'):
+            return ''
+        attributes = f' font-family={quoteattr(parts[0])}'
+        for part in parts[1:]:
+            if part.lstrip('-').isdigit():
+                size = int(part)
+                attributes += f' font-size="{size}pt"' if size > 0 else f' font-size="{-size}px"'
+            elif part == 'bold':
+                attributes += ' font-weight="bold"'
+            elif part == 'italic':
+                attributes += ' font-style="italic"'
+        return attributes
+
+    def image(self, coords, options):
+        x, y = coords
+        name = self._state_option(options, 'image')
+        if not name:
+            return None
+        href, width, height = self._image(name)
+        anchor = options['anchor']
+        if width and height:
+            x -= 0 if 'w' in anchor else width if 'e' in anchor else width / 2
+            y -= 0 if anchor.startswith('n') else height if anchor.startswith('s') else height / 2
+            size = f' width="{width}" height="{height}"'
+        else:
+            size = ''
+        return f'<image x="{x:g}" y="{y:g}"{size} xlink:href={quoteattr(href)}/>'
+
+    def _image(self, name):
+        """Returns the href, width and height of the image, PNG data is read once per image."""
+        try:
+            return self.images[name]
+        except KeyError:
+            pass
+        image = ('#' + name, 0, 0)
+        try:
+            data, width, height = self.better_canvas.backend.image_png(name)
+            image = (f'data:image/png;base64,{data}', width, height)
+        except tk.TclError:
+            pass
+        self.images[name] = image
+        return image
+
+
+def export_svg(better_canvas, file, chunk_size=1000):
+    """Writes items of the canvas to an SVG file, see SvgExporter.
+
+    Returns:
+        The number of exported items."""
+    return SvgExporter(better_canvas, chunk_size).export(file)
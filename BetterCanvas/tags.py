@@ -0,0 +1,137 @@
+"""This module contains the TagIndex class that answers tag queries on the Python side."""
+
+import tkinter as tk
+from collections import defaultdict
+
+from .listeners import CanvasListener
+
+# Characters of tag expressions, such tags are looked up by Tk.
+EXPRESSION_CHARACTERS = frozenset('&|^!()')
+
+
+class TagIndex(CanvasListener):
+    """Maps tags to ids of items that have them and item ids to their tags.
+
+    It follows tags given on creation, tags assignments, add_tag and remove_tag of the canvas and deletes,
+    so find_withtag, tag membership and counts per tag need no Tcl call.
+    Ids, the tags "all" and "current", tag expressions and tags in self.foreign are looked up by Tk.
+    Tags of items created behind the canvas' back are not known, add tags such items may have to self.foreign,
+    a VirtualCanvas of the canvas adds the tags of its items.
+    Results are sorted by order_key, by default by id, which is the stacking order of items
+    that were not restacked.
+    """
+
+    def __init__(self, better_canvas):
+        """Creates an empty index.
+
+        Args:
+            better_canvas: BetterCanvas the index belongs to.
+        """
+        self.better_canvas = better_canvas
+        self.tags = {}
+        self.ids = defaultdict(set)
+        self.foreign = set()
+        self.order_key = None
+
+    def __len__(self):
+        """Returns the number of items whose tags are known."""
+        return len(self.tags)
+
+    def __contains__(self, item_id):
+        return item_id in self.tags
+
+    def add_existing(self):
+        """Adds all items that are already on the canvas, their tags are read with a single Tcl call."""
+        self.better_canvas.flush()
+        backend = self.better_canvas.backend
+        item_ids = backend.find_all()
+        results = backend.evaluate([('gettags', item_id) for item_id in item_ids])
+        for item_id, result in zip(item_ids, results):
+            self._set(int(item_id), tuple(map(str, backend.split(result))))
+
+    def split(self, value):
+        """Returns tags of an option value as a tuple, a string is a Tcl list as for Tk."""
+        if value is None:
+            return ()
+        if isinstance(value, str):
+            return tuple(self.better_canvas.backend.split(value))
+        return tuple(str(tag) for tag in tk._flatten(tuple(value)))
+
+    def _set(self, item_id, tags):
+        """Replaces the tags of the item."""
+        self._discard(item_id)
+        self.tags[item_id] = tags
+        for tag in tags:
+            self.ids[tag].add(item_id)
+
+    def _discard(self, item_id):
+        """Forgets the tags of the item."""
+        for tag in self.tags.pop(item_id, ()):
+            ids = self.ids[tag]
+            ids.discard(item_id)
+            if not ids:
+                del self.ids[tag]
+
+    def created(self, item_id, item_type, coords, options):
+        self._set(item_id, self.split(options.get('tags')))
+
+    def configured(self, item_ids, options):
+        if 'tags' not in options:
+            return
+        tags = self.split(options['tags'])
+        for item_id in item_ids:
+            self._set(item_id, tags)
+
+    def tags_added(self, item_ids, tag):
+        """Adds the tag to the known tags of the items."""
+        for item_id in item_ids:
+            tags = self.tags.get(item_id)
+            if tags is not None and tag not in tags:
+                self.tags[item_id] = tags + (tag, )
+                self.ids[tag].add(item_id)
+
+    def tags_removed(self, item_ids, tag):
+        """Removes the tag from the known tags of the items."""
+        ids = self.ids.get(tag)
+        if not ids:
+            return
+        for item_id in item_ids:
+            if item_id in ids:
+                ids.discard(item_id)
+                self.tags[item_id] = tuple(name for name in self.tags[item_id] if name != tag)
+        if not ids:
+            del self.ids[tag]
+
+    def deleted(self, item_ids):
+        for item_id in item_ids:
+            self._discard(item_id)
+
+    def answers(self, tag):
+        """Whether the index can look up the tag.
+
+        Ids, tag expressions, the tags all and current and foreign tags are left to Tk."""
+        if isinstance(tag, int) or tag.isdigit():
+            return False
+        if tag in ('all', 'current') or tag in self.foreign:
+            return False
+        return not EXPRESSION_CHARACTERS.intersection(tag)
+
+    def tags_of(self, item_id):
+        """Returns tags of the item as a tuple, or None when they are not known."""
+        return self.tags.get(item_id)
+
+    def has_tag(self, item_id, tag):
+        """Whether the item has the tag."""
+        return item_id in self.ids.get(tag, ())
+
+    def find_withtag(self, tag):
+        """Returns ids of items with the tag, see answers for the tags it takes."""
+        return tuple(sorted(self.ids.get(tag, ()), key=self.order_key))
+
+    def count(self, tag):
+        """Returns the number of items with the tag."""
+        return len(self.ids.get(tag, ()))
+
+    def counts(self):
+        """Returns {tag : number of items with the tag}."""
+        return {tag: len(ids) for tag, ids in self.ids.items()}
@@ -0,0 +1,290 @@
+"""This module contains ThreadSafeCanvas that queues item commands of worker threads for the Tk thread."""
+
+import threading
+import time
+import tkinter as tk
+import weakref
+from collections import deque
+from concurrent.futures import Future
+
+from . import items
+from .batch import _Update
+
+
+class ThreadSafeItem():
+    """Stand-in for an item that worker threads use instead of the item itself.
+
+    It has the item methods that change an item: move, coords and option assignments and delete.
+    They are queued without blocking and applied on the Tk thread.
+    Items created by a worker exist once their creation was applied,
+    result waits for that and returns the Item.
+    """
+
+    __slots__ = ('_queue', 'item_type', 'future', '__weakref__')
+
+    def __init__(self, queue, item_type, future):
+        object.__setattr__(self, '_queue', queue)
+        object.__setattr__(self, 'item_type', item_type)
+        object.__setattr__(self, 'future', future)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} of {self.item_type.__name__}>"
+
+    def result(self, timeout=None):
+        """Returns the Item, waiting until it was created on the Tk thread."""
+        return self.future.result(timeout)
+
+    def move(self, dx, dy):
+        """Queues a move of the item by the provided offset."""
+        self._queue._update(self, dx=dx, dy=dy)
+
+    @property
+    def coords(self):
+        raise AttributeError("Coordinates can't be read from a worker thread, use result().coords on the Tk thread.")
+
+    @coords.setter
+    def coords(self, coords):
+        """Queues new coordinates of the item."""
+        self._queue._update(self, coords=tk._flatten(coords))
+
+    def configure(self, **options):
+        """Queues new values of options of the item."""
+        other_options = self.item_type.get_other_options(**options)
+        if other_options:
+            raise AttributeError(f"{self.item_type.__name__} has no options {', '.join(other_options)}.")
+        self._queue._update(self, options=options)
+
+    def __setattr__(self, name, value):
+        if name == 'coords':
+            object.__setattr__(self, name, value)
+        else:
+            self.configure(**{name: value})
+
+    def delete(self):
+        """Queues deletion of the item."""
+        self._queue._delete(self)
+
+
+class ThreadSafeCanvas():
+    """Queue of item commands from worker threads, applied on the Tk thread in time slices.
+
+    Worker threads call create_* and the methods of ThreadSafeItem, calls return right away.
+    Updates of an item that wait in the queue are coalesced like in a batch:
+    moves add together, coords override earlier moves and options override earlier values.
+    The Tk thread drains the queue from an after callback every interval milliseconds,
+    for at most slice_time seconds per callback, inside a batch of the canvas,
+    so a burst of updates costs a few Tcl calls and never freezes the UI.
+    """
+
+    def __init__(self, better_canvas, interval=10, slice_time=0.008):
+        """Creates an empty queue, call start on the Tk thread to drain it periodically.
+
+        Args:
+            better_canvas: BetterCanvas the commands are applied to.
+            interval: Delay in milliseconds between two drains.
+            slice_time: Time in seconds a single drain may take.
+        """
+        self.better_canvas = better_canvas
+        self.interval = interval
+        self.slice_time = slice_time
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._updates = {}
+        self._wrapped = weakref.WeakValueDictionary()
+        self._after_id = None
+        self.reset_stats()
+
+    def __len__(self):
+        """Returns the number of queued commands."""
+        return len(self._queue)
+
+    def reset_stats(self):
+        """Sets all statistics to zero."""
+        self.enqueued = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.failed = 0
+        self.drains = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_latency = 0.0
+
+    def stats(self):
+        """Returns queue statistics.
+
+        Returns:
+            A dict with the number of queued commands, commands queued, coalesced into queued ones,
+            applied and failed so far, the number of drains and the last, average and maximum time
+            in seconds a command waited in the queue.
+        """
+        return {
+            'depth': len(self._queue),
+            'enqueued': self.enqueued,
+            'coalesced': self.coalesced,
+            'applied': self.applied,
+            'failed': self.failed,
+            'drains': self.drains,
+            'last_latency': self.last_latency,
+            'average_latency': self.total_latency / self.applied if self.applied else 0.0,
+            'max_latency': self.max_latency,
+        }
+
+    def wrap(self, item):
+        """Returns a ThreadSafeItem of an existing item.
+
+        The same ThreadSafeItem is returned while it's in use, so queued updates of the item are coalesced."""
+        with self._lock:
+            wrapped = self._wrapped.get(item.id)
+            if wrapped is None:
+                future = Future()
+                future.set_result(item)
+                wrapped = self._wrapped[item.id] = ThreadSafeItem(self, type(item), future)
+        return wrapped
+
+    def create_item(self, item_type, *args, **kwargs) -> ThreadSafeItem:
+        """Queues creation of an item, see BetterCanvas.create_item."""
+        item = ThreadSafeItem(self, item_type, Future())
+        with self._lock:
+            self._queue.append(('create', item, time.perf_counter(), (args, kwargs)))
+            self.enqueued += 1
+        return item
+
+    def create_rectangle(self, *bbox, **options) -> ThreadSafeItem:
+        return self.create_item(items.Rectangle, *bbox, **options)
+
+    def create_arc(self, *bbox, **options) -> ThreadSafeItem:
+        return self.create_item(items.Arc, *bbox, **options)
+
+    def create_bitmap(self, *position, **options) -> ThreadSafeItem:
+        return self.create_item(items.Bitmap, *position, **options)
+
+    def create_image(self, *position, **options) -> ThreadSafeItem:
+        return self.create_item(items.Image, *position, **options)
+
+    def create_line(self, *coords, **options) -> ThreadSafeItem:
+        return self.create_item(items.Line, *coords, **options)
+
+    def create_oval(self, *bbox, **options) -> ThreadSafeItem:
+        return self.create_item(items.Oval, *bbox, **options)
+
+    def create_polygon(self, *coords, **options) -> ThreadSafeItem:
+        return self.create_item(items.Polygon, *coords, **options)
+
+    def create_text(self, *position, **options) -> ThreadSafeItem:
+        return self.create_item(items.Text, *position, **options)
+
+    def create_window(self, *position, **options) -> ThreadSafeItem:
+        return self.create_item(items.Window, *position, **options)
+
+    def _update(self, item, coords=None, dx=0, dy=0, options=None):
+        """Queues an update of the item or merges it into the one already queued."""
+        with self._lock:
+            self.enqueued += 1
+            update = self._updates.get(item)
+            if update is None:
+                update = self._updates[item] = _Update()
+                self._queue.append(('update', item, time.perf_counter(), None))
+            else:
+                self.coalesced += 1
+            if coords is not None:
+                update.coords = coords
+                update.dx = update.dy = 0
+            elif update.coords is not None and (dx or dy):
+                update.coords = [value + (dx if index % 2 == 0 else dy) for index, value in enumerate(update.coords)]
+            else:
+                update.dx += dx
+                update.dy += dy
+            if options:
+                update.options.update(options)
+
+    def _delete(self, item):
+        """Queues deletion of the item and drops its queued update."""
+        with self._lock:
+            self.enqueued += 1
+            if self._updates.pop(item, None) is not None:
+                self.coalesced += 1
+            self._queue.append(('delete', item, time.perf_counter(), None))
+
+    def drain(self):
+        """Applies queued commands inside a batch until the queue is empty or slice_time is over.
+
+        The clock is checked every 64 commands, so at least 64 commands are applied.
+        It runs on the Tk thread, called by the after callback or directly.
+        Errors other than those of invalid commands, e.g. of a failing item class, are raised
+        after failing the creation of the item, the remaining commands stay queued.
+
+        Returns:
+            The number of applied commands.
+        """
+        deadline = time.perf_counter() + self.slice_time
+        applied = 0
+        better_canvas = self.better_canvas
+        with better_canvas.batch():
+            while self._queue and (applied % 64 or not applied or time.perf_counter() < deadline):
+                with self._lock:
+                    kind, item, queued_time, arguments = self._queue.popleft()
+                    if kind == 'update':
+                        arguments = self._updates.pop(item, None)
+                if kind == 'update' and arguments is None:
+                    continue
+                try:
+                    self._apply(kind, item, arguments)
+                except Exception as error:
+                    self.failed += 1
+                    if kind == 'create':
+                        item.future.set_exception(error)
+                    if not isinstance(error, (tk.TclError, TypeError, ValueError, AttributeError)):
+                        raise
+                applied += 1
+                latency = time.perf_counter() - queued_time
+                self.last_latency = latency
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+        self.applied += applied
+        self.drains += 1
+        return applied
+
+    def _apply(self, kind, item, arguments):
+        """Applies a single queued command on the Tk thread."""
+        if kind == 'create':
+            args, kwargs = arguments
+            item.future.set_result(self.better_canvas.create_item(item.item_type, *args, **kwargs))
+            return
+        if not item.future.done() or item.future.exception() is not None:
+            raise ValueError("The item was not created.")
+        target = item.future.result()
+        if kind == 'delete':
+            self.better_canvas.delete(target)
+            return
+        if arguments.coords is not None:
+            target.coords = arguments.coords
+        elif arguments.dx or arguments.dy:
+            target.move(arguments.dx, arguments.dy)
+        for name, value in arguments.options.items():
+            setattr(target, name, value)
+
+    @property
+    def running(self):
+        """Whether the queue is drained periodically."""
+        return self._after_id is not None
+
+    def start(self):
+        """Drains the queue every interval milliseconds, call it on the Tk thread."""
+        backend = self.better_canvas.backend
+        if not backend.event_loop:
+            raise RuntimeError("ThreadSafeCanvas needs the Tk event loop, call drain on other canvas backends.")
+        if self._after_id is None:
+            self._after_id = backend.after(self.interval, self._tick)
+
+    def stop(self):
+        """Stops draining the queue, queued commands stay queued."""
+        if self._after_id is not None:
+            self.better_canvas.backend.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        try:
+            self.drain()
+        finally:
+            self._after_id = self.better_canvas.backend.after(self.interval, self._tick)
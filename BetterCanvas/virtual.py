@@ -0,0 +1,448 @@
+"""This module contains the VirtualCanvas class that keeps Tk items only for the visible part of a large scene."""
+
+import tkinter as tk
+from collections import defaultdict
+
+from .collection import coordinate_rows
+from .spatial import SHAPES, SpatialIndex
+
+
+class VirtualCanvas():
+    """Scene of logical items of which only those near the view exist as canvas items.
+
+    Logical items are kept on the Python side with their type, coordinates and options
+    and indexed by a SpatialIndex. On update the items overlapping the view plus margin are looked up,
+    items that left it are hidden and kept for reuse, items that entered it are shown
+    by reusing hidden items of the same type and option names or by creating new ones,
+    all with a single Tcl call, so a scroll costs only the difference between two views.
+    Canvas items are drawn in the order logical items were added.
+    On a Tk canvas updates follow scrolling and resizing of the canvas once started,
+    on other backends call update with the viewport.
+
+    Logical ids are not canvas item ids, use logical_id and canvas_id to convert between them.
+    The canvas items are not registered with the BetterCanvas and don't notify its listeners,
+    their tags are added to the foreign tags of its tag index, so they are looked up by Tk.
+    """
+
+    def __init__(self, better_canvas, margin=256, cell_size=256, pool_size=1000, tag='virtual'):
+        """Creates an empty scene.
+
+        Args:
+            better_canvas: BetterCanvas that shows the scene.
+            margin: Distance in canvas units around the view where items are shown too,
+                so short scrolls need no update.
+            cell_size: Size of cells of the spatial index in canvas units.
+            pool_size: Number of hidden canvas items kept for reuse, others are deleted.
+            tag: Tag of all canvas items of the scene.
+        """
+        self.better_canvas = better_canvas
+        self.margin = margin
+        self.pool_size = pool_size
+        self.tag = tag
+        self.tags = set()
+        self._use_tags((tag, ))
+        self.index = SpatialIndex(better_canvas, cell_size)
+        self.types = []
+        self.coords = []
+        self.options = []
+        self.count = 0
+        self.shown = {}
+        self.canvas_ids = {}
+        self.pool = defaultdict(list)
+        self.pooled = 0
+        self.region = None
+        self.commands = {}
+        self._after_id = None
+        self.reset_stats()
+
+    def __len__(self):
+        """Returns the number of logical items."""
+        return self.count
+
+    def __contains__(self, logical_id):
+        return 0 <= logical_id < len(self.types) and self.types[logical_id] is not None
+
+    def reset_stats(self):
+        """Sets all statistics to zero."""
+        self.updates = 0
+        self.created = 0
+        self.reused = 0
+        self.hidden = 0
+        self.deleted = 0
+
+    def stats(self):
+        """Returns scene statistics.
+
+        Returns:
+            A dict with the number of logical items, shown items and pooled hidden items,
+            and the number of updates and of canvas items created, reused, hidden and deleted so far.
+        """
+        return {
+            'items': self.count,
+            'shown': len(self.shown),
+            'pooled': self.pooled,
+            'updates': self.updates,
+            'created': self.created,
+            'reused': self.reused,
+            'hidden': self.hidden,
+            'deleted': self.deleted,
+        }
+
+    @staticmethod
+    def _bbox(item_type, coords, options):
+        """Returns the bounding box of a logical item.
+
+        Shapes get theirs from coordinates and outline width, other items from their position,
+        the margin covers their size."""
+        xs = coords[0::2]
+        ys = coords[1::2]
+        padding = 0.0
+        if issubclass(item_type, SHAPES):
+            try:
+                padding = float(options.get('width', 1.0)) / 2
+            except (TypeError, ValueError):
+                padding = 0.0
+        return (min(xs) - padding, min(ys) - padding, max(xs) + padding, max(ys) + padding)
+
+    def add(self, item_type, *coords, bbox=None, **options):
+        """Adds a logical item, it is shown by the next update when it is in view.
+
+        Args:
+            item_type: Item class of the canvas item that shows it.
+            coords: Coordinates as accepted by the item class.
+            bbox: Bounding box used for culling, computed from the coordinates when None.
+                Give it for large text, image and window items.
+            options: Options from item_type.config_options.
+        Returns:
+            Logical id of the item.
+        """
+        other_options = item_type.get_other_options(**options)
+        if other_options:
+            raise TypeError(f"{item_type.__name__} has no options {', '.join(other_options)}.")
+        coords = tuple(float(value) for value in tk._flatten(coords))
+        if not coords or len(coords) % 2 != 0:
+            raise TypeError(f"{item_type.__name__} expects an even number of coordinates. {len(coords)} were given.")
+        logical_id = self._add(item_type, coords, options, bbox)
+        self._changed()
+        return logical_id
+
+    def _add(self, item_type, coords, options, bbox):
+        """Stores a logical item and returns its id."""
+        logical_id = len(self.types)
+        self.types.append(item_type)
+        self.coords.append(coords)
+        self.options.append(options)
+        self.count += 1
+        self.index.insert(logical_id, bbox or self._bbox(item_type, coords, options))
+        if options.get('state') == 'hidden':
+            self.index.hidden.add(logical_id)
+        if 'tags' in options:
+            self._use_tags(self._tags(options['tags']))
+        return logical_id
+
+    def add_many(self, item_type, coords, **options) -> range:
+        """Adds many logical items of the given type.
+
+        Args:
+            item_type: Item class of the canvas items that show them.
+            coords: Coordinates with a row per item, see BetterCanvas.create_many.
+            options: Options from item_type.config_options, a list gives a value to each item,
+                any other value is shared by all items and stored once.
+        Returns:
+            A range of logical ids of the new items.
+        """
+        other_options = item_type.get_other_options(**options)
+        if other_options:
+            raise TypeError(f"add_many accepts only options of {item_type.__name__}, got {', '.join(other_options)}.")
+        rows = coordinate_rows(coords, item_type.coords_length)
+        shared_options = {}
+        item_options = {}
+        for option, value in options.items():
+            if isinstance(value, list) or hasattr(value, 'tolist'):
+                values = value.tolist() if hasattr(value, 'tolist') else value
+                if len(values) != len(rows):
+                    raise ValueError(f"Option {option} has {len(values)} values for {len(rows)} items.")
+                item_options[option] = values
+            else:
+                shared_options[option] = value
+        first = len(self.types)
+        for index, row in enumerate(rows):
+            own_options = shared_options
+            if item_options:
+                own_options = dict(shared_options, **{option : values[index] for option, values in item_options.items()})
+            self._add(item_type, tuple(float(value) for value in row), own_options, None)
+        self._changed()
+        return range(first, len(self.types))
+
+    def remove(self, logical_id):
+        """Removes a logical item, its canvas item is hidden by the next update."""
+        if logical_id not in self:
+            raise KeyError(logical_id)
+        self.index.remove(logical_id)
+        self.types[logical_id] = None
+        self.coords[logical_id] = None
+        self.options[logical_id] = None
+        self.count -= 1
+        self._changed()
+
+    def move(self, logical_id, dx, dy):
+        """Moves a logical item by the provided offset, its canvas item is moved right away when shown."""
+        if logical_id not in self:
+            raise KeyError(logical_id)
+        self.coords[logical_id] = tuple(value + (dx if index % 2 == 0 else dy) for index, value in enumerate(self.coords[logical_id]))
+        x1, y1, x2, y2 = self.index.bboxes[logical_id]
+        self.index.insert(logical_id, (x1 + dx, y1 + dy, x2 + dx, y2 + dy))
+        canvas_id = self.shown.get(logical_id)
+        if canvas_id is not None:
+            self.better_canvas._target.move(canvas_id, dx, dy)
+        self._changed()
+
+    def set_coords(self, logical_id, coords, bbox=None):
+        """Replaces coordinates of a logical item, its canvas item is updated right away when shown.
+
+        Args:
+            logical_id: Logical id of the item.
+            coords: New coordinates.
+            bbox: Bounding box used for culling, computed from the coordinates when None.
+        """
+        if logical_id not in self:
+            raise KeyError(logical_id)
+        coords = tuple(float(value) for value in tk._flatten(coords))
+        self.coords[logical_id] = coords
+        self.index.insert(logical_id, bbox or self._bbox(self.types[logical_id], coords, self.options[logical_id]))
+        canvas_id = self.shown.get(logical_id)
+        if canvas_id is not None:
+            self.better_canvas._target.coords(canvas_id, *coords)
+        self._changed()
+
+    def configure(self, logical_id, **options):
+        """Changes options of a logical item, its canvas item is updated right away when shown."""
+        if logical_id not in self:
+            raise KeyError(logical_id)
+        item_type = self.types[logical_id]
+        other_options = item_type.get_other_options(**options)
+        if other_options:
+            raise TypeError(f"{item_type.__name__} has no options {', '.join(other_options)}.")
+        self.options[logical_id] = dict(self.options[logical_id], **options)
+        if 'state' in options:
+            if options['state'] == 'hidden':
+                self.index.hidden.add(logical_id)
+            else:
+                self.index.hidden.discard(logical_id)
+        if 'width' in options and issubclass(item_type, SHAPES):
+            self.index.insert(logical_id, self._bbox(item_type, self.coords[logical_id], self.options[logical_id]))
+        if 'tags' in options:
+            self._use_tags(self._tags(options['tags']))
+        canvas_id = self.shown.get(logical_id)
+        if canvas_id is not None:
+            if 'tags' in options:
+                options = dict(options, tags=self._tags(options['tags']))
+            self.better_canvas._target.itemconfig(canvas_id, options)
+        self._changed()
+
+    def options_of(self, logical_id):
+        """Returns a copy of the options of a logical item."""
+        return dict(self.options[logical_id])
+
+    def coords_of(self, logical_id):
+        """Returns the coordinates of a logical item."""
+        return list(self.coords[logical_id])
+
+    def canvas_id(self, logical_id):
+        """Returns the id of the canvas item that shows the logical item, or None when it isn't shown."""
+        return self.shown.get(logical_id)
+
+    def logical_id(self, canvas_id):
+        """Returns the logical id of the item shown by the canvas item, or None, e.g. in event callbacks."""
+        return self.canvas_ids.get(canvas_id)
+
+    def find_overlapping(self, x1, y1, x2, y2):
+        """Returns logical ids of items whose bounding box overlaps the rectangle, shown or not."""
+        return self.index.find_overlapping(x1, y1, x2, y2)
+
+    def viewport(self):
+        """Returns the visible area of the canvas in canvas coordinates as (x1, y1, x2, y2)."""
+        canvas = self.better_canvas.canvas
+        x = float(canvas.canvasx(0))
+        y = float(canvas.canvasy(0))
+        width, height = self.better_canvas.backend.view_size()
+        return (x, y, x + width, y + height)
+
+    def _tags(self, tags):
+        """Returns the tags of a logical item together with the tag of the scene."""
+        if isinstance(tags, str):
+            tags = tags.split()
+        return tuple(tags) + (self.tag, )
+
+    def _use_tags(self, tags):
+        """Records tags that canvas items of the scene may have, the tag index leaves them to Tk."""
+        new_tags = set(tags) - self.tags
+        if not new_tags:
+            return
+        self.tags.update(new_tags)
+        if self.better_canvas.tag_index is not None:
+            self.better_canvas.tag_index.foreign.update(new_tags)
+
+    def _key(self, logical_id):
+        """Returns the key of pooled canvas items that can show the logical item."""
+        return (self.types[logical_id], frozenset(self.options[logical_id]))
+
+    def _config(self, logical_id):
+        """Returns options of the canvas item that shows the logical item."""
+        options = dict(self.options[logical_id])
+        options['tags'] = self._tags(options.get('tags', ()))
+        options.setdefault('state', 'normal')
+        return options
+
+    def update(self, viewport=None):
+        """Shows items overlapping the viewport plus margin and hides the others.
+
+        Args:
+            viewport: Visible area as (x1, y1, x2, y2), the one of the canvas when None.
+        Returns:
+            The number of items that were shown or hidden.
+        """
+        self._after_id = None
+        x1, y1, x2, y2 = viewport or self.viewport()
+        margin = self.margin
+        self.region = (x1 - margin, y1 - margin, x2 + margin, y2 + margin)
+        visible = self.index.find_overlapping(*self.region)
+        shown = self.shown
+        visible_set = set(visible)
+        leaving = [logical_id for logical_id in shown if logical_id not in visible_set]
+        entering = [logical_id for logical_id in visible if logical_id not in shown]
+        self.updates += 1
+        if not leaving and not entering:
+            return 0
+        # Pending updates of an open batch or frame must not reach canvas items after they are reused.
+        self.better_canvas.flush()
+        canvas = self.better_canvas.canvas
+        kept = max((logical_id for logical_id in shown if logical_id in visible_set), default=-1)
+
+        released = defaultdict(list)
+        for logical_id in leaving:
+            canvas_id = shown.pop(logical_id)
+            del self.canvas_ids[canvas_id]
+            key = self._key(logical_id) if logical_id in self else None
+            released[key].append(canvas_id)
+
+        commands = []
+        created = []
+        reused = False
+        for logical_id in entering:
+            key = self._key(logical_id)
+            coords = self.coords[logical_id]
+            options = self._config(logical_id)
+            candidates = released.get(key) or self.pool.get(key)
+            if candidates:
+                canvas_id = candidates.pop()
+                if candidates is self.pool.get(key):
+                    self.pooled -= 1
+                commands.append(('coords', canvas_id) + coords)
+                commands.append(('itemconfigure', canvas_id) + canvas._options(options))
+                shown[logical_id] = canvas_id
+                self.canvas_ids[canvas_id] = logical_id
+                self.reused += 1
+                reused = True
+            else:
+                commands.append(('create', self.types[logical_id].tk_type) + coords + canvas._options(options))
+                created.append((len(commands) - 1, logical_id))
+
+        for key, canvas_ids in released.items():
+            for canvas_id in canvas_ids:
+                if key is not None and self.pooled < self.pool_size:
+                    commands.append(('itemconfigure', canvas_id, '-state', 'hidden'))
+                    self.pool[key].append(canvas_id)
+                    self.pooled += 1
+                    self.hidden += 1
+                else:
+                    commands.append(('delete', canvas_id))
+                    self.deleted += 1
+
+        results = self.better_canvas.backend.evaluate(commands)
+        for position, logical_id in created:
+            canvas_id = int(results[position])
+            shown[logical_id] = canvas_id
+            self.canvas_ids[canvas_id] = logical_id
+        self.created += len(created)
+
+        if entering and (reused or entering[0] < kept):
+            self._restack(visible, set(entering))
+        return len(leaving) + len(entering)
+
+    def _restack(self, visible, entering):
+        """Puts canvas items of entering logical items into the order of logical ids, with a single Tcl call."""
+        commands = []
+        shown = self.shown
+        for position in range(len(visible) - 1, -1, -1):
+            logical_id = visible[position]
+            if logical_id not in entering:
+                continue
+            if position + 1 < len(visible):
+                commands.append(('lower', shown[logical_id], shown[visible[position + 1]]))
+            else:
+                commands.append(('raise', shown[logical_id], self.tag))
+        self.better_canvas.backend.evaluate(commands)
+
+    def clear(self):
+        """Removes all logical items and deletes their canvas items."""
+        canvas_ids = list(self.shown.values()) + [canvas_id for pool in self.pool.values() for canvas_id in pool]
+        self.better_canvas.backend.evaluate([('delete', canvas_id) for canvas_id in canvas_ids])
+        self.deleted += len(canvas_ids)
+        self.index = SpatialIndex(self.better_canvas, self.index.cell_size)
+        self.types = []
+        self.coords = []
+        self.options = []
+        self.count = 0
+        self.shown = {}
+        self.canvas_ids = {}
+        self.pool = defaultdict(list)
+        self.pooled = 0
+
+    @property
+    def running(self):
+        """Whether updates follow the view of the canvas."""
+        return bool(self.commands)
+
+    def start(self):
+        """Updates the scene whenever the view of a Tk canvas scrolls or resizes and after logical items change.
+
+        The x and y scroll commands of the canvas are wrapped, configure scrollbars before calling it."""
+        canvas = self.better_canvas.canvas
+        if not self.better_canvas.backend.event_loop:
+            raise TypeError("VirtualCanvas follows the view only on a Tk canvas, call update on other canvas backends.")
+        if self.running:
+            return
+        for option in ('xscrollcommand', 'yscrollcommand'):
+            original = canvas.cget(option)
+            command = canvas.register(lambda first, last, original=original: self._scrolled(original, first, last))
+            self.commands[option] = (original, command)
+            canvas.configure({option: command})
+        self.schedule()
+
+    def stop(self):
+        """Restores the scroll commands of the canvas, the scene is not updated afterwards."""
+        canvas = self.better_canvas.canvas
+        for option, (original, command) in self.commands.items():
+            canvas.configure({option: original})
+            canvas.deletecommand(command)
+        self.commands = {}
+        if self._after_id is not None:
+            self.better_canvas.backend.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _scrolled(self, original, first, last):
+        """Calls the wrapped scroll command and schedules an update."""
+        if original:
+            self.better_canvas.canvas.tk.eval(f'{original} {first} {last}')
+        self.schedule()
+
+    def _changed(self):
+        """Schedules an update after logical items changed while the scene follows the view."""
+        if self.running:
+            self.schedule()
+
+    def schedule(self):
+        """Updates the scene when Tk is idle, many view changes cost a single update."""
+        if self._after_id is None:
+            self._after_id = self.better_canvas.backend.after_idle(self.update)
@@ -0,0 +1,438 @@
+"""Benchmarks of item creation, options, queries and mutation on large canvases.
+
+Every benchmark runs against a canvas already holding the given number of rectangles,
+so it measures the cost of a single operation at that scale.
+The number of measured operations is capped, large scenes do not take proportionally longer.
+Each benchmark runs twice: once timed, once with a Profiler and tracemalloc
+to count Tcl calls and net allocated bytes per operation,
+which for creation benchmarks is the memory used per item.
+
+Tk needs a display, run the suite headless under Xvfb:
+
+    xvfb-run python benchmarks/bench_canvas.py --output results.json
+    xvfb-run python benchmarks/bench_canvas.py --sizes 1000 10000 --compare results.json
+
+Window items are not benchmarked, each of them needs its own widget.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tkinter as tk
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import BetterCanvas as bc
+
+SIZES = (1000, 10000, 100000, 1000000)
+
+# Every hundredth item of a scene has this tag.
+MARKED = 'marked'
+
+BENCHMARKS = {}
+
+
+def benchmark(name, limit=10000):
+    """Registers a benchmark.
+
+    The decorated function takes a Scene and the number of operations to run,
+    prepares everything that should not be measured and returns a callable
+    that runs the operations and returns their number.
+
+    Args:
+        name: Name of the benchmark in the results.
+        limit: Maximum number of operations run at any scene size.
+    """
+    def register(function):
+        BENCHMARKS[name] = (function, limit)
+        return function
+    return register
+
+
+class Scene():
+    """BetterCanvas holding a grid of rectangles created with a single Tcl call."""
+
+    spacing = 20
+
+    def __init__(self, root, size, seed=0):
+        self.size = size
+        self.random = random.Random(seed)
+        self.canvas = bc.BetterCanvas(root)
+        self.columns = math.ceil(math.sqrt(size))
+        coords = []
+        tags = []
+        for index in range(size):
+            x, y = self.position(index)
+            coords.append((x, y, x + 10, y + 10))
+            tags.append(('scene', MARKED) if index % 100 == 0 else ('scene', ))
+        self.rectangles = self.canvas.create_many(bc.Rectangle, coords, fill='gray', tags=tags)
+
+    def position(self, index):
+        """Returns the upper left corner of the rectangle with the given index."""
+        return (index % self.columns) * self.spacing, (index // self.columns) * self.spacing
+
+    @property
+    def extent(self):
+        """Width and height of the area covered by the scene."""
+        return self.columns * self.spacing, math.ceil(self.size / self.columns) * self.spacing
+
+    def sample(self, count):
+        """Returns count random rectangles, their instances are created."""
+        return [self.rectangles[index] for index in self.random.sample(range(self.size), count)]
+
+    def points(self, count):
+        """Returns count random points inside the scene."""
+        width, height = self.extent
+        return [(self.random.uniform(0, width), self.random.uniform(0, height)) for _ in range(count)]
+
+    def destroy(self):
+        self.canvas.destroy()
+
+
+class MyRectangle(bc.Rectangle):
+    """Custom item used by the create_item benchmark."""
+
+    def describe(self):
+        return f"{self.some_attribute} rectangle filled with {self.fill}"
+
+
+def _create(item_type, coords_length, **options):
+    """Returns a benchmark creating items of the type with its create_* method."""
+    def prepare(scene, count):
+        create = getattr(scene.canvas, f'create_{item_type}')
+        positions = scene.points(count)
+
+        def run():
+            for x, y in positions:
+                create(*(x, y, x + 10, y + 10)[:coords_length], **options)
+            return count
+        return run
+    return prepare
+
+benchmark('create_rectangle')(_create('rectangle', 4, fill='red'))
+benchmark('create_oval')(_create('oval', 4, fill='red'))
+benchmark('create_arc')(_create('arc', 4, fill='red'))
+benchmark('create_line')(_create('line', 4, fill='red'))
+benchmark('create_polygon')(_create('polygon', 4, fill='red'))
+benchmark('create_text')(_create('text', 2, text='text'))
+benchmark('create_bitmap')(_create('bitmap', 2, bitmap='gray50'))
+
+
+@benchmark('create_image')
+def create_image(scene, count):
+    image = tk.PhotoImage(master=scene.canvas.canvas, width=8, height=8)
+    positions = scene.points(count)
+
+    def run():
+        for x, y in positions:
+            scene.canvas.create_image(x, y, image=image)
+        return count
+    return run
+
+
+@benchmark('create_item')
+def create_item(scene, count):
+    positions = scene.points(count)
+
+    def run():
+        for x, y in positions:
+            scene.canvas.create_item(MyRectangle, x, y, x + 10, y + 10, some_attribute='foo')
+        return count
+    return run
+
+
+@benchmark('create_many')
+def create_many(scene, count):
+    coords = [(x, y, x + 10, y + 10) for x, y in scene.points(count)]
+
+    def run():
+        scene.canvas.create_many(bc.Rectangle, coords, fill='red')
+        return count
+    return run
+
+
+@benchmark('option_read_cached')
+def option_read_cached(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.fill
+        return count
+    return run
+
+
+@benchmark('option_read_uncached')
+def option_read_uncached(scene, count):
+    rectangles = scene.sample(count)
+    for rectangle in rectangles:
+        rectangle.invalidate_options()
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.outline
+        return count
+    return run
+
+
+@benchmark('option_write')
+def option_write(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for index, rectangle in enumerate(rectangles):
+            rectangle.fill = 'red' if index % 2 else 'blue'
+        return count
+    return run
+
+
+@benchmark('move')
+def move(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.move(1, 0)
+        return count
+    return run
+
+
+@benchmark('move_tkinter')
+def move_tkinter(scene, count):
+    item_ids = [rectangle.id for rectangle in scene.sample(count)]
+    canvas = scene.canvas.canvas
+
+    def run():
+        for item_id in item_ids:
+            canvas.move(item_id, 1, 0)
+        return count
+    return run
+
+
+@benchmark('move_batch')
+def move_batch(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        with scene.canvas.batch():
+            for rectangle in rectangles:
+                rectangle.move(1, 0)
+        return count
+    return run
+
+
+@benchmark('coords')
+def coords(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.coords = (0, 0, 10, 10)
+        return count
+    return run
+
+
+@benchmark('coords_read')
+def coords_read(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.coords
+        return count
+    return run
+
+
+@benchmark('bbox')
+def bbox(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.bbox
+        return count
+    return run
+
+
+@benchmark('find_overlapping', limit=100)
+def find_overlapping(scene, count):
+    areas = [(x, y, x + 50, y + 50) for x, y in scene.points(count)]
+
+    def run():
+        for area in areas:
+            len(scene.canvas.find_overlapping(*area))
+        return count
+    return run
+
+
+@benchmark('find_overlapping_indexed', limit=1000)
+def find_overlapping_indexed(scene, count):
+    scene.canvas.use_spatial_index()
+    run = find_overlapping(scene, count)
+    scene.canvas.spatial_index.find_overlapping(0, 0, 1, 1)
+    return run
+
+
+@benchmark('find_withtag', limit=100)
+def find_withtag(scene, count):
+
+    def run():
+        for _ in range(count):
+            len(scene.canvas.find_withtag(MARKED))
+        return count
+    return run
+
+
+@benchmark('find_closest', limit=100)
+def find_closest(scene, count):
+    points = scene.points(count)
+
+    def run():
+        for x, y in points:
+            scene.canvas.find_closest(x, y)
+        return count
+    return run
+
+
+@benchmark('tag_bind')
+def tag_bind(scene, count):
+    rectangles = scene.sample(count)
+
+    def callback(event):
+        pass
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.bind('<Button-1>', callback)
+        return count
+    return run
+
+
+@benchmark('delete')
+def delete(scene, count):
+    rectangles = scene.sample(count)
+
+    def run():
+        for rectangle in rectangles:
+            rectangle.delete()
+        return count
+    return run
+
+
+def measure(root, size, name):
+    """Runs a single benchmark on fresh scenes and returns its result."""
+    function, limit = BENCHMARKS[name]
+    count = min(size, limit)
+
+    scene = Scene(root, size)
+    run = function(scene, count)
+    gc.collect()
+    start = time.perf_counter()
+    operations = run()
+    seconds = time.perf_counter() - start
+    scene.destroy()
+
+    scene = Scene(root, size)
+    run = function(scene, count)
+    gc.collect()
+    tracemalloc.start()
+    with scene.canvas.profile() as profiler:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    scene.destroy()
+
+    calls = sum(site['count'] for site in profiler.stats().values())
+    return {
+        'benchmark': name,
+        'items': size,
+        'operations': operations,
+        'seconds': seconds,
+        'per_operation': seconds / operations,
+        'tcl_calls_per_operation': calls / operations,
+        'bytes_per_operation': allocated / operations,
+        'sites': {site: stats['count'] for site, stats in profiler.stats().items()},
+    }
+
+
+def run_all(sizes, names=None):
+    """Runs the benchmarks at every size and returns the results with environment metadata."""
+    root = tk.Tk()
+    root.withdraw()
+    results = []
+    try:
+        for size in sizes:
+            for name in names or BENCHMARKS:
+                result = measure(root, size, name)
+                results.append(result)
+                print(f"{name:>26} {size:>8} items: {result['per_operation'] * 1e6:10.2f} us/op"
+                      f" {result['tcl_calls_per_operation']:8.3f} calls/op"
+                      f" {result['bytes_per_operation']:10.1f} B/op", file=sys.stderr)
+    finally:
+        root.destroy()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'tk': str(tk.TkVersion),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Returns descriptions of results slower or making more Tcl calls than in the baseline.
+
+    Args:
+        results: Results returned by run_all.
+        baseline: Results of an earlier run.
+        tolerance: Allowed relative slowdown, e.g. 0.25 for 25%.
+    """
+    previous = {(result['benchmark'], result['items']): result for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        old = previous.get((result['benchmark'], result['items']))
+        if old is None:
+            continue
+        label = f"{result['benchmark']} at {result['items']} items"
+        if result['per_operation'] > old['per_operation'] * (1 + tolerance):
+            regressions.append(f"{label}: {old['per_operation'] * 1e6:.2f} -> {result['per_operation'] * 1e6:.2f} us/op")
+        if result['tcl_calls_per_operation'] > old['tcl_calls_per_operation']:
+            regressions.append(f"{label}: {old['tcl_calls_per_operation']:.3f}"
+                               f" -> {result['tcl_calls_per_operation']:.3f} Tcl calls/op")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="numbers of items in the scene")
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), help="benchmarks to run, all by default")
+    parser.add_argument('--output', help="file to save the results to as JSON")
+    parser.add_argument('--compare', help="JSON results of an earlier run to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed relative slowdown, default 0.25")
+    args = parser.parse_args(argv)
+
+    results = run_all(args.sizes, args.benchmarks)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
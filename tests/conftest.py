@@ -13,3 +13,40 @@ def better_canvas():
 @pytest.fixture
 def tk_canvas():
     return tk.Canvas()
+
+@pytest.fixture
+def memory_canvas():
+    """BetterCanvas on the memory backend."""
+    return bc.BetterCanvas(backend='memory')
+
+class TclCallCounter():
+    """Wraps a Tcl interpreter and counts calls made through it."""
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self.count = 0
+
+    def call(self, *args):
+        self.count += 1
+        return self.interpreter.call(*args)
+
+    def eval(self, script):
+        self.count += 1
+        return self.interpreter.eval(script)
+
+    def __getattr__(self, name):
+        return getattr(self.interpreter, name)
+
+@pytest.fixture
+def tcl_calls(tk_canvas, monkeypatch):
+    """Counts Tcl calls made by tk_canvas."""
+    counter = TclCallCounter(tk_canvas.tk)
+    monkeypatch.setattr(tk_canvas, 'tk', counter)
+    return counter
+
+@pytest.fixture
+def better_canvas_tcl_calls(better_canvas, monkeypatch):
+    """Counts Tcl calls made by the canvas wrapped by better_canvas."""
+    counter = TclCallCounter(better_canvas.canvas.tk)
+    monkeypatch.setattr(better_canvas.canvas, 'tk', counter)
+    return counter
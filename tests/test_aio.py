@@ -0,0 +1,74 @@
+"""Tests for aio module."""
+import asyncio
+import tkinter as tk
+from types import SimpleNamespace
+
+import BetterCanvas as bc
+
+
+async def with_driver(better_canvas, coroutine):
+    """Runs the coroutine while a TkDriver processes events of the canvas."""
+    task = asyncio.create_task(better_canvas.run_async(better_canvas.canvas))
+    try:
+        return await asyncio.wait_for(coroutine, 2)
+    finally:
+        better_canvas.async_bridge.driver.stop()
+        await task
+        if better_canvas.scheduler is not None:
+            better_canvas.scheduler.stop()
+
+
+class TestAsync():
+    """Tests for awaiting frames and creation from coroutines."""
+
+    def test_flush(self):
+        """Awaiting flush should complete right away."""
+        better_canvas = bc.BetterCanvas(backend='memory')
+        async def main():
+            with better_canvas.batch():
+                rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+                rectangle.move(5, 0)
+                await better_canvas.flush()
+                return better_canvas.canvas.coords(rectangle.id)
+        assert asyncio.run(main()) == [5, 0, 15, 10]
+
+    def test_next_frame(self, better_canvas):
+        """Updates should be applied when the next frame resolves."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        better_canvas.use_frame_scheduler()
+        async def main():
+            rectangle.move(5, 0)
+            assert better_canvas.canvas.coords(rectangle.id) == [0, 0, 10, 10]
+            operations = await better_canvas.next_frame()
+            return operations, better_canvas.canvas.coords(rectangle.id)
+        assert asyncio.run(with_driver(better_canvas, main())) == (1, [5, 0, 15, 10])
+
+    def test_frames_stop(self, better_canvas):
+        """Awaiting a frame should not defer other updates and frames should stop once nothing waits."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        async def main():
+            frame = better_canvas.next_frame()
+            rectangle.move(5, 0)
+            assert better_canvas.canvas.coords(rectangle.id) == [5, 0, 15, 10]
+            await frame
+            return better_canvas.scheduler.running
+        assert asyncio.run(with_driver(better_canvas, main())) is False
+
+    def test_create_many_async(self, better_canvas):
+        """Items requested by many coroutines should be created together."""
+        async def stream(index):
+            return await better_canvas.create_many_async(bc.Oval, [[index, 0, index + 10, 10]] * (index + 1), fill='red')
+        async def main():
+            return await asyncio.gather(*(stream(index) for index in range(5)))
+        collections = asyncio.run(with_driver(better_canvas, main()))
+        assert [len(collection) for collection in collections] == [1, 2, 3, 4, 5]
+        assert better_canvas.canvas.coords(collections[4].ids[0]) == [4, 0, 14, 10]
+        assert collections[2][0].fill == 'red'
+        assert len(better_canvas.items.collections) == 1
+
+    def test_driver_stops_with_widget(self):
+        """The driver should return when its widget no longer exists."""
+        widget = SimpleNamespace(tk=tk.Tcl().tk, _w='.destroyed')
+        driver = bc.TkDriver(widget)
+        asyncio.run(asyncio.wait_for(driver.run(), 2))
+        assert not driver.running
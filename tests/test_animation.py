@@ -0,0 +1,113 @@
+"""Tests for animation module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+class TestAnimator():
+    """Tests for tweens run by BetterCanvas.animator."""
+
+    @pytest.fixture
+    def animator(self, better_canvas):
+        yield better_canvas.animator
+        better_canvas.scheduler.stop()
+
+    def step(self, better_canvas, frame_time):
+        """Runs a frame at the given time."""
+        with better_canvas.batch():
+            better_canvas.animator.step(frame_time)
+
+    def test_coords(self, better_canvas, animator):
+        """Coordinates should be interpolated between frames."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.animate(duration=1, coords=(100, 0, 110, 10))
+        self.step(better_canvas, 0)
+        self.step(better_canvas, 0.5)
+        assert better_canvas.canvas.coords(rectangle.id) == [50, 0, 60, 10]
+        self.step(better_canvas, 1)
+        assert better_canvas.canvas.coords(rectangle.id) == [100, 0, 110, 10]
+        assert len(animator) == 0
+
+    def test_color(self, better_canvas, animator):
+        """Colors should be interpolated per channel and the option cache kept fresh."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10, fill='#000000')
+        rectangle.animate(duration=1, fill='#ff0000')
+        self.step(better_canvas, 0)
+        self.step(better_canvas, 0.5)
+        assert rectangle.fill == '#800000'
+
+    def test_group(self, better_canvas, animator, better_canvas_tcl_calls):
+        """A frame of a group animation should cost a single Tcl call."""
+        ovals = better_canvas.create_many(bc.Oval, [[0, 0, 10, 10], [20, 0, 30, 10], [40, 0, 50, 10]])
+        tween = better_canvas.animate(ovals, duration=1, move=[(10, 0), (20, 0), (30, 0)], width=5)
+        better_canvas_tcl_calls.count = 0
+        self.step(better_canvas, 0)
+        assert better_canvas_tcl_calls.count == 1
+        self.step(better_canvas, 1)
+        assert tween.done
+        assert better_canvas.canvas.coords(ovals.ids[2]) == [70, 0, 80, 10]
+        assert len(better_canvas.items) == 0
+
+    def test_concurrent_tweens(self, better_canvas, animator):
+        """Tweens with their own easing and start time should be interpolated together."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        oval = better_canvas.create_oval(0, 0, 10, 10)
+        rectangle.animate(duration=1, move=(100, 0))
+        self.step(better_canvas, 0)
+        oval.animate(duration=2, easing='ease_in', move=(0, 100))
+        self.step(better_canvas, 0.5)
+        assert better_canvas.canvas.coords(rectangle.id) == [50, 0, 60, 10]
+        self.step(better_canvas, 1.5)
+        assert better_canvas.canvas.coords(rectangle.id) == [100, 0, 110, 10]
+        assert better_canvas.canvas.coords(oval.id) == [0, 25, 10, 35]
+        assert len(animator) == 1
+
+    def test_chain(self, better_canvas, animator):
+        """Chained tweens should start when the previous one finishes."""
+        done = []
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.animate(duration=1, move=(10, 0), on_done=done.append).then(duration=1, move=(0, 10), on_done=done.append)
+        self.step(better_canvas, 0)
+        self.step(better_canvas, 1)
+        assert len(done) == 1
+        self.step(better_canvas, 1.5)
+        assert better_canvas.canvas.coords(rectangle.id) == [10, 5, 20, 15]
+        self.step(better_canvas, 2)
+        assert len(done) == 2
+        assert better_canvas.canvas.coords(rectangle.id) == [10, 10, 20, 20]
+
+    def test_cancel(self, better_canvas, animator):
+        """Cancelled tweens should stop where they are together with chained ones."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        tween = rectangle.animate(duration=1, move=(10, 0))
+        chained = tween.then(move=(0, 10))
+        self.step(better_canvas, 0)
+        self.step(better_canvas, 0.5)
+        tween.cancel()
+        self.step(better_canvas, 1)
+        assert better_canvas.canvas.coords(rectangle.id) == [5, 0, 15, 10]
+        assert chained.state == 'cancelled'
+
+    def test_invalid_targets(self, better_canvas):
+        """Invalid targets should be refused when the animation starts."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        with pytest.raises(ValueError):
+            rectangle.animate(coords=(0, 0))
+        with pytest.raises(ValueError):
+            rectangle.animate(move=(1, 1), easing='bouncy')
+        with pytest.raises(RuntimeError):
+            bc.Rectangle(better_canvas.canvas, 0, 0, 10, 10).animate(move=(1, 1))
+
+    def test_other_updates_stay_immediate(self, better_canvas, animator):
+        """Tweens should not defer other updates and their frames should stop after the last one."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        oval = better_canvas.create_oval(0, 0, 10, 10)
+        with better_canvas.batch():
+            rectangle.animate(duration=0, move=(10, 0))
+        oval.move(5, 0)
+        assert better_canvas.canvas.coords(oval.id) == [5, 0, 15, 10]
+        assert better_canvas.scheduler.running
+        better_canvas.scheduler._tick()
+        assert better_canvas.canvas.coords(rectangle.id) == [10, 0, 20, 10]
+        assert not better_canvas.scheduler.running
+        assert better_canvas._batch is None
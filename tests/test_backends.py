@@ -0,0 +1,125 @@
+"""Tests for backends module."""
+import pickle
+import time
+import tkinter as tk
+
+import pytest
+
+import BetterCanvas as bc
+
+
+class TestMemoryCanvas():
+    """Tests for the canvas backend kept in Python memory."""
+
+    def test_items(self, memory_canvas):
+        """Items should keep coordinates and options like on a Tk canvas."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, fill='red', tags=('foo', ))
+        rectangle.move(5, 5)
+        assert rectangle.coords == [5, 5, 15, 15]
+        assert memory_canvas.canvas.itemcget(rectangle.id, 'fill') == 'red'
+        assert memory_canvas.canvas.itemcget(rectangle.id, 'outline') == 'black'
+        assert rectangle.tags == ('foo', )
+        assert memory_canvas.find_withtag('foo') == (rectangle, )
+
+    def test_unknown_option(self, memory_canvas):
+        """Unknown options should raise TclError as on a Tk canvas."""
+        with pytest.raises(tk.TclError):
+            memory_canvas.canvas.create_rectangle(0, 0, 10, 10, text='foo')
+
+    def test_stacking(self, memory_canvas):
+        """Raising and lowering should change the stacking order."""
+        lower = memory_canvas.create_rectangle(0, 0, 10, 10)
+        upper = memory_canvas.create_rectangle(0, 0, 10, 10)
+        memory_canvas.canvas.tag_raise(lower.id)
+        assert memory_canvas.canvas.find_all() == (upper.id, lower.id)
+        assert memory_canvas.find_above(upper) is lower
+        memory_canvas.canvas.tag_lower(lower.id)
+        assert memory_canvas.find_closest(5, 5) is upper
+
+    def test_queries(self, memory_canvas):
+        """Area queries should compare bounding boxes."""
+        first = memory_canvas.create_rectangle(0, 0, 10, 10)
+        second = memory_canvas.create_oval(100, 100, 110, 110, width=4)
+        memory_canvas.create_rectangle(0, 0, 10, 10, state='hidden')
+        assert memory_canvas.canvas.bbox(second.id) == (98, 98, 112, 112)
+        assert memory_canvas.find_overlapping(0, 0, 50, 50) == (first, )
+        assert memory_canvas.find_enclosed(90, 90, 120, 120) == (second, )
+        assert memory_canvas.find_closest(200, 200) is second
+
+    def test_batch_and_create_many(self, memory_canvas):
+        """Batches and bulk creation should run without Tcl."""
+        ovals = memory_canvas.create_many(bc.Oval, [[0, 0, 10, 10], [20, 20, 30, 30]], fill='red')
+        with memory_canvas.batch():
+            ovals[0].move(5, 0)
+            ovals[1].fill = 'blue'
+        group = bc.ItemGroup(ovals)
+        assert group.coords == [[5, 0, 15, 10], [20, 20, 30, 30]]
+        assert memory_canvas.canvas.itemcget(ovals.ids[1], 'fill') == 'blue'
+
+    def test_spatial_index(self, memory_canvas):
+        """The spatial index should read bounding boxes from the backend."""
+        text = memory_canvas.create_text(100, 100, text='foo')
+        memory_canvas.use_spatial_index()
+        assert memory_canvas.find_overlapping(99, 99, 101, 101) == (text, )
+
+    def test_text(self, memory_canvas):
+        """Text should be edited in place."""
+        text = memory_canvas.create_text(0, 0, text='bar')
+        text.insert(0, 'foo')
+        text.dchars(3, 'end')
+        assert text.text == 'foo'
+
+    def test_pickle_and_replay(self, memory_canvas):
+        """Scenes should survive pickling and be replayed onto another canvas."""
+        memory_canvas.create_rectangle(0, 0, 10, 10, fill='red', tags=('foo', 'bar'))
+        memory_canvas.create_line(0, 0, 10, 10)
+        canvas = pickle.loads(pickle.dumps(memory_canvas.canvas))
+        target = bc.MemoryCanvas()
+        target.create_oval(0, 0, 1, 1)
+        ids = canvas.replay(target)
+        assert ids == {1: 2, 2: 3}
+        assert target.gettags(2) == ('foo', 'bar')
+        assert target.itemcget(2, 'fill') == 'red'
+        assert target.type(3) == 'line'
+
+    def test_after(self, memory_canvas):
+        """Callbacks should run on update once they are due, in the order of their deadlines."""
+        canvas = memory_canvas.canvas
+        calls = []
+        canvas.after(10000, calls.append, 'late')
+        canvas.after(1, calls.append, 'second')
+        canvas.after_idle(calls.append, 'first')
+        canvas.after_cancel(canvas.after_idle(calls.append, 'cancelled'))
+        time.sleep(0.002)
+        canvas.update()
+        assert calls == ['first', 'second']
+        assert len(pickle.loads(pickle.dumps(canvas)).timers) == 0
+        assert not memory_canvas.backend.event_loop
+
+    def test_unknown_backend(self):
+        """Unknown backend names should be refused."""
+        with pytest.raises(ValueError):
+            bc.BetterCanvas(backend='opengl')
+
+
+class TestTkBackend():
+    """Tests for running bulk subcommands on a Tk canvas."""
+
+    def test_evaluate(self, tk_canvas):
+        """Subcommands should run with their results, as on the memory backend."""
+        backend = bc.TkBackend(tk_canvas)
+        item_ids = backend.create_rows('rectangle', [[0, 0, 10, 10], [5, 5, 20, 20]], {'tags': 'room'}, {'fill': ['red', 'blue']})
+        results = backend.evaluate([('coords', item_ids[0]), ('itemcget', item_ids[1], '-fill'), ('move', 'room', 1, 1)])
+        assert [float(value) for value in backend.split(results[0])] == [0.0, 0.0, 10.0, 10.0]
+        assert results[1] == 'blue'
+        backend.run([('delete', item_ids[0])])
+        assert tk_canvas.find_withtag('room') == (item_ids[1], )
+        assert backend.evaluate([]) == ()
+
+    def test_better_canvas(self, better_canvas, memory_canvas):
+        """A BetterCanvas should use a TkBackend for a Tk canvas and other backends as they are."""
+        assert isinstance(better_canvas.backend, bc.TkBackend)
+        assert better_canvas.backend.event_loop
+        assert memory_canvas.backend is memory_canvas.canvas
+        memory_canvas.canvas.configure(width=200, height='100')
+        assert memory_canvas.backend.view_size() == (200.0, 100.0)
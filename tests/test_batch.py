@@ -0,0 +1,102 @@
+"""Tests for batch module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+class TestBatch():
+    """Tests for updates recorded with BetterCanvas.batch."""
+
+    @pytest.fixture
+    def rectangle(self, better_canvas):
+        return better_canvas.create_rectangle(0, 0, 100, 100)
+
+    def test_single_tcl_call(self, better_canvas, better_canvas_tcl_calls):
+        """All updates in a batch should be flushed with a single Tcl call."""
+        rectangles = [better_canvas.create_rectangle(0, 0, 100, 100) for _ in range(10)]
+        better_canvas_tcl_calls.count = 0
+        with better_canvas.batch():
+            for rectangle in rectangles:
+                rectangle.move(10, 10)
+                rectangle.fill = 'red'
+            assert better_canvas_tcl_calls.count == 0
+        assert better_canvas_tcl_calls.count == 1
+        assert better_canvas.canvas.coords(rectangles[0].id) == [10, 10, 110, 110]
+        assert better_canvas.canvas.itemcget(rectangles[-1].id, 'fill') == 'red'
+
+    def test_moves_add_together(self, better_canvas, rectangle):
+        """Several moves of one item should be coalesced."""
+        with better_canvas.batch() as batch:
+            rectangle.move(10, 0)
+            rectangle.move(0, 20)
+            assert batch.commands() == [('move', rectangle.id, 10, 20)]
+        assert rectangle.coords == [10, 20, 110, 120]
+
+    def test_coords_override_moves(self, better_canvas, rectangle):
+        """Coords should override moves recorded before them."""
+        with better_canvas.batch() as batch:
+            rectangle.move(10, 0)
+            rectangle.coords = [50, 50, 60, 60]
+            assert batch.commands() == [('coords', rectangle.id, 50, 50, 60, 60)]
+        assert rectangle.coords == [50, 50, 60, 60]
+
+    def test_delete(self, better_canvas, rectangle):
+        """Deleting an item should drop its other updates."""
+        with better_canvas.batch() as batch:
+            rectangle.move(10, 0)
+            rectangle.delete()
+            assert batch.commands() == [('delete', rectangle.id)]
+        assert better_canvas.canvas.find_all() == ()
+
+    def test_nested(self, better_canvas, rectangle, better_canvas_tcl_calls):
+        """Nested batches should be flushed once by the outermost one."""
+        with better_canvas.batch():
+            with better_canvas.batch():
+                rectangle.move(10, 0)
+            assert better_canvas_tcl_calls.count == 0
+        assert better_canvas_tcl_calls.count == 1
+
+    def test_read_flushes(self, better_canvas, rectangle):
+        """Reading coords inside a batch should see the recorded updates."""
+        with better_canvas.batch():
+            rectangle.move(10, 0)
+            assert rectangle.coords == [10, 0, 110, 100]
+
+    def test_tag_order(self, better_canvas, rectangle, better_canvas_tcl_calls):
+        """Options of a tag should be set in the order they were recorded in, without flushing."""
+        second = better_canvas.create_rectangle(0, 0, 100, 100, tags='foo')
+        rectangle.tags = ('foo', )
+        with better_canvas.batch() as batch:
+            second.fill = 'red'
+            better_canvas.tag_config('foo', fill='blue')
+            rectangle.outline = 'green'
+            better_canvas.tag_config('foo', outline='blue')
+            second.outline = 'red'
+            assert [command[:2] for command in batch.commands()] == [
+                ('itemconfigure', second.id), ('itemconfigure', 'foo'), ('itemconfigure', rectangle.id),
+                ('itemconfigure', 'foo'), ('itemconfigure', second.id)]
+            better_canvas_tcl_calls.count = 0
+        assert better_canvas_tcl_calls.count == 1
+        assert (rectangle.fill, rectangle.outline) == ('blue', 'blue')
+        assert (second.fill, second.outline) == ('blue', 'red')
+
+    def test_body_error(self, memory_canvas):
+        """An error of the with block should be raised instead of an error of applying the updates."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 100, 100)
+        with pytest.raises(KeyError):
+            with memory_canvas.batch() as batch:
+                rectangle.move(10, 0)
+                batch.itemconfig(rectangle.id, nothing=1)
+                raise KeyError('body')
+        assert memory_canvas._batch is None
+        assert rectangle.coords == [10, 0, 110, 100]
+
+    def test_standalone(self, tk_canvas):
+        """Batch should work with a plain tk.Canvas."""
+        rectangle = bc.Rectangle(tk_canvas, 0, 0, 100, 100)
+        batch = bc.Batch(tk_canvas)
+        batch.move(rectangle.id, 5, 5)
+        batch.itemconfig(rectangle.id, fill='red', dash=(2, 2))
+        assert batch.flush() == 2
+        assert tk_canvas.coords(rectangle.id) == [5, 5, 105, 105]
+        assert tk_canvas.itemcget(rectangle.id, 'fill') == 'red'
@@ -41,5 +41,64 @@ class TestBetterCanvas():
         item.focus()
         assert better_canvas.focus() == item
 
+    def test_tag_config(self, better_canvas):
+        """tag_config should change options of tagged items and invalidate their cache."""
+        first = better_canvas.create_rectangle(0, 0, 100, 100, fill='red', tags=('foo',))
+        second = better_canvas.create_rectangle(0, 0, 100, 100, fill='red')
+        better_canvas.tag_config('foo', fill='blue')
+        assert first.fill == 'blue'
+        assert second.fill == 'red'
 
+    def test_bbox(self, memory_canvas):
+        """bbox should take items, item ids and tags and flush a pending batch."""
+        first = memory_canvas.create_rectangle(0, 0, 10, 10, tags=('foo',))
+        second = memory_canvas.create_rectangle(20, 20, 30, 30)
+        with memory_canvas.batch():
+            second.move(10, 0)
+            assert memory_canvas.bbox(first, second.id) == memory_canvas.canvas.bbox(first.id, second.id)
+            assert memory_canvas.bbox(second)[2] > 40
+        assert memory_canvas.bbox('foo') == memory_canvas.canvas.bbox(first.id)
+        assert memory_canvas.bbox('bar') is None
 
+class TestCreateMany():
+    """Tests for BetterCanvas.create_many."""
+
+    coords = [[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]]
+
+    def test_single_tcl_call(self, better_canvas, better_canvas_tcl_calls):
+        """All items should be created with a single Tcl call."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords, fill='red')
+        assert better_canvas_tcl_calls.count == 1
+        assert len(ovals) == 3
+
+    def test_items(self, better_canvas):
+        """Items of the collection should be of the given type with the given coordinates."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        for oval, coords in zip(ovals, self.coords):
+            assert type(oval) == bc.Oval
+            assert oval.coords == coords
+            assert better_canvas.canvas.type(oval.id) == 'oval'
+
+    def test_per_item_options(self, better_canvas):
+        """Lists should give a value to each item, other values should be shared."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords, fill=['red', 'green', 'blue'], outline='black', tags=('foo', 'bar'))
+        assert [better_canvas.canvas.itemcget(oval.id, 'fill') for oval in ovals] == ['red', 'green', 'blue']
+        assert better_canvas.canvas.itemcget(ovals[1].id, 'outline') == 'black'
+        assert better_canvas.canvas.gettags(ovals[2].id) == ('foo', 'bar')
+
+    def test_flat_coords(self, better_canvas):
+        """Flat arrays should be split by the number of coordinates of the item type."""
+        from array import array
+        rectangles = better_canvas.create_many(bc.Rectangle, array('d', [0, 0, 10, 10, 20, 20, 30, 30]))
+        assert len(rectangles) == 2
+        assert rectangles[1].coords == [20, 20, 30, 30]
+
+    def test_wrong_number_of_values(self, better_canvas):
+        """Per item options of a wrong length should raise a ValueError."""
+        with pytest.raises(ValueError):
+            better_canvas.create_many(bc.Oval, self.coords, fill=['red'])
+
+    def test_find(self, better_canvas):
+        """Items created with create_many should be found through the canvas."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords, tags=('foo',))
+        assert better_canvas.find_withtag('foo') == tuple(ovals)
@@ -0,0 +1,97 @@
+"""Tests for collection module."""
+import gc
+
+import BetterCanvas as bc
+
+
+class TestItemCollection():
+    """Tests for ItemCollection class."""
+
+    coords = [[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]]
+
+    def test_lazy_items(self, better_canvas):
+        """Item instances should be created only when accessed."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        assert len(better_canvas.items) == 0
+        oval = ovals[1]
+        assert len(better_canvas.items) == 1
+        assert ovals[1] is oval
+
+    def test_shared_options_cached(self, better_canvas, better_canvas_tcl_calls):
+        """Shared options should be read without Tcl calls."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords, fill='red')
+        better_canvas_tcl_calls.count = 0
+        assert ovals[0].fill == 'red'
+        assert better_canvas_tcl_calls.count == 0
+
+    def test_contains(self, better_canvas):
+        """Collections should contain their items and ids."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        other = better_canvas.create_oval(0, 0, 10, 10)
+        assert ovals[0] in ovals
+        assert ovals.ids[2] in ovals
+        assert other not in ovals
+
+    def test_slice(self, better_canvas):
+        """Slicing should return a collection of the same type."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        assert list(ovals[1:].ids) == list(ovals.ids[1:])
+        assert isinstance(ovals[1:], bc.ItemCollection)
+
+    def test_slice_of_deleted(self, better_canvas):
+        """Slices should not create items that were deleted."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        before = ovals[0:2]
+        ovals[0].delete()
+        assert ovals[0:][0] is None
+        assert before[0] is None
+        assert ovals.ids[0] not in better_canvas.items
+
+    def test_delete(self, better_canvas):
+        """Deleting the collection should delete all its items."""
+        ovals = better_canvas.create_many(bc.Oval, self.coords)
+        ovals[0].delete()
+        ovals.delete()
+        assert better_canvas.canvas.find_all() == ()
+        assert better_canvas.items.get(ovals.ids[1]) is None
+
+
+class TestItemView():
+    """Tests for ItemView returned by find_* methods."""
+
+    def test_lazy_items(self, better_canvas):
+        """find_withtag should not create instances of the found items."""
+        ovals = better_canvas.create_many(bc.Oval, [[0, 0, 10, 10], [20, 20, 30, 30]], tags=('foo',))
+        found = better_canvas.find_withtag('foo')
+        assert isinstance(found, bc.ItemView)
+        assert len(found) == 2
+        assert len(better_canvas.items) == 0
+        assert found[1] is ovals[1]
+        assert len(better_canvas.items) == 1
+
+    def test_equality(self, better_canvas):
+        """Views should compare equal to sequences of the same items."""
+        rectangles = [better_canvas.create_rectangle(0, 0, 10, 10, tags=('foo',)) for _ in range(3)]
+        found = better_canvas.find_withtag('foo')
+        assert found == tuple(rectangles)
+        assert found == better_canvas.find_overlapping(0, 0, 10, 10)
+        assert found != tuple(rectangles[:2])
+        assert rectangles[0] in found
+        assert list(found[1:]) == rectangles[1:]
+
+    def test_unknown_items(self, better_canvas):
+        """Items created directly on the canvas should be created from their type."""
+        item_id = better_canvas.canvas.create_text(5, 5, text='foo')
+        text, = better_canvas.find_overlapping(0, 0, 10, 10)
+        assert isinstance(text, bc.Text)
+        assert text.id == item_id
+        assert better_canvas.items.get(item_id) is text
+
+    def test_weak_items(self):
+        """Items dropped from a weak registry should be created again when found."""
+        better_canvas = bc.BetterCanvas(weak_items=True)
+        item_id = better_canvas.create_rectangle(0, 0, 10, 10).id
+        gc.collect()
+        rectangle, = better_canvas.find_withtag(item_id)
+        assert isinstance(rectangle, bc.Rectangle)
+        assert rectangle.id == item_id
@@ -0,0 +1,79 @@
+"""Tests for direct module."""
+import BetterCanvas as bc
+
+
+class TestDirectCanvas():
+    """Tests for calling Tcl directly for frequent item commands."""
+
+    def test_same_results(self, tk_canvas):
+        """Results should be the same as those of tk.Canvas."""
+        fast = bc.DirectCanvas(tk_canvas)
+        first = tk_canvas.create_rectangle(0, 0, 10, 10, tags='room', fill='red')
+        second = tk_canvas.create_oval(5, 5, 20, 20, tags='room')
+        fast.move(first, 5, 5)
+        assert fast.coords(first) == tk_canvas.coords(first) == [5.0, 5.0, 15.0, 15.0]
+        fast.coords(second, [0, 0, 30, 30])
+        assert tk_canvas.coords(second) == [0.0, 0.0, 30.0, 30.0]
+        fast.itemconfig(first, {'outline': 'blue'}, width=2)
+        assert fast.itemcget(first, 'outline') == tk_canvas.itemcget(first, 'outline') == 'blue'
+        assert fast.itemcget(first, 'fill') == 'red'
+        assert fast.bbox(first) == tk_canvas.bbox(first)
+        assert fast.bbox('nothing') is None
+        assert fast.gettags(first) == tk_canvas.gettags(first) == ('room', )
+        assert fast.find_withtag('room') == tk_canvas.find_withtag('room') == (first, second)
+        assert fast.find_all() == (first, second)
+        assert fast.find_above(first) == (second, )
+        assert fast.find_below(first) == ()
+        assert fast.find_overlapping(0, 0, 1, 1) == tk_canvas.find_overlapping(0, 0, 1, 1)
+        assert fast.find_enclosed(-1, -1, 31, 31) == tk_canvas.find_enclosed(-1, -1, 31, 31)
+
+    def test_single_call(self, tk_canvas, tcl_calls):
+        """Each command should make a single Tcl call."""
+        fast = bc.DirectCanvas(tk_canvas)
+        item_id = tk_canvas.create_rectangle(0, 0, 10, 10)
+        tcl_calls.count = 0
+        fast.move(item_id, 1, 1)
+        fast.coords(item_id)
+        fast.itemconfig(item_id, fill='red', width=None)
+        fast.find_withtag(item_id)
+        assert tcl_calls.count == 4
+
+    def test_fallback(self, tk_canvas):
+        """Options that need conversion and other methods should go through tk.Canvas."""
+        fast = bc.DirectCanvas(tk_canvas)
+        item_id = tk_canvas.create_line(0, 0, 10, 10)
+        fast.itemconfig(item_id, dash=(4, 2))
+        assert tk_canvas.itemcget(item_id, 'dash') == '4 2'
+        assert fast.type(item_id) == 'line'
+        assert fast.find_closest(0, 0) == tk_canvas.find_closest(0, 0) == (item_id, )
+        assert fast.find_closest(0, 0, 5) == (item_id, )
+
+    def test_better_canvas(self, better_canvas, better_canvas_tcl_calls):
+        """Items of a BetterCanvas should use it outside of batches."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        assert isinstance(better_canvas._target, bc.DirectCanvas)
+        better_canvas_tcl_calls.count = 0
+        rectangle.move(5, 0)
+        rectangle.fill = 'red'
+        assert rectangle.coords == [5.0, 0.0, 15.0, 10.0]
+        assert better_canvas_tcl_calls.count == 3
+        assert better_canvas.canvas.itemcget(rectangle.id, 'fill') == 'red'
+        better_canvas_tcl_calls.count = 0
+        rectangle.coords = [0, 0, 20, 20]
+        bbox = rectangle.bbox
+        assert better_canvas_tcl_calls.count == 2
+        assert bbox == better_canvas.canvas.bbox(rectangle.id)
+        assert better_canvas._fast is better_canvas.direct_canvas
+
+    def test_profiler(self, better_canvas):
+        """Calls made after a profiler was started should be measured."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.move(1, 1)
+        with better_canvas.profile() as profiler:
+            rectangle.move(1, 1)
+        assert profiler.stats()['move']['count'] == 1
+
+    def test_other_backends(self):
+        """Other canvas backends should be used as they are."""
+        better_canvas = bc.BetterCanvas(backend='memory')
+        assert better_canvas.direct_canvas is better_canvas.canvas
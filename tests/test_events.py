@@ -0,0 +1,90 @@
+"""Tests for events module."""
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def memory_canvas(memory_canvas):
+    """memory_canvas with a spatial index to find items under the pointer."""
+    memory_canvas.use_spatial_index()
+    return memory_canvas
+
+@pytest.fixture
+def dispatcher(memory_canvas):
+    """Event dispatcher of memory_canvas."""
+    return memory_canvas.use_event_dispatcher()
+
+
+def event(x, y):
+    """Returns an event at the given window coordinates."""
+    return SimpleNamespace(x=x, y=y)
+
+
+class TestEventDispatcher():
+    """Tests for routing events to callbacks of items and tags."""
+
+    def test_single_binding(self, memory_canvas, dispatcher):
+        """Binding many items should install one canvas binding per sequence."""
+        rectangles = [memory_canvas.create_rectangle(index, 0, index + 1, 1) for index in range(100)]
+        for rectangle in rectangles:
+            rectangle.bind('<Button-1>', print)
+        memory_canvas.tag_bind('foo', '<Button-1>', print)
+        assert len(memory_canvas.canvas.bindings[None]['<Button-1>']) == 1
+        assert 'foo' not in memory_canvas.canvas.bindings
+        assert len(dispatcher) == 101
+
+    def test_routing(self, memory_canvas, dispatcher):
+        """Callbacks of "all", tags and then the topmost item should be called with it."""
+        memory_canvas.create_rectangle(0, 0, 10, 10, fill='red')
+        top = memory_canvas.create_rectangle(0, 0, 10, 10, tags=('foo', ), fill='red')
+        calls = []
+        top.bind('<Button-1>', lambda event: calls.append(('item', event.item)))
+        memory_canvas.tag_bind('foo', '<Button-1>', lambda event: calls.append(('foo', event.item)))
+        memory_canvas.tag_bind('all', '<Button-1>', lambda event: calls.append(('all', event.item)))
+        dispatcher.handle('<Button-1>', event(5, 5))
+        dispatcher.handle('<Button-1>', event(50, 50))
+        assert calls == [('all', top), ('foo', top), ('item', top)]
+
+    def test_break(self, memory_canvas, dispatcher):
+        """A callback returning "break" should stop the others."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, tags=('foo', ), fill='red')
+        calls = []
+        memory_canvas.tag_bind('foo', '<Button-1>', lambda event: 'break')
+        rectangle.bind('<Button-1>', calls.append)
+        assert dispatcher.handle('<Button-1>', event(5, 5)) == 'break'
+        assert calls == []
+
+    def test_hover(self, memory_canvas, dispatcher):
+        """Enter and Leave of items should be synthesized from motion."""
+        first = memory_canvas.create_rectangle(0, 0, 10, 10, fill='red')
+        second = memory_canvas.create_rectangle(20, 0, 30, 10, fill='red')
+        calls = []
+        for item in (first, second):
+            item.bind('<Enter>', lambda event: calls.append(('enter', event.item)))
+            item.bind('<Leave>', lambda event: calls.append(('leave', event.item)))
+        for x in (5, 6, 25, 50):
+            dispatcher.handle('<Motion>', event(x, 5))
+        dispatcher.handle('<Enter>', event(25, 5))
+        dispatcher.handle('<Leave>', event(25, 5))
+        assert calls == [('enter', first), ('leave', first), ('enter', second), ('leave', second),
+                         ('enter', second), ('leave', second)]
+
+    def test_delete(self, memory_canvas, dispatcher):
+        """Callbacks of deleted items should be dropped."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.bind('<Button-1>', print)
+        rectangle.bind('<Button-3>', print)
+        rectangle.delete()
+        assert len(dispatcher) == 0
+
+    def test_unbind_and_clear(self, memory_canvas, dispatcher):
+        """Callbacks should be removed one by one or all together with the canvas bindings."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.bind('<Button-1>', print)
+        rectangle.bind('<Button-1>', repr, add=True)
+        dispatcher.unbind(rectangle.id, '<Button-1>', print)
+        assert dispatcher.item_callbacks['<Button-1>'][rectangle.id] == [repr]
+        dispatcher.clear()
+        assert len(dispatcher) == 0
+        assert memory_canvas.canvas.bindings[None]['<Button-1>'] == []
@@ -0,0 +1,157 @@
+"""Tests for groups module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+class TestItemGroup():
+    """Tests for ItemGroup class."""
+
+    coords = [[0, 0, 10, 10], [20, 20, 30, 30], [40, 40, 50, 50]]
+
+    @pytest.fixture
+    def group(self, better_canvas):
+        return bc.ItemGroup(better_canvas.create_many(bc.Oval, self.coords))
+
+    def test_coords(self, group, better_canvas_tcl_calls):
+        """Coordinates should be read from the buffer without Tcl calls."""
+        assert group.coords == self.coords
+        assert better_canvas_tcl_calls.count == 0
+
+    def test_move(self, group, better_canvas, better_canvas_tcl_calls):
+        """Moving the group should move all members with a single Tcl call."""
+        group.move(5, 10)
+        assert better_canvas_tcl_calls.count == 1
+        assert group.coords[1] == [25, 30, 35, 40]
+        assert better_canvas.canvas.coords(group[1].id) == [25, 30, 35, 40]
+
+    def test_move_each(self, group, better_canvas):
+        """Every member should be moved by its own offset."""
+        group.move_each([(1, 1), (0, 0), (2, 3)])
+        assert group.coords == [[1, 1, 11, 11], [20, 20, 30, 30], [42, 43, 52, 53]]
+        assert better_canvas.canvas.coords(group[2].id) == [42, 43, 52, 53]
+
+    def test_set_coords_sends_changed_rows(self, group, better_canvas):
+        """Only members with new coordinates should be sent to Tk."""
+        new_coords = [[0, 0, 10, 10], [0, 0, 5, 5], [40, 40, 50, 50]]
+        with better_canvas.batch() as batch:
+            group.set_coords(new_coords)
+            assert batch.commands() == [('coords', group.ids[1], 0, 0, 5, 5)]
+        assert group.coords == new_coords
+        assert better_canvas.canvas.coords(group[1].id) == [0, 0, 5, 5]
+
+    def test_refresh(self, group, better_canvas):
+        """refresh should read coordinates changed behind the group's back."""
+        group[0].move(1, 1)
+        group.refresh()
+        assert group.coords[0] == [1, 1, 11, 11]
+
+    def test_plain_items(self, tk_canvas):
+        """Groups of items without a BetterCanvas should update the canvas directly."""
+        rectangles = [bc.Rectangle(tk_canvas, *coords) for coords in self.coords]
+        group = bc.ItemGroup(rectangles)
+        group.move(1, 2)
+        assert tk_canvas.coords(rectangles[0].id) == [1, 2, 11, 12]
+
+
+class TestGroup():
+    """Tests for Group and SceneGraph classes."""
+
+    @pytest.fixture
+    def scene(self, memory_canvas):
+        """Group "house" with a rectangle and a nested group "room" with two ovals."""
+        floor = memory_canvas.create_rectangle(0, 0, 100, 100)
+        lamp = memory_canvas.create_oval(10, 10, 20, 20)
+        chair = memory_canvas.create_oval(30, 30, 40, 40)
+        room = memory_canvas.create_group(lamp, chair, tag='room')
+        house = memory_canvas.create_group(floor, room, tag='house')
+        return house, room, floor, lamp, chair
+
+    def test_tags(self, memory_canvas, scene):
+        """Items should have the tags of all groups above them."""
+        house, room, floor, lamp, chair = scene
+        assert memory_canvas.canvas.gettags(lamp.id) == ('room', 'house')
+        assert memory_canvas.find_withtag('house') == [floor, lamp, chair]
+        assert house.item_ids() == [floor.id, lamp.id, chair.id]
+        house.remove(room)
+        assert memory_canvas.canvas.gettags(lamp.id) == ('room', )
+        assert room.parent is None
+        assert memory_canvas.scene_graph.roots == [room, house]
+
+    def test_transforms(self, memory_canvas, scene):
+        """Moving and scaling a group should change all items of its subtree."""
+        house, room, floor, lamp, chair = scene
+        house.move(10, 5)
+        assert chair.coords == [40, 35, 50, 45]
+        room.scale(0, 0, 2, 2)
+        assert lamp.coords == [40, 30, 60, 50]
+        assert floor.coords == [10, 5, 110, 105]
+
+    def test_cached_bbox(self, memory_canvas, scene):
+        """Bounding boxes should be cached and follow changes of items."""
+        house, room, floor, lamp, chair = scene
+        assert room.bbox == memory_canvas.canvas.bbox('room')
+        assert house.bbox == memory_canvas.canvas.bbox('house')
+        chair.move(200, 0)
+        assert memory_canvas.scene_graph.bboxes[chair.id] == memory_canvas.canvas.bbox(chair.id)
+        assert house.bbox == memory_canvas.canvas.bbox('house')
+        lamp.coords = (-50, -50, -40, -40)
+        assert room.bbox == memory_canvas.canvas.bbox('room')
+        room.scale(0, 0, 0.5, 0.5)
+        assert room.bbox == memory_canvas.canvas.bbox('room')
+        assert lamp.bbox == memory_canvas.canvas.bbox(lamp.id)
+
+    def test_find_at(self, memory_canvas, scene):
+        """Hit tests should return items whose bounding box contains the point."""
+        house, room, floor, lamp, chair = scene
+        assert house.find_at(15, 15) == [floor, lamp]
+        assert memory_canvas.scene_graph.find_at(50, 50) == [floor]
+        assert house.find_at(500, 500) == []
+
+    def test_delete(self, memory_canvas, scene):
+        """Deleting items or groups should update the scene graph."""
+        house, room, floor, lamp, chair = scene
+        chair.delete()
+        assert room.children == [lamp]
+        room.delete()
+        assert house.children == [floor]
+        assert 'room' not in memory_canvas.scene_graph.groups
+        assert memory_canvas.canvas.find_all() == (floor.id, )
+
+    def test_cycle(self, memory_canvas, scene):
+        """A group should not be put into its own subtree."""
+        house, room, *_ = scene
+        with pytest.raises(ValueError):
+            room.add(house)
+
+    def test_find_withtag_order(self, memory_canvas, scene):
+        """Items of a group tag should be found in stacking order, not in the order of the subtree."""
+        house, room, floor, lamp, chair = scene
+        room.remove(lamp)
+        room.add(lamp)
+        assert room.item_ids() == [chair.id, lamp.id]
+        assert memory_canvas.find_withtag('room') == [lamp, chair]
+        memory_canvas.use_stacking_order()
+        floor.raise_above(chair)
+        assert memory_canvas.find_withtag('house') == [lamp, chair, floor]
+
+    def test_used_tag(self, memory_canvas, scene):
+        """Tags of other groups and items should not be taken by a new group."""
+        stool = memory_canvas.create_oval(0, 0, 5, 5, tags=('seat', 'group1'))
+        with pytest.raises(ValueError):
+            memory_canvas.create_group(stool, tag='room')
+        with pytest.raises(ValueError):
+            memory_canvas.create_group(tag='seat')
+        assert memory_canvas.create_group(stool).tag == 'group2'
+
+    def test_tcl_calls(self, better_canvas, better_canvas_tcl_calls):
+        """Moves and cached bounding boxes should need a single Tcl call or none."""
+        rectangles = [better_canvas.create_rectangle(x, 0, x + 10, 10) for x in range(0, 100, 20)]
+        group = better_canvas.create_group(*rectangles)
+        assert group.bbox == better_canvas.canvas.bbox(group.tag)
+        better_canvas_tcl_calls.count = 0
+        group.move(10, 0)
+        assert better_canvas_tcl_calls.count == 1
+        assert group.bbox == better_canvas.canvas.bbox(group.tag)
+        assert rectangles[2].bbox == better_canvas.canvas.bbox(rectangles[2].id)
+        assert better_canvas_tcl_calls.count == 3
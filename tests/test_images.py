@@ -0,0 +1,119 @@
+"""Tests for images module."""
+import itertools
+import time
+
+import pytest
+
+import BetterCanvas as bc
+
+
+class FakeImage():
+    """Image with a size and a Tk name, created without Tk."""
+
+    names = itertools.count()
+
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size or (10, 10)
+        self.name = f'image{next(self.names)}'
+
+    def __str__(self):
+        return self.name
+
+    def width(self):
+        return self.size[0]
+
+    def height(self):
+        return self.size[1]
+
+
+class FakeImageCache(bc.ImageCache):
+    """ImageCache creating FakeImage instances instead of Tk images."""
+
+    def create(self, kind, data, size):
+        return FakeImage(data, size)
+
+
+@pytest.fixture
+def cache(memory_canvas):
+    """Image cache of memory_canvas that takes up to three 10x10 images."""
+    cache = FakeImageCache(memory_canvas, budget=1200)
+    memory_canvas.listeners.append(cache)
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def files(tmp_path):
+    """Paths of image files, the first two have the same content."""
+    paths = [tmp_path / f'{index}.png' for index in range(5)]
+    for index, path in enumerate(paths):
+        path.write_bytes(b'image %d' % max(index, 1))
+    return paths
+
+
+def wait(cache):
+    """Drains the cache until all loads are resolved."""
+    while cache.stats()['pending']:
+        cache.drain()
+
+
+class TestImageCache():
+    """Tests for sharing, counting and dropping images."""
+
+    def test_dedupe(self, cache, files):
+        """Identical sources should share one image."""
+        image = cache.get(files[0])
+        assert cache.get(files[0]) is image
+        assert cache.get(files[1]) is image
+        assert cache.get(b'image 1') is image
+        assert cache.get(files[0], size=(5, 5)) is not image
+        assert cache.stats()['images'] == 2
+        assert cache.stats()['hits'] == 2
+
+    def test_references(self, memory_canvas, cache, files):
+        """Items showing an image should be counted."""
+        image = cache.get(files[0])
+        first = memory_canvas.create_image(0, 0, image=image)
+        second = memory_canvas.create_image(0, 0, image=image)
+        key = cache.names[str(image)]
+        assert cache.refs[key] == {first.id, second.id}
+        second.image = cache.get(files[2])
+        first.delete()
+        assert cache.refs[key] == set()
+
+    def test_eviction(self, memory_canvas, cache, files):
+        """Least recently used images no item shows should be dropped over the budget."""
+        shown = cache.get(files[0])
+        memory_canvas.create_image(0, 0, image=shown)
+        for path in files[2:]:
+            cache.get(path)
+        cache.get(files[3])
+        cache.get(files[4])
+        assert cache.stats()['evictions'] == 1
+        assert str(shown) in cache.names
+        assert len(cache) == 3
+
+    def test_load(self, memory_canvas, cache, files):
+        """Background loads should share results and show the image on created items."""
+        futures = [cache.load(files[2]), cache.load(files[2])]
+        item = cache.create_image(0, 0, files[3], anchor='nw')
+        wait(cache)
+        assert futures[0] is futures[1]
+        assert futures[0].result() is cache.get(files[2])
+        assert item.image == str(cache.get(files[3]))
+        assert cache.refs[cache.names[str(item.image)]] == {item.id}
+
+    def test_load_error(self, cache, tmp_path):
+        """Failed loads should resolve with the error."""
+        future = cache.load(tmp_path)
+        wait(cache)
+        assert isinstance(future.exception(), OSError)
+
+    def test_drain_after_close(self, cache, files):
+        """Results of loads cancelled by close should be dropped."""
+        future = cache.load(files[2])
+        while cache._ready.empty():
+            time.sleep(0.001)
+        cache.close()
+        assert cache.drain() == 0
+        assert future.cancelled()
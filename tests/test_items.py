@@ -1,4 +1,6 @@
 """Tests for the items module."""
+import weakref
+
 import pytest
 
 import BetterCanvas as bc
@@ -25,6 +27,69 @@ def test_coords(mock_item):
     mock_item.coords = new_coords
     assert mock_item.coords == new_coords
 
+class TestCreation():
+    """Tests for creating items together with their options."""
+
+    def test_single_tcl_call(self, tk_canvas, tcl_calls):
+        """Creating an item with options should cost exactly one Tcl call."""
+        bc.Rectangle(tk_canvas, 0, 0, 100, 100, fill='red', outline='blue', width=2, dash=(2, 2), tags=('one',))
+        assert tcl_calls.count == 1
+
+    def test_options_applied(self, tk_canvas):
+        """Options given at creation should be set on the canvas item."""
+        rectangle = bc.Rectangle(tk_canvas, 0, 0, 100, 100, fill='red', tags=('one',))
+        assert tk_canvas.itemcget(rectangle.id, 'fill') == 'red'
+        assert tk_canvas.find_withtag('one') == (rectangle.id, )
+
+    def test_other_options_set_as_attributes(self, tk_canvas):
+        """Options outside of config_options should be set on the Python side."""
+        rectangle = bc.Rectangle(tk_canvas, 0, 0, 100, 100, fill='red', some_attribute='foo')
+        assert rectangle.some_attribute == 'foo'
+
+class TestSlots():
+    """Tests for compact item instances."""
+
+    def test_no_instance_dict(self, tk_canvas):
+        """Built-in items should keep their state in slots."""
+        rectangle = bc.Rectangle(tk_canvas, 0, 0, 100, 100)
+        assert bc.Rectangle.__slots__ == ()
+        assert rectangle._options is None
+        assert 'id' not in rectangle.__dict__
+
+    def test_subclass_attributes(self, better_canvas):
+        """Subclasses should still accept any attributes."""
+
+        class MyRectangle(bc.Rectangle):
+
+            def describe(self):
+                return f"{self.some_attribute} rectangle filled with {self.fill}"
+
+        rectangle = better_canvas.create_item(MyRectangle, 0, 0, 100, 100, some_attribute='foo', fill='red')
+        rectangle.other_attribute = 'bar'
+        assert rectangle.describe() == 'foo rectangle filled with red'
+        assert rectangle.other_attribute == 'bar'
+
+    def test_cooperative_mixin(self, better_canvas):
+        """Options that are not Tk options should be passed on to mixins following the item class."""
+
+        class Labelled():
+
+            def __init__(self, label=None, **kwargs):
+                self.label_text = label
+                super().__init__(**kwargs)
+
+        class LabelledRectangle(bc.Rectangle, Labelled):
+            pass
+
+        rectangle = better_canvas.create_item(LabelledRectangle, 0, 0, 100, 100, label='foo', fill='red')
+        assert rectangle.label_text == 'foo'
+        assert rectangle.fill == 'red'
+
+    def test_weak_reference(self, tk_canvas):
+        """Items should support weak references."""
+        rectangle = bc.Rectangle(tk_canvas, 0, 0, 100, 100)
+        assert weakref.ref(rectangle)() is rectangle
+
 class TestItemConfig():
 
     def test_unknown_option(self, mock_item):
@@ -33,6 +98,79 @@ class TestItemConfig():
             mock_item.not_an_option
 
 
+class TestOptionCache():
+    """Tests for the option cache of items."""
+
+    @pytest.fixture
+    def rectangle(self, tk_canvas):
+        return bc.Rectangle(tk_canvas, 0, 0, 100, 100, fill='red')
+
+    def test_read_created_option(self, rectangle, tcl_calls):
+        """Options given at creation should be read without Tcl calls."""
+        assert rectangle.fill == 'red'
+        assert tcl_calls.count == 0
+
+    def test_read_after_write(self, rectangle, tcl_calls):
+        """Options should be read from the cache after they were set."""
+        rectangle.outline = 'blue'
+        assert rectangle.outline == 'blue'
+        assert tcl_calls.count == 1
+
+    def test_miss_asks_tk_once(self, rectangle, tcl_calls):
+        """Unknown options should be read from Tk only once."""
+        rectangle.outline
+        rectangle.outline
+        assert tcl_calls.count == 1
+
+    def test_skip_unchanged_write(self, rectangle, tcl_calls):
+        """Setting the cached value again should not call Tk."""
+        rectangle.fill = 'red'
+        assert tcl_calls.count == 0
+
+    def test_invalidate(self, rectangle, tk_canvas, tcl_calls):
+        """Invalidated options should be read from Tk again."""
+        tk_canvas.itemconfig(rectangle.id, fill='blue')
+        rectangle.invalidate_options('fill')
+        assert rectangle.fill == 'blue'
+
+    def test_tk_form(self, rectangle, tcl_calls):
+        """Cached values should be the strings Tk reports, values only Tk can convert should not be cached."""
+        rectangle.width = 2
+        rectangle.dash = (4, 2)
+        cached = (rectangle.width, rectangle.dash)
+        assert tcl_calls.count == 2
+        rectangle.invalidate_options()
+        assert cached == (rectangle.width, rectangle.dash) == ('2.0', '4 2')
+        rectangle.width = '1m'
+        tcl_calls.count = 0
+        assert rectangle.width == rectangle.canvas.itemcget(rectangle.id, 'width')
+        assert tcl_calls.count == 2
+
+    def test_unknown_values(self, rectangle, better_canvas):
+        """None, booleans and smooth should not be cached and items keeping other values should be marked stale."""
+        rectangle.fill = None
+        assert rectangle.fill == 'red'
+        line = better_canvas.create_line(0, 0, 10, 10, smooth=1, fill='red')
+        assert line.id in better_canvas.items.stale
+        assert line.smooth == better_canvas.canvas.itemcget(line.id, 'smooth')
+        oval = better_canvas.create_oval(0, 0, 10, 10, fill='red')
+        oval.width = '1m'
+        assert oval.id in better_canvas.items.stale
+        assert better_canvas.create_oval(0, 0, 10, 10, width=2).id not in better_canvas.items.stale
+
+    def test_disabled_cache(self, rectangle, tcl_calls, monkeypatch):
+        """Every read should ask Tk when the cache is disabled."""
+        monkeypatch.setattr(bc.Item, 'option_cache', False)
+        rectangle.fill
+        rectangle.fill
+        rectangle.fill = 'red'
+        assert tcl_calls.count == 3
+
+    def test_text_insert(self, tk_canvas):
+        """Inserting text should not leave a stale text option behind."""
+        text = bc.Text(tk_canvas, 0, 0, text='world')
+        text.insert(0, 'hello ')
+        assert text.text == 'hello world'
 
 class TestTags():
     """Tests for tags assignment, deletion, etc."""
@@ -111,6 +249,13 @@ class TestLine():
         image = better_canvas.create_item(bc.Line, 0, 0, 100, 100)
         assert type(image) == bc.Line
 
+    def test_polyline(self, better_canvas):
+        """A line should take any even number of at least 4 coordinates."""
+        line = better_canvas.create_line(0, 0, 10, 10, 20, 0)
+        assert line.coords == [0, 0, 10, 10, 20, 0]
+        with pytest.raises(TypeError):
+            better_canvas.create_line(0, 0, 10)
+
 class TestPolygon():
     """Tests for Polygon class."""
 
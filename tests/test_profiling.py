@@ -0,0 +1,55 @@
+"""Tests for profiling module."""
+import BetterCanvas as bc
+
+
+class TestProfiler():
+    """Tests for measuring Tcl calls of a BetterCanvas."""
+
+    def test_sites(self, better_canvas):
+        """Calls should be grouped by canvas subcommand."""
+        with better_canvas.profile() as profiler:
+            rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+            rectangle.move(5, 5)
+            rectangle.move(5, 5)
+            better_canvas.find_overlapping(0, 0, 10, 10)
+        stats = profiler.stats()
+        assert stats['create rectangle']['count'] == 1
+        assert stats['move']['count'] == 2
+        assert stats['find overlapping']['count'] == 1
+        assert stats['move']['bytes'] > 0
+        assert stats['move']['p99'] >= stats['move']['p50'] >= 0
+
+    def test_batch_script(self, better_canvas):
+        """A flushed batch should be reported as a single script."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        with better_canvas.profile() as profiler:
+            with better_canvas.batch():
+                rectangle.move(5, 5)
+                rectangle.fill = 'red'
+        assert list(profiler.stats()) == ['script']
+
+    def test_scope(self, better_canvas):
+        """Calls outside the with block should not be measured."""
+        with better_canvas.profile() as profiler:
+            pass
+        better_canvas.create_rectangle(0, 0, 10, 10)
+        assert profiler.stats() == {}
+        assert not hasattr(better_canvas.canvas.tk, 'profiler')
+
+    def test_use_profiler(self, better_canvas):
+        """Persistent profiler should feed stats and exporters."""
+        exported = []
+        profiler = better_canvas.use_profiler(callers=True)
+        profiler.exporters.append(lambda site, seconds, size: exported.append(site))
+        with better_canvas.profile() as scoped:
+            better_canvas.create_oval(0, 0, 10, 10)
+        site, = better_canvas.stats()
+        assert site.startswith('create oval @ ')
+        assert __file__ in site
+        assert exported == [site]
+        assert list(scoped.stats()) == ['create oval']
+        profiler.uninstall()
+
+    def test_no_profiler(self):
+        """stats should be empty until a profiler is started."""
+        assert bc.BetterCanvas().stats() == {}
@@ -0,0 +1,83 @@
+"""Tests for registry module."""
+import gc
+
+import BetterCanvas as bc
+
+
+class TestItemRegistry():
+    """Tests for items registered by BetterCanvas."""
+
+    def test_miss_does_not_insert(self, better_canvas):
+        """Finding nothing should not add entries to the registry."""
+        rectangle = better_canvas.create_rectangle(0, 0, 100, 100)
+        assert better_canvas.find_above(rectangle) is None
+        assert better_canvas.focus() is None
+        assert len(better_canvas.items) == 1
+
+    def test_find_above(self, better_canvas):
+        """find_above should return the registered item."""
+        lower = better_canvas.create_rectangle(0, 0, 100, 100)
+        upper = better_canvas.create_rectangle(0, 0, 100, 100)
+        assert better_canvas.find_above(lower) is upper
+        assert better_canvas.find_below(upper) is lower
+
+    def test_item_delete(self, better_canvas):
+        """Deleting an item should remove it from the registry."""
+        rectangle = better_canvas.create_rectangle(0, 0, 100, 100)
+        rectangle.delete()
+        assert rectangle.id not in better_canvas.items
+        assert len(better_canvas.items) == 0
+
+    def test_delete_by_tag(self, better_canvas):
+        """Deleting by tag through the canvas should remove the tagged items."""
+        tagged = better_canvas.create_rectangle(0, 0, 100, 100, tags=('foo',))
+        other = better_canvas.create_rectangle(0, 0, 100, 100)
+        better_canvas.delete('foo')
+        assert tagged.id not in better_canvas.items
+        assert better_canvas.items.get(other.id) is other
+        assert better_canvas.canvas.find_all() == (other.id, )
+
+    def test_delete_all(self, better_canvas):
+        """Deleting all items through the canvas should empty the registry."""
+        better_canvas.create_rectangle(0, 0, 100, 100)
+        better_canvas.delete('all')
+        assert len(better_canvas.items) == 0
+        assert better_canvas.canvas.find_all() == ()
+
+    def test_delete_item(self, better_canvas):
+        """Items passed to the canvas delete method should be removed from the registry."""
+        rectangle = better_canvas.create_rectangle(0, 0, 100, 100)
+        better_canvas.delete(rectangle)
+        assert len(better_canvas.items) == 0
+
+    def test_weak_items(self):
+        """Weak registry should drop items without other references."""
+        better_canvas = bc.BetterCanvas(weak_items=True)
+        kept = better_canvas.create_rectangle(0, 0, 100, 100)
+        better_canvas.create_rectangle(0, 0, 100, 100)
+        gc.collect()
+        assert len(better_canvas.items) == 1
+        assert better_canvas.items.get(kept.id) is kept
+
+    def test_stats(self, better_canvas):
+        """stats should report the number of items and their memory."""
+        rectangle = better_canvas.create_rectangle(0, 0, 100, 100)
+        better_canvas.create_rectangle(0, 0, 100, 100)
+        rectangle.delete()
+        stats = better_canvas.items.stats()
+        assert stats['items'] == 1
+        assert stats['registered'] == 2
+        assert stats['discarded'] == 1
+        assert stats['bytes'] > 0
+
+    def test_collections_lookup(self, better_canvas):
+        """Items should be found in the collection whose id range holds them."""
+        collections = [better_canvas.create_many(bc.Oval, [[0, 0, 10, 10]] * 3) for _ in range(20)]
+        registry = better_canvas.items
+        assert registry.get(collections[7].ids[1]) is collections[7][1]
+        assert registry.known_options(collections[12].ids[2]) == {}
+        collections[3].delete()
+        assert collections[3] not in registry.collections
+        assert registry.get(collections[3].ids[0]) is None
+        assert registry.get(collections[4].ids[0]).id == collections[4].ids[0]
+        assert registry.get(10 ** 6) is None
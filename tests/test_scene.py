@@ -0,0 +1,143 @@
+"""Tests for scene module."""
+import mmap
+import struct
+
+import pytest
+
+import BetterCanvas as bc
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Path of a scene file."""
+    return tmp_path / 'scene.bcs'
+
+
+class TestSceneSnapshot():
+    """Tests for the binary scene format."""
+
+    def test_write_and_read(self, path):
+        """Records should survive a round trip through a file."""
+        records = [
+            (3, 'rectangle', [0, 0, 10, 10], ('foo', 'bar'), {'fill': 'red'}),
+            (7, 'text', [5, 5], ('foo', ), {'text': 'zażółć', 'fill': 'red'}),
+        ]
+        bc.SceneSnapshot.from_records(records).write(path)
+        snapshot = bc.SceneSnapshot.read(path)
+        assert len(snapshot) == 2
+        assert list(snapshot.ids) == [3, 7]
+        assert snapshot.type(1) == 'text'
+        assert snapshot.item_coords(0) == [0, 0, 10, 10]
+        assert snapshot.item_tags(0) == ('foo', 'bar')
+        assert snapshot.item_options(1) == {'text': 'zażółć', 'fill': 'red'}
+        assert len(snapshot.strings) == 7
+        snapshot.close()
+
+    def test_detach(self, path):
+        """Detached snapshots should keep their values after the file is released."""
+        bc.SceneSnapshot.from_records([(1, 'line', [0, 0, 1, 1], (), {})]).write(path)
+        snapshot = bc.SceneSnapshot.read(path)
+        snapshot.detach()
+        path.write_bytes(b'')
+        assert snapshot.item_coords(0) == [0, 0, 1, 1]
+
+    def test_not_a_scene(self, path):
+        """Other files should be refused."""
+        path.write_bytes(b'not a scene file at all, just some text')
+        with pytest.raises(ValueError):
+            bc.SceneSnapshot.read(path)
+
+
+    def test_unmapped_on_error(self, path, monkeypatch):
+        """Files that are refused should be unmapped."""
+        mapped = []
+        class Mapping(mmap.mmap):
+            def __new__(cls, *args, **kwargs):
+                mapping = super().__new__(cls, *args, **kwargs)
+                mapped.append(mapping)
+                return mapping
+        monkeypatch.setattr(mmap, 'mmap', Mapping)
+        bc.SceneSnapshot.from_records([(1, 'line', [0, 0, 1, 1], ('foo', ), {'width': '2.0'})]).write(path)
+        data = path.read_bytes()
+        wrong_count = data[:12] + struct.pack('<I', 2) + data[16:]
+        for content in [b'x' * len(data), data[:-8], wrong_count]:
+            path.write_bytes(content)
+            with pytest.raises(ValueError):
+                bc.SceneSnapshot.read(path)
+        assert len(mapped) == 3
+        assert all(mapping.closed for mapping in mapped)
+
+
+class TestSaveAndLoad():
+    """Tests for saving and loading all items of a canvas."""
+
+    def test_round_trip(self, memory_canvas, path):
+        """Types, coordinates, tags, options and stacking order should be restored."""
+        lower = memory_canvas.create_rectangle(0, 0, 10, 10, fill='red', tags=('foo', ))
+        memory_canvas.create_many(bc.Oval, [[0, 0, 5, 5], [1, 1, 6, 6]], width=[2, 3])
+        memory_canvas.canvas.create_line(0, 0, 20, 20, dash=(4, 2))
+        memory_canvas.canvas.tag_raise(lower.id)
+        memory_canvas.save_scene(path)
+        target = bc.BetterCanvas(backend='memory')
+        target.create_text(0, 0, text='gone')
+        scene = target.load_scene(path)
+        assert target.canvas.find_all() == tuple(scene.ids)
+        assert [item.tk_type for item in scene] == ['oval', 'oval', 'line', 'rectangle']
+        assert scene[1].coords == [1, 1, 6, 6]
+        assert target.canvas.itemcget(scene.ids[1], 'width') == '3.0'
+        assert target.canvas.itemcget(scene.ids[2], 'dash') == '4 2'
+        assert scene[3].fill == 'red'
+        assert scene[3].tags == ('foo', )
+
+    def test_uncached_options(self, memory_canvas, path):
+        """Options only Tk knows, e.g. booleans and distances with units, should be saved as Tk reports them."""
+        memory_canvas.create_line(0, 0, 10, 10, smooth=True, width='1m', fill='red')
+        memory_canvas.create_many(bc.Line, [[0, 0, 5, 5]], smooth=True, width='2m')
+        memory_canvas.save_scene(path)
+        target = bc.BetterCanvas(backend='memory')
+        line, other = target.load_scene(path)
+        for item in (line, other):
+            assert target.canvas.itemcget(item.id, 'smooth') == memory_canvas.canvas.itemcget(1, 'smooth')
+        assert (line.width, line.fill) == ('1m', 'red')
+        assert target.canvas.itemcget(other.id, 'width') == '2m'
+        line.fill = 'blue'
+        target.save_scene(path)
+        again = bc.BetterCanvas(backend='memory')
+        line, other = again.load_scene(path)
+        assert (line.width, line.fill, other.width) == ('1m', 'blue', '2m')
+        assert again.canvas.itemcget(line.id, 'smooth') == target.canvas.itemcget(1, 'smooth')
+
+    def test_keep_items(self, memory_canvas, path):
+        """Loaded items should be added on top of existing ones when not clearing."""
+        memory_canvas.create_oval(0, 0, 10, 10)
+        memory_canvas.save_scene(path)
+        scene = memory_canvas.load_scene(path, clear=False)
+        assert len(memory_canvas.canvas.find_all()) == 2
+        assert memory_canvas.find_withtag('all')[-1] is scene[0]
+
+    def test_stale_options(self, memory_canvas, path):
+        """Options changed behind the Python side should be read from the canvas."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, fill='red', tags=('foo', ))
+        rectangle.outline = 'blue'
+        memory_canvas.tag_config('foo', fill='green')
+        snapshot = memory_canvas.save_scene(path)
+        assert snapshot.item_options(0) == {'fill': 'green', 'outline': 'blue'}
+
+    def test_option_cache(self, memory_canvas, path):
+        """Loaded items should answer saved options without asking the canvas."""
+        memory_canvas.create_rectangle(0, 0, 10, 10, fill='red')
+        memory_canvas.save_scene(path)
+        scene = memory_canvas.load_scene(path)
+        memory_canvas.canvas.itemconfig(scene.ids[0], fill='blue')
+        assert scene[0].fill == 'red'
+
+    def test_single_call(self, better_canvas, better_canvas_tcl_calls, path):
+        """Saving and loading items with known options should not take a Tcl call per item."""
+        better_canvas.create_many(bc.Rectangle, [[0, 0, 10, 10]] * 100, fill='red')
+        better_canvas_tcl_calls.count = 0
+        better_canvas.save_scene(path)
+        assert better_canvas_tcl_calls.count == 2
+        better_canvas_tcl_calls.count = 0
+        scene = better_canvas.load_scene(path, clear=False)
+        assert len(scene) == 100
+        assert better_canvas_tcl_calls.count == 1
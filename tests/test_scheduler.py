@@ -0,0 +1,96 @@
+"""Tests for scheduler module."""
+import pytest
+
+
+class TestFrameScheduler():
+    """Tests for updates applied once per frame."""
+
+    @pytest.fixture
+    def scheduler(self, better_canvas):
+        scheduler = better_canvas.use_frame_scheduler(fps=30)
+        yield scheduler
+        scheduler.stop()
+
+    def test_updates_wait_for_frame(self, better_canvas, scheduler):
+        """Updates should reach Tk only when the frame is run."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.move(10, 0)
+        assert rectangle.id in scheduler.dirty
+        assert better_canvas.canvas.coords(rectangle.id) == [0, 0, 10, 10]
+        scheduler.frame()
+        assert better_canvas.canvas.coords(rectangle.id) == [10, 0, 20, 10]
+        assert not scheduler.dirty
+
+    def test_one_call_per_frame(self, better_canvas, scheduler, better_canvas_tcl_calls):
+        """Many updates of an item between frames should cost a single Tcl call."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        better_canvas_tcl_calls.count = 0
+        for step in range(1000):
+            rectangle.coords = (step, 0, step + 10, 10)
+            rectangle.fill = 'red' if step % 2 else 'blue'
+        assert scheduler.frame() == 2
+        assert better_canvas_tcl_calls.count == 1
+        assert better_canvas.canvas.coords(rectangle.id) == [999, 0, 1009, 10]
+
+    def test_read_flushes(self, better_canvas, scheduler):
+        """Reading coordinates from Tk should apply pending updates first."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.move(5, 5)
+        assert rectangle.coords == [5, 5, 15, 15]
+
+    def test_stats(self, better_canvas, scheduler):
+        """Frames should be counted together with the flushed subcommands."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.move(5, 5)
+        scheduler.frame()
+        scheduler.frame()
+        stats = scheduler.stats()
+        assert stats['frames'] == 2
+        assert stats['operations'] == 1
+        assert stats['max_time'] >= stats['last_time']
+
+    def test_callbacks(self, better_canvas, scheduler):
+        """Frame callbacks should run before pending updates are applied."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        scheduler.callbacks.append(lambda frame_time: rectangle.move(1, 0))
+        scheduler.frame()
+        assert better_canvas.canvas.coords(rectangle.id) == [1, 0, 11, 10]
+
+    def test_stop(self, better_canvas, scheduler):
+        """Stopping should apply pending updates and make updates immediate again."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        rectangle.move(5, 0)
+        scheduler.stop()
+        assert not scheduler.running
+        assert better_canvas.canvas.coords(rectangle.id) == [5, 0, 15, 10]
+        rectangle.move(5, 0)
+        assert better_canvas.canvas.coords(rectangle.id) == [10, 0, 20, 10]
+
+    def test_failing_frame(self, better_canvas, scheduler):
+        """A frame callback that raises should not stop the following frames."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+
+        def fail(frame_time):
+            raise ValueError(frame_time)
+
+        scheduler.callbacks.append(fail)
+        with pytest.raises(ValueError):
+            scheduler._tick()
+        assert scheduler.running
+        assert scheduler._after_id is not None
+        assert better_canvas._batch is scheduler.batch
+        scheduler.callbacks.remove(fail)
+        rectangle.move(5, 0)
+        scheduler._tick()
+        assert better_canvas.canvas.coords(rectangle.id) == [5, 0, 15, 10]
+
+    def test_start_inside_batch(self, better_canvas):
+        """Starting inside a batch should be refused."""
+        with better_canvas.batch():
+            with pytest.raises(RuntimeError):
+                better_canvas.use_frame_scheduler()
+
+    def test_start_without_event_loop(self, memory_canvas):
+        """Starting on a canvas backend without the Tk event loop should be refused."""
+        with pytest.raises(RuntimeError):
+            memory_canvas.use_frame_scheduler()
@@ -0,0 +1,137 @@
+"""Tests for spatial module."""
+import pytest
+
+
+class TestSpatialIndex():
+    """Tests for find_* queries answered by SpatialIndex."""
+
+    @pytest.fixture
+    def indexed_canvas(self, better_canvas):
+        better_canvas.use_spatial_index(cell_size=50)
+        return better_canvas
+
+    @pytest.fixture
+    def rectangles(self, indexed_canvas):
+        return [indexed_canvas.create_rectangle(x, x, x + 20, x + 20) for x in range(0, 400, 40)]
+
+    def test_overlapping_matches_tk(self, indexed_canvas, rectangles):
+        """Results should be the same as those of Tk, in the same order."""
+        for area in [(0, 0, 100, 100), (35, 35, 45, 45), (500, 500, 600, 600)]:
+            expected = indexed_canvas.canvas.find_overlapping(*area)
+            assert tuple(item.id for item in indexed_canvas.find_overlapping(*area)) == expected
+
+    def test_enclosed(self, indexed_canvas, rectangles):
+        """Only items completely inside the area should be returned."""
+        assert indexed_canvas.find_enclosed(-10, -10, 70, 70) == tuple(rectangles[:2])
+
+    def test_no_tcl_calls(self, indexed_canvas, rectangles, better_canvas_tcl_calls):
+        """Queries about shapes should not call Tk."""
+        indexed_canvas.find_overlapping(0, 0, 100, 100)
+        indexed_canvas.find_enclosed(0, 0, 100, 100)
+        indexed_canvas.find_closest(300, 10)
+        assert better_canvas_tcl_calls.count == 0
+
+    def test_move(self, indexed_canvas, rectangles):
+        """Moved items should be found at their new position."""
+        rectangles[0].move(1000, 1000)
+        assert indexed_canvas.find_overlapping(1000, 1000, 1010, 1010) == (rectangles[0], )
+        assert rectangles[0] not in indexed_canvas.find_overlapping(0, 0, 10, 10)
+
+    def test_move_in_batch(self, indexed_canvas, rectangles):
+        """Items moved inside a batch should be found at their new position."""
+        with indexed_canvas.batch():
+            rectangles[0].move(1000, 1000)
+            assert indexed_canvas.find_overlapping(1000, 1000, 1010, 1010) == (rectangles[0], )
+
+    def test_coords(self, indexed_canvas, rectangles):
+        """Items with new coordinates should be found at their new position."""
+        rectangles[0].coords = [1000, 1000, 1010, 1010]
+        assert indexed_canvas.find_overlapping(1009, 1005, 1010, 1006) == (rectangles[0], )
+
+    def test_delete(self, indexed_canvas, rectangles):
+        """Deleted items should not be found."""
+        rectangles[0].delete()
+        indexed_canvas.delete(rectangles[1])
+        assert indexed_canvas.find_overlapping(0, 0, 70, 70) == ()
+
+    def test_hidden(self, indexed_canvas, rectangles):
+        """Hidden items should not be found."""
+        rectangles[0].state = 'hidden'
+        assert indexed_canvas.find_overlapping(0, 0, 10, 10) == ()
+        rectangles[0].state = 'normal'
+        assert indexed_canvas.find_overlapping(0, 0, 10, 10) == (rectangles[0], )
+
+    def test_text_measured_by_tk(self, indexed_canvas):
+        """Items without a shape should be measured by Tk."""
+        text = indexed_canvas.create_text(100, 100, text='Hello world!')
+        assert indexed_canvas.find_overlapping(99, 99, 101, 101) == (text, )
+
+    def test_shown_measured_item(self, memory_canvas):
+        """Items measured by Tk that were created hidden should be found once they are shown."""
+        memory_canvas.use_spatial_index()
+        text = memory_canvas.create_text(100, 100, text='Hello world!', state='hidden')
+        assert memory_canvas.find_overlapping(99, 99, 101, 101) == ()
+        text.state = 'normal'
+        assert memory_canvas.find_overlapping(99, 99, 101, 101) == (text, )
+        assert memory_canvas.find_enclosed(0, 0, 200, 200) == (text, )
+        assert memory_canvas.find_closest(0, 0) is text
+
+    def test_closest_topmost(self, indexed_canvas):
+        """The topmost of overlapping items should be the closest one."""
+        indexed_canvas.create_rectangle(0, 0, 100, 100)
+        top = indexed_canvas.create_rectangle(0, 0, 100, 100)
+        assert indexed_canvas.find_closest(50, 50) is top
+
+    def test_closest_far(self, indexed_canvas, rectangles):
+        """The closest item should be found far from the grid."""
+        assert indexed_canvas.find_closest(2000, 2000) is rectangles[-1]
+        assert indexed_canvas.find_closest(-2000, 0) is rectangles[0]
+
+    def test_existing_items(self, better_canvas):
+        """Items created before the index was enabled should be found."""
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10, fill='red')
+        better_canvas.use_spatial_index()
+        assert better_canvas.find_overlapping(5, 5, 6, 6) == (rectangle, )
+
+    def test_oval(self, indexed_canvas):
+        """Corners of the bounding box and the inside of an oval without fill should not be part of it."""
+        oval = indexed_canvas.create_oval(0, 0, 100, 100)
+        assert indexed_canvas.find_overlapping(2, 2, 4, 4) == ()
+        assert indexed_canvas.find_overlapping(48, 48, 52, 52) == ()
+        assert indexed_canvas.find_overlapping(0, 48, 2, 52) == (oval, )
+        oval.fill = 'red'
+        assert indexed_canvas.find_overlapping(48, 48, 52, 52) == (oval, )
+        assert indexed_canvas.find_enclosed(-1, -1, 101, 101) == (oval, )
+
+    def test_line(self, indexed_canvas):
+        """Only areas the width of a diagonal line reaches should overlap it."""
+        line = indexed_canvas.create_line(0, 0, 100, 100)
+        assert indexed_canvas.find_overlapping(80, 10, 90, 20) == ()
+        assert indexed_canvas.find_overlapping(49, 49, 51, 51) == (line, )
+        assert indexed_canvas.find_overlapping(52, 48, 53, 49) == ()
+        line.width = 10
+        assert indexed_canvas.find_overlapping(52, 48, 53, 49) == (line, )
+
+    def test_polygon(self, indexed_canvas):
+        """Areas inside a filled polygon should overlap it, inside an unfilled one only its edges should."""
+        polygon = indexed_canvas.create_polygon(0, 0, 100, 0, 0, 100, fill='red')
+        assert indexed_canvas.find_overlapping(80, 80, 90, 90) == ()
+        assert indexed_canvas.find_overlapping(10, 10, 20, 20) == (polygon, )
+        polygon.fill = ''
+        polygon.outline = 'black'
+        assert indexed_canvas.find_overlapping(10, 10, 20, 20) == ()
+        assert indexed_canvas.find_overlapping(45, 45, 55, 55) == (polygon, )
+
+    def test_closest_shape(self, indexed_canvas):
+        """Distances should be measured to shapes, not to their bounding boxes."""
+        indexed_canvas.create_oval(0, 0, 100, 100, fill='red')
+        rectangle = indexed_canvas.create_rectangle(105, 0, 115, 10)
+        assert indexed_canvas.find_closest(95, 5) is rectangle
+
+    def test_arc_asks_tk(self, indexed_canvas):
+        """Queries that come close to an arc should be answered by Tk."""
+        arc = indexed_canvas.create_arc(0, 0, 100, 100, start=0, extent=90)
+        for area in [(60, 20, 70, 30), (10, 60, 20, 70), (200, 200, 210, 210)]:
+            expected = indexed_canvas.canvas.find_overlapping(*area)
+            assert tuple(item.id for item in indexed_canvas.find_overlapping(*area)) == expected
+        assert indexed_canvas.find_overlapping(60, 20, 70, 30) == (arc, )
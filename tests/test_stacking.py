@@ -0,0 +1,91 @@
+"""Tests for stacking module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+@pytest.fixture
+def stacking(memory_canvas):
+    """Stacking order of memory_canvas with a "labels" layer above the default one."""
+    stacking = memory_canvas.use_stacking_order()
+    stacking.add_layer('labels')
+    return stacking
+
+
+def order(stacking):
+    """Returns ids of all ordered items, the lowest first."""
+    return [item_id for name in stacking.names for item_id in stacking.items_in(name)]
+
+
+class TestStackingOrder():
+    """Tests for keeping the stacking order on the Python side."""
+
+    def test_layers(self, memory_canvas, stacking):
+        """Items of a layer should stay above items of lower layers."""
+        with stacking.in_layer('labels'):
+            label = memory_canvas.create_text(0, 0, text='label')
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        assert memory_canvas.canvas.find_all() == (rectangle.id, label.id)
+        assert stacking.layer_of(label.id) == 'labels'
+        assert memory_canvas.find_above(rectangle) is label
+        assert memory_canvas.find_below(rectangle) is None
+
+    def test_raise_and_lower(self, memory_canvas, stacking):
+        """Single items should move next to other items."""
+        first, second, third = (memory_canvas.create_oval(0, 0, 5, 5) for _ in range(3))
+        first.raise_above(second)
+        assert order(stacking) == [second.id, first.id, third.id]
+        third.lower_below()
+        assert order(stacking) == [third.id, second.id, first.id]
+        assert memory_canvas.canvas.find_all() == tuple(order(stacking))
+
+    def test_bulk(self, memory_canvas, stacking):
+        """Many items should be moved keeping their relative order."""
+        ovals = memory_canvas.create_many(bc.Oval, [[0, 0, 5, 5]] * 100)
+        with stacking.in_layer('labels'):
+            label = memory_canvas.create_text(0, 0, text='label')
+        selection = ovals[10:60:2]
+        stacking.raise_items(selection)
+        expected = [item_id for item_id in ovals.ids if item_id not in selection.ids] + list(selection.ids) + [label.id]
+        assert order(stacking) == expected
+        assert memory_canvas.canvas.find_all() == tuple(expected)
+        stacking.set_layer(selection, 'labels')
+        assert stacking.items_in('labels') == (label.id, ) + tuple(selection.ids)
+        stacking.lower_items(selection, below=ovals[0])
+        assert order(stacking)[:26] == list(selection.ids) + [ovals.ids[0]]
+        assert memory_canvas.canvas.find_all() == tuple(order(stacking))
+
+    def test_renumber(self, memory_canvas, stacking):
+        """Repeated insertions between the same neighbours should keep keys ordered."""
+        bottom, top = memory_canvas.create_oval(0, 0, 5, 5), memory_canvas.create_oval(0, 0, 5, 5)
+        for _ in range(100):
+            memory_canvas.create_oval(0, 0, 5, 5).raise_above(bottom)
+        ids = order(stacking)
+        assert [stacking.order_key(item_id) for item_id in ids] == sorted(stacking.order_key(item_id) for item_id in ids)
+        assert ids[0] == bottom.id and ids[-1] == top.id
+        assert memory_canvas.canvas.find_all() == tuple(ids)
+
+    def test_indexes_follow_order(self, memory_canvas, stacking):
+        """Spatial and tag index results should be in stacking order."""
+        memory_canvas.use_spatial_index()
+        memory_canvas.use_tag_index()
+        first = memory_canvas.create_rectangle(0, 0, 10, 10, tags='room', fill='red')
+        second = memory_canvas.create_rectangle(0, 0, 10, 10, tags='room', fill='red')
+        first.raise_above(second)
+        assert memory_canvas.find_overlapping(5, 5, 6, 6) == [second, first]
+        assert memory_canvas.find_withtag('room') == [second, first]
+
+    def test_virtual_items(self, memory_canvas, stacking):
+        """Items above should include canvas items of a virtual canvas."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        scene = memory_canvas.use_virtual_canvas(margin=0)
+        scene.add(bc.Oval, 0, 0, 5, 5)
+        scene.update((0, 0, 100, 100))
+        assert memory_canvas.find_above(rectangle).id == scene.canvas_id(0)
+
+    def test_delete(self, memory_canvas, stacking):
+        """Deleted items should be dropped from the order."""
+        oval = memory_canvas.create_oval(0, 0, 5, 5)
+        memory_canvas.delete(oval)
+        assert oval.id not in stacking
+        assert len(stacking) == 0
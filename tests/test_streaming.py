@@ -0,0 +1,100 @@
+"""Tests for streaming module."""
+from array import array
+
+import pytest
+
+import BetterCanvas as bc
+from BetterCanvas.streaming import decimate
+
+
+class TestRingBuffer():
+    """Tests for keeping the latest points."""
+
+    def test_wrap_around(self):
+        """The oldest points should be dropped once the buffer is full."""
+        buffer = bc.RingBuffer(5)
+        buffer.append([(0, 0), (1, 10), (2, 20)])
+        buffer.append([3, 30, 4, 40, 5, 50])
+        x, y = buffer.values()
+        assert list(x) == [1, 2, 3, 4, 5]
+        assert list(y) == [10, 20, 30, 40, 50]
+
+    def test_large_append(self):
+        """Appending more points than the capacity should keep the latest ones."""
+        buffer = bc.RingBuffer(3)
+        buffer.append((index, index) for index in range(10))
+        assert list(buffer.values()[0]) == [7, 8, 9]
+        assert len(buffer) == 3
+
+    def test_odd_values(self):
+        """Points with a missing value should be rejected."""
+        with pytest.raises(ValueError):
+            bc.RingBuffer(3).append([0, 1, 2])
+
+
+class TestDecimate():
+    """Tests for reducing points to the visible width."""
+
+    def test_keeps_spikes(self):
+        """The lowest and the highest point of every bucket should be kept in order."""
+        x = array('d', range(100))
+        y = array('d', [0] * 100)
+        y[43] = 9
+        y[42] = -3
+        coords = decimate(x, y, 10)
+        assert len(coords) <= 40
+        assert coords[8:12] == [42, -3, 43, 9]
+
+    def test_few_points(self):
+        """Points should be kept as they are when they fit the buckets."""
+        assert decimate([0, 1, 2], [5, 6, 7], 10) == [0, 5, 1, 6, 2, 7]
+
+
+class TestLineStream():
+    """Tests for streaming points into a line."""
+
+    def test_update(self, memory_canvas):
+        """Appended points should be pushed once by update."""
+        line = memory_canvas.create_line(0, 0, 1, 1)
+        stream = line.use_stream(capacity=4, pixels=0)
+        line.append([(0, 5), (1, 6), (2, 7)])
+        line.append([(3, 8), (4, 9)])
+        assert line.coords == [0, 0, 1, 1]
+        assert stream.update()
+        assert not stream.update()
+        assert line.coords == [1, 6, 2, 7, 3, 8, 4, 9]
+        assert stream.updates == 1
+
+    def test_decimation(self, memory_canvas):
+        """Pushed coordinates should be decimated to the width of the canvas."""
+        memory_canvas.configure(width=50)
+        line = memory_canvas.create_line(0, 0, 1, 1)
+        line.append((index, index % 7) for index in range(10000))
+        line.stream.update()
+        assert len(line.coords) <= 4 * 50
+
+    def test_once_per_frame(self, better_canvas):
+        """Points appended between two frames should be pushed by the next frame."""
+        line = better_canvas.create_line(0, 0, 1, 1)
+        line.use_stream(pixels=100)
+        for index in range(1000):
+            line.append([(index, index % 10)])
+        scheduler = better_canvas.scheduler
+        assert line.stream.frame in scheduler.callbacks
+        assert better_canvas.canvas.coords(line.id) == [0, 0, 1, 1]
+        assert scheduler.frame() == 1
+        assert len(better_canvas.canvas.coords(line.id)) <= 400
+        assert line.stream.frame not in scheduler.callbacks
+        scheduler.stop()
+
+    def test_frames_stop(self, better_canvas):
+        """Appending should not defer other updates and frames should stop once the line is up to date."""
+        line = better_canvas.create_line(0, 0, 1, 1)
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10)
+        line.use_stream(pixels=0)
+        line.append([(0, 0), (10, 10)])
+        rectangle.move(5, 0)
+        assert better_canvas.canvas.coords(rectangle.id) == [5, 0, 15, 10]
+        better_canvas.scheduler._tick()
+        assert better_canvas.canvas.coords(line.id) == [0, 0, 10, 10]
+        assert not better_canvas.scheduler.running
@@ -0,0 +1,84 @@
+"""Tests for svg module."""
+import io
+import xml.etree.ElementTree as ElementTree
+
+import BetterCanvas as bc
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def export(better_canvas, **kwargs):
+    """Exports the canvas and returns the parsed SVG root element."""
+    file = io.StringIO()
+    better_canvas.export_svg(file, **kwargs)
+    return ElementTree.fromstring(file.getvalue())
+
+
+class TestSvgExporter():
+    """Tests for the streaming SVG exporter."""
+
+    def test_elements(self, memory_canvas):
+        """Items should be written in stacking order as matching SVG elements."""
+        memory_canvas.create_rectangle(0, 0, 10, 20, fill='red')
+        memory_canvas.create_oval(0, 0, 10, 20)
+        memory_canvas.create_arc(0, 0, 10, 10, style='arc')
+        memory_canvas.canvas.create_line(0, 0, 10, 10, 20, 0)
+        memory_canvas.create_polygon(0, 0, 10, 10, 20, 0)
+        memory_canvas.create_text(5, 5, text='a < b')
+        root = export(memory_canvas)
+        assert [element.tag[len(SVG):] for element in root] == ['rect', 'ellipse', 'path', 'polyline', 'polygon', 'text']
+        rect, ellipse, path, polyline, polygon, text = root
+        assert (rect.get('width'), rect.get('height'), rect.get('fill'), rect.get('stroke')) == ('10', '20', 'red', 'black')
+        assert (ellipse.get('rx'), ellipse.get('fill')) == ('5', 'none')
+        assert path.get('d') == 'M 10 5 A 5 5 0 0 0 5 0'
+        assert polyline.get('points') == '0,0 10,10 20,0'
+        assert (polygon.get('fill'), polygon.get('stroke')) == ('black', 'none')
+        assert ''.join(text.itertext()) == 'a < b'
+
+    def test_options(self, memory_canvas):
+        """Width, dash and state should be exported."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, width=3, dash=(4, 2))
+        memory_canvas.create_rectangle(0, 0, 10, 10, state='hidden')
+        memory_canvas.create_oval(0, 0, 10, 10, state='disabled', disabledfill='#ffff00000000')
+        rectangle.outline = 'blue'
+        rect, ellipse = export(memory_canvas)
+        assert (rect.get('stroke'), rect.get('stroke-width'), rect.get('stroke-dasharray')) == ('blue', '3', '4 2')
+        assert ellipse.get('fill') == '#ff0000'
+
+    def test_font(self, memory_canvas):
+        """Font families with spaces given as tuples should be kept whole, whether read from Python or the canvas."""
+        memory_canvas.create_text(5, 5, text='known', font=('Times New Roman', 12, 'bold'))
+        memory_canvas.create_text(5, 5, text='stale', font=('Times New Roman', 12), tags=('foo', ))
+        memory_canvas.tag_config('foo', fill='red')
+        for text in export(memory_canvas):
+            assert (text.get('font-family'), text.get('font-size')) == ('Times New Roman', '12pt')
+
+    def test_uncached_options(self, memory_canvas):
+        """Options the cache can't hold should be read from the canvas."""
+        line = memory_canvas.create_line(0, 0, 10, 10, smooth=True, fill='red')
+        line.width = '1m'
+        memory_canvas.create_many(bc.Line, [[0, 0, 5, 5]], width='1i')
+        first, second = export(memory_canvas)
+        assert (first.get('stroke'), first.get('stroke-width')) == ('red', '3.77953')
+        assert second.get('stroke-width') == '96'
+
+    def test_stale_options(self, memory_canvas):
+        """Options set by tag should be read from the canvas."""
+        memory_canvas.create_rectangle(0, 0, 10, 10, fill='red', tags=('foo', ))
+        memory_canvas.tag_config('foo', fill='green')
+        rect, = export(memory_canvas)
+        assert rect.get('fill') == 'green'
+
+    def test_path(self, memory_canvas, tmp_path):
+        """A path should be opened and the number of items returned."""
+        memory_canvas.create_many(bc.Oval, [[0, 0, 10, 10]] * 5)
+        assert memory_canvas.export_svg(tmp_path / 'scene.svg', chunk_size=2) == 5
+        assert len(ElementTree.parse(tmp_path / 'scene.svg').getroot()) == 5
+
+    def test_chunks(self, better_canvas, better_canvas_tcl_calls):
+        """Items with known options should be read with a single Tcl call per chunk."""
+        better_canvas.create_many(bc.Rectangle, [[0, 0, 10, 10]] * 10, fill='#ff0000', outline='')
+        better_canvas_tcl_calls.count = 0
+        root = export(better_canvas, chunk_size=4)
+        assert len(root) == 10
+        assert better_canvas_tcl_calls.count == 2 + 3
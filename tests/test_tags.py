@@ -0,0 +1,79 @@
+"""Tests for tags module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+@pytest.fixture
+def memory_canvas(memory_canvas):
+    """memory_canvas with a tag index."""
+    memory_canvas.use_tag_index()
+    return memory_canvas
+
+
+class TestTagIndex():
+    """Tests for answering tag queries without Tk."""
+
+    def test_created(self, memory_canvas):
+        """Tags given on creation should be indexed."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, tags=('room', 'floor1'))
+        ovals = memory_canvas.create_many(bc.Oval, [[0, 0, 5, 5]] * 3, tags='lamp floor1')
+        assert memory_canvas.find_withtag('floor1') == [rectangle] + list(ovals)
+        assert memory_canvas.tag_index.counts() == {'room': 1, 'floor1': 4, 'lamp': 3}
+        assert ovals[1].tags == ('lamp', 'floor1')
+
+    def test_assignment_and_delete(self, memory_canvas):
+        """Tags assignments and deletes should keep the index up to date."""
+        first = memory_canvas.create_rectangle(0, 0, 10, 10, tags='old')
+        second = memory_canvas.create_rectangle(0, 0, 10, 10, tags='old')
+        first.tags = ('new', )
+        memory_canvas.tag_config('old', tags='newer')
+        assert memory_canvas.tag_index.tags_of(second.id) == ('newer', )
+        assert memory_canvas.tag_index.count('old') == 0
+        memory_canvas.delete('new')
+        assert first.id not in memory_canvas.tag_index
+        assert memory_canvas.find_withtag('new') == []
+
+    def test_add_and_remove_tag(self, memory_canvas):
+        """Tags should be added to and removed from many items."""
+        ovals = memory_canvas.create_many(bc.Oval, [[0, 0, 5, 5]] * 4, tags='lamp')
+        memory_canvas.add_tag('selected', ovals[1:3])
+        assert memory_canvas.find_withtag('selected') == ovals[1:3]
+        assert ovals[1].has_tag('selected')
+        assert memory_canvas.canvas.gettags(ovals[2].id) == ('lamp', 'selected')
+        memory_canvas.remove_tag('selected', ovals)
+        assert memory_canvas.tag_index.count('selected') == 0
+        assert memory_canvas.canvas.find_withtag('selected') == ()
+        ovals[1].tags = ('lamp', )
+        assert memory_canvas.canvas.gettags(ovals[1].id) == ('lamp', )
+
+    def test_existing_items(self):
+        """Items created before the index should be read from the canvas."""
+        better_canvas = bc.BetterCanvas(backend='memory')
+        rectangle = better_canvas.create_rectangle(0, 0, 10, 10, tags='room')
+        better_canvas.use_tag_index()
+        assert better_canvas.find_withtag('room') == [rectangle]
+
+    def test_virtual_items(self, memory_canvas):
+        """Tags of virtual canvas items should be looked up by Tk."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10, tags='room')
+        scene = memory_canvas.use_virtual_canvas(margin=0, cell_size=100)
+        scene.add_many(bc.Rectangle, [[index * 20, 0, index * 20 + 10, 10] for index in range(45)], tags='room')
+        scene.add(bc.Oval, 0, 0, 5, 5)
+        scene.configure(45, tags='lamp')
+        scene.update((0, 0, 1000, 100))
+        assert len(memory_canvas.find_withtag('room')) == len(memory_canvas.canvas.find_withtag('room')) == 46
+        assert len(memory_canvas.find_withtag('lamp')) == 1
+        assert memory_canvas.find_withtag('room')[0] is rectangle
+        assert memory_canvas.tag_index.answers('floor1')
+
+    def test_no_tcl_calls(self, better_canvas, better_canvas_tcl_calls):
+        """Queries answered by the index should not call Tcl."""
+        better_canvas.use_tag_index()
+        rectangles = better_canvas.create_many(bc.Rectangle, [[0, 0, 10, 10]] * 100, tags=('room', ))
+        better_canvas.add_tag('selected', rectangles[:10])
+        better_canvas_tcl_calls.count = 0
+        assert len(better_canvas.find_withtag('selected')) == 10
+        assert rectangles[3].tags == ('room', 'selected')
+        assert better_canvas_tcl_calls.count == 0
+        assert better_canvas.canvas.find_withtag('selected') == tuple(rectangles[:10].ids)
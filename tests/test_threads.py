@@ -0,0 +1,107 @@
+"""Tests for threads module."""
+import threading
+
+import pytest
+
+import BetterCanvas as bc
+
+
+@pytest.fixture
+def threadsafe(memory_canvas):
+    """Thread-safe stand-in of memory_canvas, drained by the tests."""
+    return memory_canvas.threadsafe()
+
+
+class TestThreadSafeCanvas():
+    """Tests for queueing item commands from worker threads."""
+
+    def test_workers(self, memory_canvas, threadsafe):
+        """Items created and updated by many threads should appear after a drain."""
+        def work(index):
+            oval = threadsafe.create_oval(0, 0, 10, 10, tags=(f'worker{index}', ))
+            for _ in range(100):
+                oval.move(1, index)
+            oval.fill = 'red'
+        threads = [threading.Thread(target=work, args=(index, )) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        while threadsafe.drain():
+            pass
+        for index in range(8):
+            oval, = memory_canvas.find_withtag(f'worker{index}')
+            assert oval.coords == [100, 100 * index, 110, 10 + 100 * index]
+            assert memory_canvas.canvas.itemcget(oval.id, 'fill') == 'red'
+        stats = threadsafe.stats()
+        assert stats['depth'] == 0
+        assert stats['enqueued'] == 8 * 102
+        assert stats['applied'] == 16
+        assert stats['coalesced'] == 8 * 100
+
+    def test_coalescing(self, threadsafe):
+        """Coords should override queued moves and moves should add to queued coords."""
+        rectangle = threadsafe.create_rectangle(0, 0, 10, 10)
+        rectangle.move(5, 5)
+        rectangle.coords = [1, 1, 2, 2]
+        rectangle.move(1, 2)
+        rectangle.outline = 'blue'
+        rectangle.outline = 'green'
+        assert len(threadsafe) == 2
+        threadsafe.drain()
+        item = rectangle.result(timeout=1)
+        assert item.coords == [2, 3, 3, 4]
+        assert item.outline == 'green'
+
+    def test_wrap_and_delete(self, memory_canvas, threadsafe):
+        """Existing items should be wrapped and queued updates of deleted items dropped."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        wrapped = threadsafe.wrap(rectangle)
+        wrapped.move(5, 0)
+        wrapped.delete()
+        threadsafe.drain()
+        assert memory_canvas.canvas.find_all() == ()
+        assert rectangle.id not in memory_canvas.items
+
+    def test_wrap_coalesces(self, memory_canvas, threadsafe):
+        """Updates of an item wrapped several times should be coalesced."""
+        rectangle = memory_canvas.create_rectangle(0, 0, 10, 10)
+        threadsafe.wrap(rectangle).move(5, 0)
+        threadsafe.wrap(rectangle).move(0, 5)
+        assert len(threadsafe) == 1
+        threadsafe.drain()
+        assert rectangle.coords == [5, 5, 15, 15]
+
+    def test_unexpected_error(self, threadsafe):
+        """Other errors should fail the creation and keep the queue drained periodically."""
+        class Broken(bc.Rectangle):
+            def __init__(self, *args, **kwargs):
+                raise RuntimeError('broken')
+        broken = threadsafe.create_item(Broken, 0, 0, 10, 10)
+        rectangle = threadsafe.create_rectangle(0, 0, 10, 10)
+        with pytest.raises(RuntimeError):
+            threadsafe._tick()
+        assert threadsafe.running
+        with pytest.raises(RuntimeError):
+            broken.result(timeout=1)
+        threadsafe.drain()
+        assert rectangle.result(timeout=1).coords == [0, 0, 10, 10]
+
+    def test_errors(self, threadsafe):
+        """Failed creation should be reported through the item and in the statistics."""
+        with pytest.raises(AttributeError):
+            threadsafe.create_rectangle(0, 0, 10, 10).text = 'foo'
+        rectangle = threadsafe.create_rectangle(0, 0, 10)
+        rectangle.move(1, 1)
+        threadsafe.drain()
+        with pytest.raises(TypeError):
+            rectangle.result(timeout=1)
+        assert threadsafe.stats()['failed'] == 2
+
+    def test_time_slice(self, threadsafe):
+        """A drain should stop when its time slice is over."""
+        threadsafe.slice_time = 0
+        for _ in range(200):
+            threadsafe.create_oval(0, 0, 10, 10)
+        assert threadsafe.drain() == 64
+        assert len(threadsafe) == 200 - 64
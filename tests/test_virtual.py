@@ -0,0 +1,116 @@
+"""Tests for virtual module."""
+import pytest
+
+import BetterCanvas as bc
+
+
+@pytest.fixture
+def scene(memory_canvas):
+    """Virtual scene of memory_canvas with a row of 1000 squares, 20 units apart."""
+    scene = memory_canvas.use_virtual_canvas(margin=0, cell_size=100, pool_size=10)
+    scene.add_many(bc.Rectangle, [[index * 20, 0, index * 20 + 10, 10] for index in range(1000)], fill='red')
+    return scene
+
+
+def shown(memory_canvas, scene):
+    """Returns logical ids of items on the canvas, in stacking order."""
+    return [scene.logical_id(item_id) for item_id in memory_canvas.canvas.find_all()
+            if memory_canvas.canvas.itemcget(item_id, 'state') != 'hidden']
+
+
+class TestVirtualCanvas():
+    """Tests for showing only items near the view."""
+
+    def test_update(self, memory_canvas, scene):
+        """Only items in the view should exist on the canvas."""
+        assert memory_canvas.canvas.find_all() == ()
+        scene.update((0, 0, 100, 100))
+        assert shown(memory_canvas, scene) == [0, 1, 2, 3, 4, 5]
+        assert memory_canvas.canvas.itemcget(scene.canvas_id(3), 'fill') == 'red'
+        assert scene.update((0, 0, 100, 100)) == 0
+        assert scene.stats()['created'] == 6
+
+    def test_scroll_reuses_items(self, memory_canvas, scene):
+        """Items leaving the view should be reused for items entering it."""
+        scene.update((0, 0, 100, 100))
+        scene.update((2000, 0, 2100, 100))
+        assert shown(memory_canvas, scene) == [100, 101, 102, 103, 104, 105]
+        assert memory_canvas.canvas.coords(scene.canvas_id(100)) == [2000, 0, 2010, 10]
+        assert len(memory_canvas.canvas.find_all()) == 6
+        stats = scene.stats()
+        assert stats['created'] == 6
+        assert stats['reused'] == 6
+
+    def test_stacking_order(self, memory_canvas, scene):
+        """Canvas items should be stacked in the order of logical ids."""
+        scene.update((100, 0, 200, 100))
+        scene.update((0, 0, 200, 100))
+        assert shown(memory_canvas, scene) == list(range(11))
+        scene.update((2000, 0, 2100, 100))
+        scene.update((0, 0, 100, 100))
+        assert shown(memory_canvas, scene) == list(range(6))
+
+    def test_pool_size(self, memory_canvas, scene):
+        """Canvas items over the pool size should be deleted."""
+        scene.update((0, 0, 400, 100))
+        scene.add(bc.Oval, 50000, 0, 50010, 10)
+        scene.update((50000, 0, 50100, 100))
+        assert len(memory_canvas.canvas.find_all()) == 11
+        assert scene.stats()['pooled'] == 10
+
+    def test_changes(self, memory_canvas, scene):
+        """Changes of logical items should reach their canvas items and move them in or out of view."""
+        scene.update((0, 0, 100, 100))
+        scene.configure(2, fill='blue', tags='room')
+        scene.move(3, 1000, 0)
+        scene.remove(4)
+        scene.set_coords(500, (50, 50, 60, 60))
+        assert memory_canvas.canvas.itemcget(scene.canvas_id(2), 'fill') == 'blue'
+        assert set(memory_canvas.canvas.gettags(scene.canvas_id(2))) == {'room', 'virtual'}
+        scene.update((0, 0, 100, 100))
+        assert shown(memory_canvas, scene) == [0, 1, 2, 5, 500]
+        assert len(scene) == 999
+
+    def test_tk_canvas(self, better_canvas):
+        """Items in the view should be created on a Tk canvas."""
+        scene = bc.VirtualCanvas(better_canvas, margin=0)
+        scene.add_many(bc.Oval, [[index, index, index + 5, index + 5] for index in range(0, 10000, 10)])
+        scene.update((0, 0, 500, 500))
+        assert len(better_canvas.canvas.find_withtag('virtual')) == 51
+        assert better_canvas.canvas.coords(scene.canvas_id(10)) == [100, 100, 105, 105]
+
+    def test_frame_scheduler(self, better_canvas):
+        """Updates waiting for the next frame should not be applied to canvas items reused by an update."""
+        scene = bc.VirtualCanvas(better_canvas, margin=0, pool_size=100)
+        scene.add_many(bc.Rectangle, [[index * 20, 0, index * 20 + 10, 10] for index in range(1000)])
+        scheduler = better_canvas.use_frame_scheduler()
+        scheduler.start()
+        try:
+            scene.update((0, 0, 100, 100))
+            scene.move(0, 5, 0)
+            scene.configure(1, fill='red')
+            scene.update((2000, 0, 2100, 100))
+            scheduler.frame()
+            for logical_id in range(100, 106):
+                assert better_canvas.canvas.coords(scene.canvas_id(logical_id)) == [logical_id * 20, 0, logical_id * 20 + 10, 10]
+                assert better_canvas.canvas.itemcget(scene.canvas_id(logical_id), 'fill') == ''
+        finally:
+            scheduler.stop()
+            if scene._after_id is not None:
+                better_canvas.canvas.after_cancel(scene._after_id)
+
+    def test_changes_schedule_update(self, better_canvas):
+        """Changes of logical items should schedule an update while the scene follows the view."""
+        scene = bc.VirtualCanvas(better_canvas, margin=0)
+        logical_id = scene.add(bc.Oval, 0, 0, 5, 5)
+        assert scene._after_id is None
+        scene.start()
+        for change in (lambda: scene.add(bc.Oval, 0, 0, 5, 5), lambda: scene.move(logical_id, 5, 0),
+                       lambda: scene.set_coords(logical_id, (0, 0, 10, 10)), lambda: scene.configure(logical_id, state='hidden'),
+                       lambda: scene.add_many(bc.Oval, [[0, 0, 5, 5]] * 2), lambda: scene.remove(logical_id)):
+            better_canvas.canvas.after_cancel(scene._after_id)
+            scene._after_id = None
+            change()
+            assert scene._after_id is not None
+        scene.stop()
+        assert scene._after_id is None